@@ -0,0 +1,175 @@
+"""
+End-to-end benchmarks of the Databricks clients against the local mock
+workspace: an impact crawl over a synthetic lineage graph, query result
+fetches (inline and external links) and a dlux run.
+
+Each suite runs ``--repeat`` times and reports throughput, p50/p99 of the
+whole run and p50/p99 of the requests the mock served.  ``--latency-ms``
+and ``--error-rate`` add per-request delay and injected 503s (the error
+rate applies to the crawl only; the crawler is the client that retries,
+so with errors the crawl time is mostly its retry backoff).
+
+    python -m bench.e2e [--suites crawl query-inline query-links dlux] [--repeat 5] [--json]
+    python -m bench.e2e --save base.json
+    python -m bench.e2e --baseline base.json --tolerance 0.25  # exit 1 on regression
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+
+from clients.databricks import dlux, query
+from clients.databricks.impact import impact
+from clients.databricks.mock import MockWorkspace, serve, synthetic_lineage
+
+HISTORY_COLUMNS = [{"name": n, "type_name": "STRING"} for n in (
+    "account_id", "workspace_id", "statement_id", "executed_by", "executed_by_user_id",
+    "warehouse_id", "client_application", "client_driver", "statement_type", "end_time",
+    "error_message", "statement_text")]
+RESULT_COLUMNS = [{"name": "id", "type_name": "LONG"}, {"name": "name", "type_name": "STRING"},
+                  {"name": "amount", "type_name": "DECIMAL"}]
+
+
+def percentile(values, q):
+    """Nearest-rank percentile, q in [0, 100]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def history_rows(n):
+    return [["acc", "ws", f"s{i}", f"user{i % 50}@acme.com", "u", "wh", "Tableau", "odbc", "SELECT",
+             f"2026-10-19T10:{i // 60 % 60:02d}:{i % 60:02d}Z",
+             f"User does not have SELECT privilege on table `main`.`sales`.`t{i % 500}`",
+             None] for i in range(n)]
+
+
+def result_rows(n):
+    return [[str(i), f"name_{i % 1000}", f"{i % 10000}.{i % 100:02d}"] for i in range(n)]
+
+
+def crawl_suite(args):
+    lineage = synthetic_lineage(args.tables, schemas=args.schemas, fanout=3, seed=1)
+    workspace = MockWorkspace(lineage=lineage, page_size=100, latency=args.latency_ms / 1000,
+                              error_rate=args.error_rate)
+
+    def run(host):
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = impact("main", "s0", host=host, token="t", delay=0)
+        return len(report.graph)
+
+    return workspace, run, "tables"
+
+
+def query_suite(args, disposition):
+    rows = result_rows(args.rows)
+    workspace = MockWorkspace(results=lambda sql: (RESULT_COLUMNS, rows), chunk_rows=args.chunk_rows,
+                              latency=args.latency_ms / 1000)
+
+    def run(host):
+        _, columns, chunks = query.execute(host, "t", "wh", "SELECT * FROM bench", None, None,
+                                           disposition=disposition)
+        return sum(1 for _ in query.rows_from_chunks(columns, chunks))
+
+    return workspace, run, "rows"
+
+
+def dlux_suite(args):
+    rows = history_rows(args.rows)
+    workspace = MockWorkspace(results=lambda sql: (HISTORY_COLUMNS, rows), chunk_rows=args.chunk_rows,
+                              latency=args.latency_ms / 1000)
+
+    def run(host):
+        stream = dlux.execute_sql_and_stream(host, "t", "wh", dlux.build_sql(args.rows))
+        return dlux.write_records(dlux.enrich_stream(stream), io.StringIO(), "ndjson")
+
+    return workspace, run, "records"
+
+
+SUITES = {
+    "crawl": crawl_suite,
+    "query-inline": lambda args: query_suite(args, "INLINE"),
+    "query-links": lambda args: query_suite(args, "EXTERNAL_LINKS"),
+    "dlux": dlux_suite,
+}
+
+
+def measure(name, args):
+    workspace, run, unit = SUITES[name](args)
+    seconds, items = [], 0
+    with serve(workspace) as host:
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            items = run(host)
+            seconds.append(time.perf_counter() - start)
+    served = [t for times in workspace.timings.values() for t in times]
+    return {
+        "suite": name,
+        "unit": unit,
+        "items": items,
+        "runs": args.repeat,
+        "p50_s": percentile(seconds, 50),
+        "p99_s": percentile(seconds, 99),
+        "per_s": items / percentile(seconds, 50) if items else 0.0,
+        "requests_per_run": workspace.requests / args.repeat,
+        "errors_injected": workspace.errors,
+        "request_p50_ms": 1000 * percentile(served, 50),
+        "request_p99_ms": 1000 * percentile(served, 99),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    base = {r["suite"]: r for r in baseline}
+    out = []
+    for r in results:
+        b = base.get(r["suite"])
+        if b and b["per_s"] and r["per_s"] < b["per_s"] * (1 - tolerance):
+            out.append(f"{r['suite']}: {r['per_s']:,.0f} {r['unit']}/s, "
+                       f"baseline {b['per_s']:,.0f} ({r['per_s'] / b['per_s'] - 1:+.0%})")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", nargs="+", choices=list(SUITES), default=list(SUITES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tables", type=int, default=1000, help="tables in the synthetic lineage graph")
+    parser.add_argument("--schemas", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=100_000, help="result rows for query and dlux")
+    parser.add_argument("--chunk-rows", type=int, default=10_000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every mock request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="injected 503s during the crawl")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--save", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="results JSON to compare throughput against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed throughput drop against --baseline (default 0.25)")
+    args = parser.parse_args()
+
+    results = [measure(name, args) for name in args.suites]
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'suite':<14}{'items':>9}{'p50':>9}{'p99':>9}{'throughput':>18}"
+              f"{'req/run':>9}{'req p50':>10}{'req p99':>10}")
+        for r in results:
+            print(f"{r['suite']:<14}{r['items']:>9}{r['p50_s']:>8.3f}s{r['p99_s']:>8.3f}s"
+                  f"{r['per_s']:>10,.0f} {r['unit'] + '/s':<9}{r['requests_per_run']:>7.0f}"
+                  f"{r['request_p50_ms']:>8.2f}ms{r['request_p99_ms']:>8.2f}ms")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            slower = regressions(results, json.load(f), args.tolerance)
+        for line in slower:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
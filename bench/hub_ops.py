@@ -0,0 +1,154 @@
+"""
+Hub operations at several sizes: import (origin CSV -> dbt YAML hub), show
+(all tables and one table), search, export (spark DDL) and edit-load (what
+the curses editor reads), on hubs built by bench.hubgen.  pack times
+``tbd pack`` and show-packed a cold ``show`` served from the snapshot.
+
+    python -m bench.hub_ops [--sizes 2x50x10 4x250x20] [--repeat 3] [--json]
+    python -m bench.hub_ops --record bench/hub_ops.jsonl   # append, with commit
+
+Sizes are databases x tables per database x average columns; the default
+largest, 4000 tables, takes a few minutes since every read parses YAML.
+``--record`` appends one JSON line per run with the commit hash and
+timestamp, so runs from different commits can be compared.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+
+from bench import hubgen
+from tbd.__main__ import search, selected_tables
+from tbd.editor.sources import SourcesFile
+from tbd.schema import schema_read, write_table
+from tbd.schema.formatters import render
+from tbd.schema.pack import pack, read_hub
+
+SIZES = ["2x50x10", "4x250x20", "8x500x30"]
+
+
+def parse_size(size):
+    databases, tables, columns = (int(n) for n in size.lower().split("x"))
+    return databases, tables, columns
+
+
+def operations(csv_dir, dbt_dir, scratch):
+    """name -> callable returning the number of tables it handled."""
+    one = next(iter(selected_tables([], dbt_dir))).name
+    packed = os.path.join(scratch, "packed")
+    shutil.copytree(dbt_dir, packed)
+    pack(packed)
+
+    def import_():
+        out = os.path.join(scratch, "import")
+        shutil.rmtree(out, ignore_errors=True)
+        count = 0
+        for table in schema_read(in_file=csv_dir):
+            write_table(table, out_folder=out)
+            count += 1
+        return count
+
+    def show():
+        return len(list(selected_tables([], dbt_dir)))
+
+    def show_one():
+        return len(list(selected_tables([one], dbt_dir)))
+
+    def search_():
+        return len(search("amount", origin=dbt_dir))
+
+    def export():
+        count = 0
+        for table in selected_tables([], dbt_dir):
+            render(table, format_type="spark")
+            count += 1
+        return count
+
+    def edit_load():
+        count = 0
+        for path in glob.glob(os.path.join(dbt_dir, "*", "*")):
+            doc = SourcesFile.load(path)
+            if len(doc):
+                doc.table(0)  # what the editor shows first
+            count += len(doc)
+        return count
+
+    def pack_():
+        return len(pack(packed))
+
+    def show_packed():
+        return len(list(read_hub(packed)))
+
+    return {"import": import_, "show": show, "show-one": show_one, "search": search_,
+            "export": export, "edit-load": edit_load, "pack": pack_, "show-packed": show_packed}
+
+
+def run(sizes, repeat, ops=None, tables_per_file=1):
+    results = []
+    for size in sizes:
+        databases, tables, columns = parse_size(size)
+        scratch = tempfile.mkdtemp(prefix="tbd-bench-")
+        try:
+            csv_dir, dbt_dir = hubgen.build(scratch, databases, tables, columns, tables_per_file)
+            for name, op in operations(csv_dir, dbt_dir, scratch).items():
+                if ops and name not in ops:
+                    continue
+                seconds = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        handled = op()
+                    seconds.append(time.perf_counter() - start)
+                best = min(seconds)
+                results.append({"size": size, "tables": databases * tables, "op": name,
+                                "handled": handled, "best_s": best,
+                                "median_s": sorted(seconds)[len(seconds) // 2],
+                                "tables_per_s": databases * tables / best if best else None})
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per op; the best is reported")
+    parser.add_argument("--ops", nargs="+", default=None,
+                        help="subset of import show show-one search export edit-load pack show-packed")
+    parser.add_argument("--tables-per-file", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--record", help="append this run as a JSON line to this file")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.ops, args.tables_per_file)
+    if args.record:
+        with open(args.record, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"commit": commit(), "timestamp": time.time(),
+                                "python": platform.python_version(),
+                                "tables_per_file": args.tables_per_file, "results": results}) + "\n")
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'size':<12}{'op':<11}{'tables':>8}{'best':>10}{'median':>10}{'tables/s':>12}")
+    for r in results:
+        print(f"{r['size']:<12}{r['op']:<11}{r['handled']:>8}{r['best_s']:>9.3f}s"
+              f"{r['median_s']:>9.3f}s{r['tables_per_s']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Synthetic hubs: N databases x M tables x K columns with mixed MySQL types
+and descriptions, written as the origin CSVs ``tbd import`` reads and as a
+dbt sources YAML hub like ``tbd import`` writes.
+
+    python -m bench.hubgen --databases 4 --tables 250 --columns 20 --out /tmp/hub
+    # /tmp/hub/csv/<database>.csv and /tmp/hub/dbt/<database>/<table>.source.yaml
+
+``--tables-per-file`` groups several tables into one sources file, as
+hand-maintained dbt projects usually do.
+"""
+import argparse
+import csv
+import os
+import random
+from itertools import groupby
+
+import yaml
+
+# (MySQL type, weight); weighted towards what production schemas look like
+TYPES = [
+    ("bigint", 14), ("int(11)", 12), ("varchar(255)", 20), ("varchar(64)", 8), ("text", 5),
+    ("decimal(12,2)", 8), ("double", 4), ("tinyint(1)", 6), ("datetime", 10), ("timestamp", 5),
+    ("date", 5), ("json", 2), ("blob", 1),
+]
+NOUNS = ["account", "user", "order", "payment", "invoice", "session", "device", "merchant",
+         "card", "loan", "transfer", "ledger", "balance", "event", "campaign", "employer"]
+QUALIFIERS = ["id", "status", "amount", "created_at", "updated_at", "type", "source", "code",
+              "name", "count", "score", "flag", "region", "currency", "email", "note"]
+DESCRIPTION = ["Populated by the nightly {} load.", "Foreign key to {}.", "Raw value from the {} service.",
+               "Deprecated; use {} instead.", "PII: masked outside the {} domain."]
+
+
+def database_names(count):
+    return [f"db_{NOUNS[i % len(NOUNS)]}{i // len(NOUNS) or ''}" for i in range(count)]
+
+
+def generate(databases=2, tables=50, columns=10, seed=0):
+    """
+    Yields ``(database, table, description, [(column, type, description), ...])``.
+    Column counts vary around ``columns`` (+-50%) so tables are not uniform.
+    """
+    rnd = random.Random(seed)
+    weights = [w for _, w in TYPES]
+    for database in database_names(databases):
+        for t in range(tables):
+            noun = rnd.choice(NOUNS)
+            table = f"{noun}_{rnd.choice(QUALIFIERS)}_{t:05d}"
+            width = max(1, round(columns * rnd.uniform(0.5, 1.5)))
+            cols, seen = [], set()
+            for c in range(width):
+                name = f"{rnd.choice(NOUNS)}_{rnd.choice(QUALIFIERS)}"
+                if name in seen:
+                    name = f"{name}_{c}"
+                seen.add(name)
+                dtype = rnd.choices(TYPES, weights)[0][0]
+                cols.append((name, dtype, rnd.choice(DESCRIPTION).format(rnd.choice(NOUNS))))
+            yield database, table, f"{noun.title()} records from {database}.", cols
+
+
+def write_csv(hub, out_dir):
+    """One origin CSV per database: table_name,column_name,data_type."""
+    os.makedirs(out_dir, exist_ok=True)
+    files = {}
+    try:
+        for database, table, _, cols in hub:
+            if database not in files:
+                fp = open(os.path.join(out_dir, f"{database}.csv"), "w", newline="")
+                writer = csv.writer(fp)
+                writer.writerow(["table_name", "column_name", "data_type"])
+                files[database] = fp, writer
+            writer = files[database][1]
+            writer.writerows((table, name, dtype) for name, dtype, _ in cols)
+    finally:
+        for fp, _ in files.values():
+            fp.close()
+
+
+def _source(database, tables):
+    return {"version": 2, "sources": [{
+        "name": database,
+        "database": database,
+        "tables": [{"name": table, "description": description,
+                    "columns": [{"name": n, "type": t, "description": d} for n, t, d in cols]}
+                   for table, description, cols in tables],
+    }]}
+
+
+def write_dbt(hub, out_dir, tables_per_file=1):
+    """<database>/<table>.source.yaml, or <database>/sources_NNNN.yml with several tables."""
+    for database, rows in groupby(hub, key=lambda row: row[0]):
+        folder = os.path.join(out_dir, database)
+        os.makedirs(folder, exist_ok=True)
+        rows = [(table, description, cols) for _, table, description, cols in rows]
+        for n, start in enumerate(range(0, len(rows), tables_per_file)):
+            batch = rows[start:start + tables_per_file]
+            name = f"{batch[0][0]}.source.yaml" if tables_per_file == 1 else f"sources_{n:04d}.yml"
+            with open(os.path.join(folder, name), "w") as fp:
+                yaml.safe_dump(_source(database, batch), fp, sort_keys=False)
+
+
+def build(out, databases=2, tables=50, columns=10, tables_per_file=1, seed=0):
+    """Write both forms under ``out``; returns (csv dir, dbt dir)."""
+    csv_dir, dbt_dir = os.path.join(out, "csv"), os.path.join(out, "dbt")
+    write_csv(generate(databases, tables, columns, seed), csv_dir)
+    write_dbt(generate(databases, tables, columns, seed), dbt_dir, tables_per_file)
+    return csv_dir, dbt_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--databases", type=int, default=2)
+    parser.add_argument("--tables", type=int, default=50, help="tables per database")
+    parser.add_argument("--columns", type=int, default=10, help="average columns per table")
+    parser.add_argument("--tables-per-file", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+    csv_dir, dbt_dir = build(args.out, args.databases, args.tables, args.columns,
+                             args.tables_per_file, args.seed)
+    print(csv_dir)
+    print(dbt_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Throughput of dlux resource hint extraction.
+
+The corpus mixes the privilege errors Databricks actually returns: three
+part backticked names, keyword plus name, bare names, messages naming
+nothing (so statement_text is searched) and long messages with stack
+traces.  Every strategy must produce the same hints as the regex-per-
+pattern reference.
+
+    python -m bench.resource_hints [--rows 200000] [--processes 4] [--json]
+"""
+import argparse
+import json
+import random
+import time
+
+from clients.databricks.dlux import enrich, enrich_stream
+from clients.databricks.dlux.hints import (STATEMENT_RESOURCE_REGEX, _hint_in_turn,
+                                           extract_resource_hint, resource_hints)
+
+TEMPLATES = [
+    "[INSUFFICIENT_PERMISSIONS] Insufficient privileges: User does not have SELECT privilege on table `{c}`.`{s}`.`{t}`.",
+    "PERMISSION_DENIED: User does not have USE SCHEMA on Schema `{c}.{s}`.",
+    "[UNAUTHORIZED_ACCESS] Unauthorized access: PERMISSION_DENIED: request not authorized for volume {t}",
+    "User does not have MODIFY privilege on table {c}.{s}.{t}. SQLSTATE: 42501",
+    "Permission denied: operation not allowed on catalog `{c}`",
+    "[INSUFFICIENT_PERMISSIONS] Insufficient privileges: User does not have permission CREATE on CATALOG.",
+    "Access denied. {trace}",
+    "AnalysisException: [INSUFFICIENT_PERMISSIONS] requires USAGE privilege on external location `loc_{t}` {trace}",
+]
+TRACE = " ".join(f"at com.databricks.sql.acl.CheckPermissions$.check{i}(CheckPermissions.scala:{100 + i})"
+                 for i in range(12))
+
+
+def corpus(rows, seed=7):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(rows):
+        c, s, t = f"cat{rnd.randrange(20)}", f"sch{rnd.randrange(200)}", f"tbl_{rnd.randrange(5000)}"
+        message = rnd.choice(TEMPLATES).format(c=c, s=s, t=t, trace=TRACE)
+        text = f"SELECT a, b, count(*) FROM {c}.{s}.{t} JOIN {c}.{s}.dim_{i % 7} USING (a) GROUP BY a, b"
+        out.append((message, text))
+    return out
+
+
+def _reference(pairs):
+    out = []
+    for message, text in pairs:
+        hint = _hint_in_turn(message) if message else None
+        if hint is None and text:
+            m = STATEMENT_RESOURCE_REGEX.search(text)
+            hint = ".".join(m.groups()) if m else None
+        out.append(hint)
+    return out
+
+
+def _rows(pairs):
+    return [{"statement_id": f"s{i}", "error_message": m, "statement_text": t}
+            for i, (m, t) in enumerate(pairs)]
+
+
+def strategies(processes):
+    yield "regex per pattern", _reference, False
+    yield "case-folded, per row", lambda pairs: [extract_resource_hint(m, t) for m, t in pairs], False
+    yield "case-folded, bulk", resource_hints, False
+    yield "enrich", lambda rows: [r["resource_hint"] for r in map(enrich, rows)], True
+    yield (f"enrich x{processes} processes",
+           lambda rows: [r["resource_hint"] for r in enrich_stream(iter(rows), processes)], True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    pairs = corpus(args.rows)
+    rows = _rows(pairs)
+    expected = _reference(pairs)
+    results = []
+    for name, run, wants_rows in strategies(args.processes):
+        start = time.perf_counter()
+        hints = run(rows if wants_rows else pairs)
+        seconds = time.perf_counter() - start
+        if hints != expected:
+            raise SystemExit(f"{name}: hints differ from the reference")
+        results.append({"strategy": name, "rows": args.rows, "seconds": seconds,
+                        "rows_per_s": args.rows / seconds})
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'strategy':<24}{'rows':>10}{'time':>9}{'rows/s':>12}")
+    for r in results:
+        print(f"{r['strategy']:<24}{r['rows']:>10}{r['seconds']:>8.2f}s{r['rows_per_s']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Memory held by a fully materialized result in each row representation.
+
+Chunks of a synthetic result (id LONG, name STRING, amount DECIMAL,
+ts TIMESTAMP) are generated one at a time, so the measured peak is the
+retained rows, not the input.
+
+    python -m bench.row_memory [--rows 5000000] [--chunk 100000] [--json]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from clients.databricks.query import rows_from_chunks
+from clients.databricks.query.rows import iter_columns, iter_tuples
+
+COLUMNS = [
+    {"name": "id", "type_name": "LONG"},
+    {"name": "name", "type_name": "STRING"},
+    {"name": "amount", "type_name": "DECIMAL"},
+    {"name": "ts", "type_name": "TIMESTAMP"},
+]
+
+SHAPES = {
+    "dict": lambda chunks: list(rows_from_chunks(COLUMNS, chunks)),
+    "tuple": lambda chunks: list(iter_tuples(COLUMNS, chunks)),
+    "tuple+coerce": lambda chunks: list(iter_tuples(COLUMNS, chunks, coerce=True)),
+    "columns": lambda chunks: list(iter_columns(COLUMNS, chunks)),
+    "columns+coerce": lambda chunks: list(iter_columns(COLUMNS, chunks, coerce=True)),
+}
+
+
+def synthetic_chunks(rows, chunk):
+    for start in range(0, rows, chunk):
+        yield [[str(i), f"name_{i % 1000}", f"{i % 10000}.{i % 100:02d}",
+                f"2024-01-{1 + i % 28:02d}T00:00:{i % 60:02d}.000Z"]
+               for i in range(start, min(rows, start + chunk))]
+
+
+def measure(shape, rows, chunk):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = SHAPES[shape](synthetic_chunks(rows, chunk))
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return {"shape": shape, "rows": rows, "retained_mb": current / 2**20,
+            "peak_mb": peak / 2**20, "seconds": seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--chunk", type=int, default=100_000)
+    parser.add_argument("--shapes", nargs="+", choices=list(SHAPES), default=list(SHAPES))
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = [measure(shape, args.rows, args.chunk) for shape in args.shapes]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'shape':<16}{'rows':>10}{'retained':>12}{'peak':>12}{'time':>9}")
+    for r in results:
+        print(f"{r['shape']:<16}{r['rows']:>10}{r['retained_mb']:>10.1f}MB"
+              f"{r['peak_mb']:>10.1f}MB{r['seconds']:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Statement latency: fixed polling vs server-side wait and backoff.
+
+Runs against the local mock workspace, so it measures client overhead and
+request counts, not warehouse speed.
+
+    python -m bench.statement_latency [--runtimes 0.05 0.5 3] [--repeat 5] [--json]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from clients.databricks import query
+from clients.databricks.mock import MockWorkspace, serve
+
+STRATEGIES = {
+    # wait_timeout seconds, fixed poll seconds (None = backoff)
+    "poll 1s": (0, 1.0),
+    "backoff": (0, None),
+    "wait+backoff": (query.WAIT_TIMEOUT, None),
+}
+
+
+def run_once(host, runtime, wait_timeout, poll_s):
+    first = query.start_statement(host, "token", "warehouse", f"SELECT {runtime}", None, None,
+                                  wait_timeout=wait_timeout)
+    query.wait_for_done(host, "token", first["statement_id"], first=first, poll_s=poll_s)
+
+
+def bench(runtimes, repeat):
+    results = []
+    workspace = MockWorkspace(runtime=lambda sql: float(sql.split()[-1]))
+    with serve(workspace) as host:
+        for runtime in runtimes:
+            for name, (wait_timeout, poll_s) in STRATEGIES.items():
+                latencies = []
+                before = workspace.requests
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    run_once(host, runtime, wait_timeout, poll_s)
+                    latencies.append(time.perf_counter() - start)
+                results.append({
+                    "runtime_s": runtime,
+                    "strategy": name,
+                    "median_s": statistics.median(latencies),
+                    "overhead_s": statistics.median(latencies) - runtime,
+                    "requests": (workspace.requests - before) / repeat,
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runtimes", type=float, nargs="+", default=[0.05, 0.5, 3.0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = bench(args.runtimes, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'runtime':>8}  {'strategy':<14}{'median':>9}{'overhead':>10}{'requests':>10}")
+    for r in results:
+        print(f"{r['runtime_s']:>7.2f}s  {r['strategy']:<14}{r['median_s']:>8.3f}s"
+              f"{r['overhead_s']:>9.3f}s{r['requests']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
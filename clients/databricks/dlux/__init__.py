@@ -12,16 +12,51 @@ CLI:
   --limit N         Max rows (default 1000)
   --where "..."     Extra SQL filter (optional), e.g.:
                     --where "client_application = 'Tableau'"
+  --since 24h       Only statements that ended in the last 24h (also 30m, 7d
+                    or a timestamp); --until takes the same forms
+  --all-failures    Every FAILED statement, not just privilege errors
+  --statement-text  auto (default): only fetched, truncated, for rows whose
+                    error message names no resource; full; none
+  --aggregate       Group by principal and resource hint in the warehouse
+  --group-by F,G    Roll the records up locally, in one pass, by any output
+                    fields, e.g. executed_by,resource_hint,client_application;
+                    --max-groups bounds memory (heavy hitters beyond it)
+
+  --follow          Tail the history: poll for rows after a saved watermark
+                    (end_time, statement_id) and emit them as NDJSON
+  --once            One catch-up pass from the watermark, then exit (cron)
+  --state PATH      Watermark file (default ~/.cache/tbd/dlux.watermark.json)
+
   --show-sql        Print the SQL before execution
+  --timeout S       Cancel the statement after S seconds (default 180)
 
-Output: JSON array with keys:
+  --format ndjson   One record per line instead of a JSON array
+  --workers N       Concurrent result link downloads
+  --processes N     Extract resource hints in N processes (large pulls)
+
+Output: JSON array (or NDJSON), streamed, with keys:
   account_id, workspace_id, statement_id, executed_by, executed_by_user_id,
   warehouse_id, client_application, client_driver, statement_type,
-  resource_hint, error_message
+  end_time, resource_hint, error_message
+
+  or, with --aggregate:
+  executed_by, resource_hint, failures, first_seen, last_seen,
+  sample_statement_id, sample_error_message
+
+  or, with --group-by, the group fields and:
+  count, count_error, first_seen, last_seen, sample_statement_ids
 """
 
 import os, sys, json, time, argparse, re
 import urllib.request, urllib.error
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from ..query import (start_statement, wait_for_done, iter_chunks, result_columns,
+                     rows_from_chunks, WAIT_TIMEOUT, WORKERS, MAX_IN_FLIGHT)
+from .hints import (RESOURCE_REGEXES, RESOURCE_KEYWORDS, STATEMENT_RESOURCE_REGEX,
+                    extract_resource_hint, resource_hints)
+from .rollup import Rollup, MAX_GROUPS, SAMPLES
 
 API_BASE = "/api/2.0/sql/statements"
 
@@ -38,14 +73,6 @@ PRIVILEGE_PATTERNS = [
     "permission required",
 ]
 
-# Pull likely object identifiers out of error text (best-effort).
-RESOURCE_REGEXES = [
-    re.compile(r"`([A-Za-z0-9_\-]+)`\.`([A-Za-z0-9_\-]+)`\.`([A-Za-z0-9_\-]+)`"),
-    re.compile(r"(catalog|schema|table|view|function|volume|share|database|external location|storage credential)\s+`([^`]+)`", re.IGNORECASE),
-    re.compile(r"\b([A-Za-z0-9_\-]+)\.([A-Za-z0-9_\-]+)\.([A-Za-z0-9_\-]+)\b"),
-    re.compile(r"(table|view|function|volume)\s+([A-Za-z0-9_\-]+)", re.IGNORECASE),
-]
-
 def env(name: str) -> str:
     v = os.environ.get(name)
     if not v:
@@ -66,126 +93,445 @@ def http_json(method: str, url: str, token: str, body: dict | None = None) -> di
         detail = e.read().decode("utf-8", errors="replace")
         raise SystemExit(f"HTTP {e.code} calling {url}:\n{detail}") from None
 
-def execute_sql_and_collect(host: str, token: str, warehouse_id: str, sql: str, poll_secs: float = 1.5, max_wait_secs: int = 180) -> list[dict]:
-    print(sql)
-    start = http_json("POST", f"{host}{API_BASE}", token, {
-        "statement": sql,
-        "warehouse_id": warehouse_id,
-        "disposition": "EXTERNAL_LINKS",
-        "wait_timeout": "0s",
-    })
-    statement_id = start.get("statement_id") or start.get("id")
-    if not statement_id:
-        raise SystemExit(f"Could not obtain statement_id from response: {start}")
-
-    deadline = time.time() + max_wait_secs
+def execute_sql_and_stream(host: str, token: str, warehouse_id: str, sql: str,
+                           max_wait_secs: int = 180, wait_timeout: int = WAIT_TIMEOUT,
+                           workers: int = WORKERS, max_in_flight: int = MAX_IN_FLIGHT,
+                           coerce: bool = False):
+    """
+    Run ``sql`` with EXTERNAL_LINKS and yield rows as dicts.  Links are
+    downloaded ``workers`` at a time, at most ``max_in_flight`` ahead of the
+    consumer, and each is decoded incrementally.
+    """
+    started = time.time()
+    try:
+        start = start_statement(host, token, warehouse_id, sql, None, None,
+                                disposition="EXTERNAL_LINKS",
+                                wait_timeout=min(wait_timeout, max_wait_secs))
+        statement_id = start.get("statement_id") or start.get("id")
+        if not statement_id:
+            raise SystemExit(f"Could not obtain statement_id from response: {start}")
+        start = wait_for_done(host, token, statement_id, first=start,
+                              timeout_s=max_wait_secs - (time.time() - started))
+    except (RuntimeError, TimeoutError) as e:
+        raise SystemExit(str(e)) from None
     status = start.get("status", {})
-    while status.get("state") not in ("SUCCEEDED", "FAILED", "CANCELED"):
-        if time.time() > deadline:
-            raise SystemExit(f"Timed out waiting for statement {statement_id} to finish.")
-        time.sleep(poll_secs)
-        res = http_json("GET", f"{host}{API_BASE}/{statement_id}", token)
-        status = res.get("status", {})
-        if status.get("state") in ("SUCCEEDED", "FAILED", "CANCELED"):
-            start = res
-            break
 
     if status.get("state") != "SUCCEEDED":
         raise SystemExit(f"Statement did not succeed: {status}")
 
-    result = start.get("result", {})
-    cols = [c["name"] for c in result.get("schema", {}).get("columns", [])]
-    rows = []
+    chunks = iter_chunks(start, host, token, statement_id,
+                         workers=workers, max_in_flight=max_in_flight)
+    try:
+        yield from rows_from_chunks(result_columns(start), chunks, coerce=coerce,
+                                    result_format=start.get("manifest", {}).get("format"))
+    except RuntimeError as e:
+        raise SystemExit(str(e)) from None
 
-    for link in result.get("manifest", {}).get("external_links", []):
-        url = link.get("external_link")
-        if not url:
-            continue
-        with urllib.request.urlopen(url) as resp:
-            chunk = json.loads(resp.read().decode("utf-8"))
-        for arr in chunk.get("data_array", []):
-            rows.append(dict(zip(cols, arr)))
-    return rows
-
-def build_sql(limit: int, where_extra: str | None) -> str:
-    # like_filters = " OR ".join([f"lower(error_message) RLIKE '{p}'" for p in PRIVILEGE_PATTERNS])
-    where = f"""
-WHERE execution_status = 'FAILED'
-"""
-    # AND ({like_filters})
+
+def execute_sql_and_collect(host: str, token: str, warehouse_id: str, sql: str, **kwargs) -> list[dict]:
+    return list(execute_sql_and_stream(host, token, warehouse_id, sql, **kwargs))
+
+# Group of each RESOURCE_REGEXES match that holds the name, for the SQL version.
+_HINT_GROUPS = (0, 2, 0, 2)
+
+STATEMENT_TEXT_CHARS = 4000
+TEXT_MODES = ("auto", "full", "none")
+
+# follow mode: where the watermark lives and how old a row must be before it is read
+STATE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "tbd", "dlux.watermark.json")
+SETTLE = "5m"
+
+ENRICH_BATCH = 2048
+
+# follow(boundaries=True) yields this after each cycle's rows
+CYCLE_END = object()
+
+# Columns dlux needs; statement_text is added per --statement-text.
+HISTORY_COLUMNS = [
+    "account_id",
+    "workspace_id",
+    "statement_id",
+    "executed_by",
+    "executed_by_user_id",
+    "compute.warehouse_id AS warehouse_id",
+    "client_application",
+    "client_driver",
+    "statement_type",
+    "end_time",
+    "error_message",
+]
+
+def sql_regex(pattern: str, ignore_case: bool = False) -> str:
+    """Raw SQL string literal for a Java regex (no backslash escaping needed)."""
+    if "'" in pattern:
+        raise ValueError(f"Pattern cannot contain a quote: {pattern}")
+    return "r'" + ("(?i)" if ignore_case else "") + pattern + "'"
+
+def privilege_predicate(column: str = "error_message") -> str:
+    return f"{column} RLIKE {sql_regex('|'.join(PRIVILEGE_PATTERNS), ignore_case=True)}"
+
+def resource_predicate(column: str = "error_message") -> str:
+    """
+    True exactly when extract_resource_hint finds a name in ``column``
+    alone: the first match of some RESOURCE_REGEXES pattern has a group
+    that is not a keyword.  A match made only of keywords leaves the hint
+    to statement_text, so it must not count.
+    """
+    not_a_name = ", ".join(["''"] + [f"'{k}'" for k in sorted(RESOURCE_KEYWORDS)])  # '': no match
+    terms = []
+    for rx, hint_group in zip(RESOURCE_REGEXES, _HINT_GROUPS):
+        literal = sql_regex(rx.pattern, bool(rx.flags & re.IGNORECASE))
+        # the keyword patterns' first group is always a keyword
+        groups = range(1, rx.groups + 1) if hint_group == 0 else [hint_group]
+        terms += [f"lower(regexp_extract({column}, {literal}, {g})) NOT IN ({not_a_name})" for g in groups]
+    return "\n    OR ".join(terms)
+
+def resource_hint_sql() -> str:
+    """Server-side extract_resource_hint: first pattern that matches wins."""
+    terms = []
+    for rx, group in zip(RESOURCE_REGEXES, _HINT_GROUPS):
+        literal = sql_regex(rx.pattern, bool(rx.flags & re.IGNORECASE))
+        term = f"regexp_extract(error_message, {literal}, {group})"
+        if group == 0 and "`" in rx.pattern:
+            term = f"replace({term}, '`', '')"
+        terms.append(f"nullif({term}, '')")
+    terms.append(f"nullif(regexp_extract(statement_text, {sql_regex(STATEMENT_RESOURCE_REGEX.pattern)}, 0), '')")
+    return "coalesce(\n      " + ",\n      ".join(terms) + "\n    )"
+
+def time_bound(value: str) -> str:
+    """
+    SQL timestamp for --since/--until: a relative age such as 30m, 24h or
+    7d, or anything Spark parses as a timestamp.
+    """
+    m = re.fullmatch(r"\s*(\d+)\s*([mhd])\s*", value)
+    if m:
+        unit = {"m": "MINUTES", "h": "HOURS", "d": "DAYS"}[m.group(2)]
+        return f"current_timestamp() - INTERVAL {int(m.group(1))} {unit}"
+    return "TIMESTAMP '" + value.replace("'", "''") + "'"
+
+def build_sql(limit: int, where_extra: str | None = None, since: str | None = None,
+              until: str | None = None, privilege_only: bool = True,
+              statement_text: str = "auto", aggregate: bool = False,
+              after: tuple[str, str] | None = None, ordered: bool = False) -> str:
+    """
+    Everything that can be decided in the warehouse is: the privilege
+    pattern filter, the end_time window and the projection.
+
+    statement_text is only needed when the error message names no resource:
+    "auto" sends the first STATEMENT_TEXT_CHARS of it for those rows only,
+    "full" always sends all of it, "none" never does.
+
+    With ``aggregate`` rows are grouped by principal and resource hint in
+    the warehouse and only the groups come back.
+
+    ``after`` is a watermark, (end_time, statement_id) of the last row
+    already seen; only later rows are returned.  ``ordered`` sorts by that
+    pair so the last row of a batch is the next watermark.
+    """
+    if statement_text not in TEXT_MODES:
+        raise ValueError(f"statement_text must be one of {TEXT_MODES}")
+    conditions = ["execution_status = 'FAILED'"]
+    if privilege_only:
+        conditions.append(privilege_predicate())
+    if since:
+        conditions.append(f"end_time >= {time_bound(since)}")
+    if until:
+        conditions.append(f"end_time < {time_bound(until)}")
+    if after:
+        end_time, statement_id = (v.replace("'", "''") for v in after)
+        conditions.append(f"(end_time > TIMESTAMP '{end_time}'"
+                          f" OR (end_time = TIMESTAMP '{end_time}' AND statement_id > '{statement_id}'))")
     if where_extra:
-        where += f"  AND ({where_extra})\n"
-    # Only use columns present in your provided schema
-    sql = f"""
+        conditions.append(f"({where_extra})")
+    where = "WHERE " + "\n  AND ".join(conditions)
+
+    if aggregate:
+        sql = f"""
 SELECT
-  account_id,
-  workspace_id,
-  statement_id,
   executed_by,
-  executed_by_user_id,
-  compute.warehouse_id AS warehouse_id,
-  client_application,
-  client_driver,
-  statement_type,
-  error_message,
-  statement_text
+  resource_hint,
+  count(*) AS failures,
+  min(end_time) AS first_seen,
+  max(end_time) AS last_seen,
+  min(statement_id) AS sample_statement_id,
+  min(error_message) AS sample_error_message
+FROM (
+  SELECT
+    executed_by,
+    end_time,
+    statement_id,
+    error_message,
+    {resource_hint_sql()} AS resource_hint
+  FROM system.query.history
+  {where.replace(chr(10), chr(10) + '  ')}
+)
+GROUP BY executed_by, resource_hint
+ORDER BY failures DESC
+LIMIT {int(limit)}
+"""
+    else:
+        columns = list(HISTORY_COLUMNS)
+        if statement_text == "full":
+            columns.append("statement_text")
+        elif statement_text == "auto":
+            columns.append(f"CASE WHEN {resource_predicate()} THEN NULL\n"
+                           f"       ELSE left(statement_text, {STATEMENT_TEXT_CHARS}) END AS statement_text")
+        projection = ",\n  ".join(columns)
+        order = "ORDER BY end_time, statement_id\n" if ordered or after else ""
+        sql = f"""
+SELECT
+  {projection}
 FROM system.query.history
 {where}
-LIMIT {int(limit)}
+{order}LIMIT {int(limit)}
 """
     # Strip trailing spaces for readability in --show-sql
     return "\n".join(line.rstrip() for line in sql.splitlines())
 
-def extract_resource_hint(error_message: str, statement_text: str | None = None) -> str | None:
-    if error_message:
-        for rx in RESOURCE_REGEXES:
-            m = rx.search(error_message)
-            if m:
-                parts = [g for g in m.groups()
-                         if g and g.lower() not in {"catalog","schema","table","view","function","volume","share","database","external location","storage credential"}]
-                if parts:
-                    return ".".join(parts)
-    if statement_text:
-        m = re.search(r"\b([A-Za-z0-9_\-]+)\.([A-Za-z0-9_\-]+)\.([A-Za-z0-9_\-]+)\b", statement_text)
-        if m:
-            return ".".join(m.groups())
-    return None
+def _record(r: dict, resource_hint: str | None) -> dict:
+    return {
+        "account_id": r.get("account_id"),
+        "workspace_id": r.get("workspace_id"),
+        "statement_id": r.get("statement_id"),
+        "executed_by": r.get("executed_by"),
+        "executed_by_user_id": r.get("executed_by_user_id"),
+        "warehouse_id": r.get("warehouse_id"),
+        "client_application": r.get("client_application"),
+        "client_driver": r.get("client_driver"),
+        "statement_type": r.get("statement_type"),
+        "end_time": r.get("end_time"),
+        "resource_hint": resource_hint,
+        "error_message": r.get("error_message"),
+    }
+
+def enrich(r: dict) -> dict:
+    """Output record for one query.history row."""
+    return _record(r, extract_resource_hint(r.get("error_message") or "", r.get("statement_text") or ""))
+
+def enrich_batch(rows: list[dict]) -> list[dict]:
+    hints = resource_hints([(r.get("error_message"), r.get("statement_text")) for r in rows])
+    return [_record(r, hint) for r, hint in zip(rows, hints)]
+
+def enrich_stream(rows, processes: int = 1, batch_size: int = ENRICH_BATCH):
+    """
+    enrich over a row stream.  With more than one process, hints for
+    batches of ``batch_size`` rows are extracted in a process pool, at most
+    two batches per process in flight; only the message and statement text
+    cross the process boundary and records come out in input order.
+
+    A CYCLE_END in ``rows`` sends the partial batch and emits every pending
+    record before the next row is asked for, so a follow cycle is written
+    out before its watermark is saved.
+    """
+    if processes <= 1:
+        for row in rows:  # no batching, records keep streaming
+            if row is not CYCLE_END:
+                yield enrich(row)
+        return
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = deque()
+
+        def submit(batch):
+            pairs = [(r.get("error_message"), r.get("statement_text")) for r in batch]
+            pending.append((batch, pool.submit(resource_hints, pairs)))
+
+        def drain():
+            batch, hints = pending.popleft()
+            return [_record(r, hint) for r, hint in zip(batch, hints.result())]
+
+        batch = []
+        for row in rows:
+            if row is not CYCLE_END:
+                batch.append(row)
+                if len(batch) < batch_size:
+                    continue
+            if batch:
+                submit(batch)
+                batch = []
+            while pending and (row is CYCLE_END or len(pending) >= 2 * processes):
+                yield from drain()
+        if batch:
+            submit(batch)
+        while pending:
+            yield from drain()
+
+
+# ---------- follow mode ----------
+
+def load_watermark(path: str) -> tuple[str, str] | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    return state["end_time"], state["statement_id"]
+
+def save_watermark(path: str, end_time: str, statement_id: str) -> None:
+    """Written to a temp file and renamed, so a crash never leaves half a watermark."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"end_time": end_time, "statement_id": statement_id, "saved": time.time()}, f)
+    os.replace(tmp, path)
+
+def follow(host: str, token: str, warehouse_id: str, state_path: str, limit: int = 1000,
+           interval: float = 60.0, once: bool = False, settle: str = SETTLE,
+           sleep=time.sleep, boundaries: bool = False, **options):
+    """
+    Yield history rows newer than the watermark in ``state_path``, oldest
+    first, in batches of ``limit``.  The watermark is saved after each batch
+    has been consumed, so a restart resumes after the last complete batch
+    (at-least-once for the batch in progress).  With ``boundaries`` each
+    batch is followed by CYCLE_END, and the watermark is saved once that
+    has been consumed too; see enrich_stream.
+
+    A full batch is followed immediately by the next one; otherwise the
+    next cycle starts after ``interval`` seconds, or the generator ends if
+    ``once``.  Rows that ended in the last ``settle`` are left for a later
+    cycle, since system tables are populated with some delay.
+
+    ``options`` are split between build_sql (where_extra, since, ...) and
+    execute_sql_and_stream (max_wait_secs, workers, ...).
+    """
+    sql_keys = ("where_extra", "since", "until", "privilege_only", "statement_text")
+    sql_options = {k: options.pop(k) for k in sql_keys if k in options}
+    if not sql_options.get("until"):
+        sql_options["until"] = settle
+    watermark = load_watermark(state_path)
+    while True:
+        sql = build_sql(limit, after=watermark, ordered=True, **sql_options)
+        count, last = 0, None
+        for row in execute_sql_and_stream(host, token, warehouse_id, sql, **options):
+            count += 1
+            last = row
+            yield row
+        if boundaries:
+            yield CYCLE_END
+        if last is not None:
+            watermark = last["end_time"], last["statement_id"]
+            save_watermark(state_path, *watermark)
+        if count >= limit:
+            continue
+        if once:
+            return
+        sleep(interval)
+
+
+def write_records(records, out=sys.stdout, fmt: str = "json", flush: bool = False) -> int:
+    """
+    Stream records as NDJSON, or as the indented JSON array dlux has always
+    printed, one element at a time.  ``flush`` flushes every NDJSON line.
+    """
+    count = 0
+    if fmt == "ndjson":
+        for rec in records:
+            out.write(json.dumps(rec, separators=(",", ":"), default=str) + "\n")
+            if flush:
+                out.flush()
+            count += 1
+        return count
+    out.write("[")
+    for rec in records:
+        body = json.dumps(rec, indent=2, default=str).replace("\n", "\n  ")
+        out.write(("," if count else "") + "\n  " + body)
+        count += 1
+    out.write("\n]\n" if count else "]\n")
+    return count
+
 
 def main():
     ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     ap.add_argument("--limit", type=int, default=1000, help="Max rows to return (default 1000)")
     ap.add_argument("--where", type=str, default=None, help="Extra SQL filter (without WHERE). E.g. executed_by = 'alice@acme.com'")
+    ap.add_argument("--since", type=str, default=None,
+                    help="Only statements that ended at or after this time: 30m, 24h, 7d or a timestamp")
+    ap.add_argument("--until", type=str, default=None,
+                    help="Only statements that ended before this time (same forms as --since)")
+    ap.add_argument("--all-failures", action="store_true",
+                    help="Do not restrict to privilege/authorization errors")
+    ap.add_argument("--statement-text", choices=TEXT_MODES, default="auto",
+                    help="Fetch statement_text only for rows whose error names no resource (auto, default), "
+                         "always (full) or never (none)")
+    ap.add_argument("--aggregate", action="store_true",
+                    help="Group by principal and resource hint in the warehouse; one record per group")
+    ap.add_argument("--group-by", type=str, default=None,
+                    help="Roll records up by these comma-separated fields, e.g. executed_by,resource_hint")
+    ap.add_argument("--max-groups", type=int, default=MAX_GROUPS,
+                    help=f"Groups kept exactly before falling back to heavy hitters (default {MAX_GROUPS})")
+    ap.add_argument("--samples", type=int, default=SAMPLES,
+                    help=f"Statement ids kept per group (default {SAMPLES})")
+    ap.add_argument("--follow", action="store_true",
+                    help="Keep polling for new failures, emitting NDJSON, until interrupted")
+    ap.add_argument("--once", action="store_true",
+                    help="Emit everything after the saved watermark, then exit (for cron)")
+    ap.add_argument("--state", type=str, default=STATE_FILE,
+                    help=f"Watermark file for --follow/--once (default {STATE_FILE})")
+    ap.add_argument("--interval", type=float, default=60.0,
+                    help="Seconds between --follow cycles once caught up (default 60)")
+    ap.add_argument("--settle", type=str, default=SETTLE,
+                    help=f"Leave rows newer than this for a later cycle (default {SETTLE})")
     ap.add_argument("--show-sql", action="store_true", help="Print the SQL that will be executed")
+    ap.add_argument("--timeout", type=int, default=180, help="Cancel the statement after this many seconds (default 180)")
+    ap.add_argument("--wait-timeout", type=int, default=WAIT_TIMEOUT,
+                    help=f"Seconds the server may hold the submit request, 0 or 5-50 (default {WAIT_TIMEOUT})")
+    ap.add_argument("--format", choices=["json", "ndjson"], default="json",
+                    help="json array (default) or one record per line; both are streamed")
+    ap.add_argument("--workers", type=int, default=WORKERS,
+                    help=f"Concurrent result link downloads (default {WORKERS})")
+    ap.add_argument("--processes", type=int, default=1,
+                    help="Extract resource hints in this many processes (default 1; for very large pulls)")
     args = ap.parse_args()
 
     host = env("DATABRICKS_HOST").rstrip("/")
     token = env("DATABRICKS_TOKEN")
     warehouse_id = env("WAREHOUSE_ID")
 
-    sql = build_sql(args.limit, args.where)
-    if args.show_sql:
-        print("-- SQL to be executed:\n", sql, file=sys.stderr)
-
-    rows = execute_sql_and_collect(host, token, warehouse_id, sql)
-
-    out = []
-    for r in rows:
-        resource_hint = extract_resource_hint(r.get("error_message") or "", r.get("statement_text") or "")
-        out.append({
-            "account_id": r.get("account_id"),
-            "workspace_id": r.get("workspace_id"),
-            "statement_id": r.get("statement_id"),
-            "executed_by": r.get("executed_by"),
-            "executed_by_user_id": r.get("executed_by_user_id"),
-            "warehouse_id": r.get("warehouse_id"),
-            "client_application": r.get("client_application"),
-            "client_driver": r.get("client_driver"),
-            "statement_type": r.get("statement_type"),
-            "resource_hint": resource_hint,
-            "error_message": r.get("error_message"),
-        })
-
-    print(json.dumps(out, indent=2))
+    group_by = [k.strip() for k in args.group_by.split(",") if k.strip()] if args.group_by else None
+    if group_by:
+        unknown = set(group_by) - set(_record({}, None))
+        if unknown:
+            sys.exit(f"Unknown --group-by field(s): {', '.join(sorted(unknown))}")
+        if args.aggregate or args.follow:
+            sys.exit("--group-by cannot be combined with --aggregate or --follow")
+
+    if args.follow or args.once:
+        if args.aggregate:
+            sys.exit("--aggregate cannot be combined with --follow/--once")
+        rows = follow(host, token, warehouse_id, args.state, limit=args.limit,
+                      interval=args.interval, once=args.once, settle=args.settle, boundaries=True,
+                      where_extra=args.where, since=args.since, until=args.until,
+                      privilege_only=not args.all_failures, statement_text=args.statement_text,
+                      max_wait_secs=args.timeout, wait_timeout=args.wait_timeout, workers=args.workers)
+        records = enrich_stream(rows, args.processes)
+        if not group_by:
+            try:
+                write_records(records, sys.stdout, "ndjson", flush=True)
+            except KeyboardInterrupt:
+                pass
+            return
+    else:
+        sql = build_sql(args.limit, args.where, since=args.since, until=args.until,
+                        privilege_only=not args.all_failures, statement_text=args.statement_text,
+                        aggregate=args.aggregate)
+        if args.show_sql:
+            print("-- SQL to be executed:\n", sql, file=sys.stderr)
+
+        rows = execute_sql_and_stream(host, token, warehouse_id, sql,
+                                      max_wait_secs=args.timeout, wait_timeout=args.wait_timeout,
+                                      workers=args.workers, coerce=args.aggregate)
+        if args.aggregate:
+            write_records(rows, sys.stdout, args.format)
+            return
+        records = enrich_stream(rows, args.processes)
+
+    if not group_by:
+        write_records(records, sys.stdout, args.format)
+        return
+    rollup = Rollup(group_by, max_groups=args.max_groups, samples=args.samples).update(records)
+    if not rollup.exact:
+        print(f"dlux: more than {args.max_groups} groups; counts are lower bounds "
+              f"(see count_error)", file=sys.stderr)
+    write_records(rollup.groups(), sys.stdout, args.format)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,94 @@
+"""
+One-pass rollup of dlux records.
+
+    rollup = Rollup(["executed_by", "resource_hint"])
+    for record in records:
+        rollup.add(record)
+    rollup.groups()  # most frequent first
+
+Each group keeps a count, first and last end_time and the first few
+statement ids.  Memory is bounded by ``max_groups``: while there are fewer
+groups every count is exact.  Past that the table is pruned, Misra-Gries
+style, by dropping the less frequent half.  A group seen again later starts
+over, so its count may be short by as much as was dropped before it came
+back.  ``count_error`` on each group is that bound and is 0 for exact
+counts.  Frequent groups survive pruning; rare ones may not appear at all.
+"""
+
+__all__ = ["Rollup", "MAX_GROUPS", "SAMPLES"]
+
+MAX_GROUPS = 100_000
+SAMPLES = 3
+
+# positions in a group's state list
+_COUNT, _ERROR, _FIRST, _LAST, _SAMPLES = range(5)
+
+
+class Rollup:
+    def __init__(self, keys, max_groups: int = MAX_GROUPS, samples: int = SAMPLES,
+                 time_key: str = "end_time", id_key: str = "statement_id"):
+        if not keys:
+            raise ValueError("Rollup needs at least one key")
+        self.keys = list(keys)
+        self.max_groups = max(2, max_groups)
+        self.samples = samples
+        self.time_key = time_key
+        self.id_key = id_key
+        self.records = 0
+        self.error = 0  # undercount a group inserted now may already have
+        self._groups = {}
+
+    def add(self, record: dict) -> None:
+        self.records += 1
+        key = tuple(record.get(k) for k in self.keys)
+        seen = record.get(self.time_key)
+        state = self._groups.get(key)
+        if state is None:
+            if len(self._groups) >= self.max_groups:
+                self._prune()
+            sid = record.get(self.id_key)
+            self._groups[key] = [1, self.error, seen, seen, [sid] if self.samples and sid is not None else []]
+            return
+        state[_COUNT] += 1
+        if seen is not None:
+            if state[_FIRST] is None or seen < state[_FIRST]:
+                state[_FIRST] = seen
+            if state[_LAST] is None or seen > state[_LAST]:
+                state[_LAST] = seen
+        if len(state[_SAMPLES]) < self.samples:
+            sid = record.get(self.id_key)
+            if sid is not None:
+                state[_SAMPLES].append(sid)
+
+    def update(self, records) -> "Rollup":
+        for record in records:
+            self.add(record)
+        return self
+
+    def _prune(self):
+        """Drop every group at or below the median count."""
+        counts = sorted(state[_COUNT] for state in self._groups.values())
+        threshold = counts[len(counts) // 2]
+        self._groups = {k: s for k, s in self._groups.items() if s[_COUNT] > threshold}
+        self.error += threshold
+
+    @property
+    def exact(self) -> bool:
+        return self.error == 0
+
+    def groups(self, limit: int | None = None) -> list[dict]:
+        ordered = sorted(self._groups.items(), key=lambda kv: -kv[1][_COUNT])
+        if limit is not None:
+            ordered = ordered[:limit]
+        out = []
+        for key, state in ordered:
+            group = dict(zip(self.keys, key))
+            group.update({
+                "count": state[_COUNT],
+                "count_error": state[_ERROR],
+                "first_seen": state[_FIRST],
+                "last_seen": state[_LAST],
+                "sample_statement_ids": list(state[_SAMPLES]),
+            })
+            out.append(group)
+        return out
@@ -1,28 +1,46 @@
 
 from os import environ
 import json
+import urllib.error
 import urllib.parse
 import urllib.request
 import time
 from tbd.models import ImpactReport
+from tbd.trace import span, endpoint as endpoint_name
+
+# Throttled or briefly unavailable calls are retried with backoff.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRIES = 3
+RETRY_DELAY = 0.5
 
 # -------------------------
 # Databricks API Functions
 # -------------------------
 
-def api_get(host, token, endpoint, params=None):
+def api_get(host, token, endpoint, params=None, retries=RETRIES):
     """Helper to call Databricks REST API with bearer token."""
     url = f"{host}{endpoint}"
     if params:
         url += "?" + urllib.parse.urlencode(params)
     req = urllib.request.Request(url)
     req.add_header("Authorization", f"Bearer {token}")
-    try:
-        with urllib.request.urlopen(req) as response:
-            return json.loads(response.read().decode())
-    except Exception as e:
-        print(f"[WARN] Error calling {url}: {e}")
-        return {}
+    for attempt in range(retries + 1):
+        try:
+            with span(f"http GET {endpoint_name(endpoint)}", attempt=attempt) as s, \
+                    urllib.request.urlopen(req) as response:
+                s["status"] = response.status
+                return json.loads(response.read().decode())
+        except urllib.error.HTTPError as e:
+            if e.code in RETRY_STATUSES and attempt < retries:
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                time.sleep(float(retry_after) if retry_after and retry_after.isdigit()
+                           else RETRY_DELAY * 2 ** attempt)
+                continue
+            print(f"[WARN] Error calling {url}: {e}")
+            return {}
+        except Exception as e:
+            print(f"[WARN] Error calling {url}: {e}")
+            return {}
 
 def get_table_metadata(host, token, full_name):
     """Fetch owner, created_by, updated_by (if available) for a table."""
@@ -54,39 +72,57 @@ def get_downstream(host, token, full_name):
     return downstream_objs
 
 def list_tables_in_schema(host, token, catalog, schema):
-    """List all tables in the specified schema."""
-    resp = api_get(host, token, "/api/2.1/unity-catalog/tables", {
-        "catalog_name": catalog,
-        "schema_name": schema
-    })
-    return [t["full_name"] for t in resp.get("tables", [])]
+    """List all tables in the specified schema, following next_page_token."""
+    params = {"catalog_name": catalog, "schema_name": schema}
+    tables = []
+    while True:
+        resp = api_get(host, token, "/api/2.1/unity-catalog/tables", params)
+        tables.extend(t["full_name"] for t in resp.get("tables", []))
+        if not resp.get("next_page_token"):
+            return tables
+        params["page_token"] = resp["next_page_token"]
 
 # -------------------------
 # Recursive Traversal Logic
 # -------------------------
 
-def traverse_downstream(host, token, root_table, visited, graph, depth=0, delay=0.2):
-    """Recursively walk all downstream dependencies."""
-    if root_table in visited:
-        return
-    visited.add(root_table)
-
-    print("  " * depth + f"↳ {root_table}")
-    metadata = get_table_metadata(host, token, root_table)
-    graph[root_table] = {"metadata": metadata, "downstream": []}
+def traverse_downstream(host, token, root_table, visited, graph, depth=0, delay=0.2, writers=()):
+    """Walk all downstream dependencies, depth first.
 
-    downstream_objs = get_downstream(host, token, root_table)
-    graph[root_table]["downstream"] = downstream_objs
-
-    for dep in downstream_objs:
-        time.sleep(delay)
-        traverse_downstream(host, token, dep, visited, graph, depth + 1)
-
-
-def impact(catalog, schema, host=None, token=None, delay=0.2, output="downstream_dependencies.json"):
+    Each node is handed to ``writers`` as soon as it is crawled; pass
+    ``graph=None`` to stream only and keep nothing but ``visited``.
+    An explicit stack rather than recursion, so long lineage chains
+    cannot hit the recursion limit.
+    """
+    stack = [(root_table, depth)]
+    while stack:
+        table, level = stack.pop()
+        if level > depth and delay:
+            with span("sleep"):
+                time.sleep(delay)
+        if table in visited:
+            continue
+        visited.add(table)
+
+        print("  " * level + f"↳ {table}")
+        metadata = get_table_metadata(host, token, table)
+        downstream_objs = get_downstream(host, token, table)
+        node = {"metadata": metadata, "downstream": downstream_objs}
+        if graph is not None:
+            graph[table] = node
+        for writer in writers:
+            writer.write(table, node)
+
+        stack.extend((dep, level + 1) for dep in reversed(downstream_objs))
+
+
+def impact(catalog, schema, host=None, token=None, delay=0.2, output="downstream_dependencies.json",
+           writers=(), collect=True):
     """tbd API
 
-    TODO: memory issues
+    :param writers: tbd.models.writers to stream nodes into while crawling
+    :param collect: keep the graph in the returned ImpactReport; turn off
+        when ``writers`` are all that is needed
     """
     if host is None:
         host = environ["DATABRICKS_HOST"]
@@ -99,11 +135,11 @@ def impact(catalog, schema, host=None, token=None, delay=0.2, output="downstream
         print("No tables found in this schema.")
         return
 
-    graph = {}
+    graph = {} if collect else None
     visited = set()
 
     for tbl in tables:
-        traverse_downstream(host, token, tbl, visited, graph, delay=delay)
+        traverse_downstream(host, token, tbl, visited, graph, delay=delay, writers=writers)
 
-    ir = ImpactReport(graph)
+    ir = ImpactReport(graph if collect else {})
     return ir
\ No newline at end of file
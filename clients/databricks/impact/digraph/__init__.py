@@ -0,0 +1,144 @@
+"""
+Slice a lineage graph around a few datasets and draw only that slice.
+
+Works on a tbd.models.LineageGraph, so no networkx is needed and the cost
+is proportional to the neighbourhood, not the whole graph.  Layout is
+layered by signed hop distance from the chosen nodes: upstream to the
+left, downstream to the right.
+"""
+from xml.sax.saxutils import escape
+
+DIRECTIONS = ("up", "down", "both")
+NO_OWNER = "(no owner)"
+
+
+def neighbourhood(graph, seeds, hops=2, direction="both"):
+    """
+    k-hop slice around ``seeds``.
+
+    :return: dict of dataset -> layer (0 for seeds, -k upstream, +k downstream)
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of {DIRECTIONS}")
+    layers = {s: 0 for s in seeds}
+    if direction in ("down", "both"):
+        for name, depth in graph.blast_radius(*seeds, max_depth=hops).items():
+            layers.setdefault(name, depth)
+    if direction in ("up", "both"):
+        for name, depth in graph.ancestry(*seeds, max_depth=hops).items():
+            layers.setdefault(name, -depth)
+    return layers
+
+
+def subgraph_edges(graph, nodes):
+    for u in nodes:
+        for v in graph.successors(u):
+            if v in nodes:
+                yield u, v
+
+
+def group_key(graph, name, by):
+    if by == "schema":
+        return name.rsplit(".", 1)[0] if "." in name else name
+    if by == "owner":
+        return graph.metadata(name).get("owner") or NO_OWNER
+    raise ValueError(f"Cannot collapse by {by}")
+
+
+def collapse(graph, layers, by, keep=()):
+    """
+    Merge nodes into one super-node per schema or owner.  Nodes in ``keep``
+    (normally the seeds) stay as they are.
+
+    :return: (layers, edges, sizes) for the collapsed graph
+    """
+    keep = set(keep)
+    mapping = {}
+    for name in layers:
+        mapping[name] = name if name in keep else f"[{group_key(graph, name, by)}]"
+
+    new_layers, sizes = {}, {}
+    for name, layer in layers.items():
+        g = mapping[name]
+        sizes[g] = sizes.get(g, 0) + 1
+        # a group sits on the layer of its member closest to the seeds
+        if g not in new_layers or abs(layer) < abs(new_layers[g]):
+            new_layers[g] = layer
+
+    edges = []
+    seen = set()
+    for u, v in subgraph_edges(graph, layers):
+        e = mapping[u], mapping[v]
+        if e[0] != e[1] and e not in seen:
+            seen.add(e)
+            edges.append(e)
+    return new_layers, edges, sizes
+
+
+def _label(name, sizes):
+    n = (sizes or {}).get(name, 1)
+    return f"{name} ({n})" if n > 1 else name
+
+
+def to_dot(layers, edges, seeds=(), sizes=None):
+    """Graphviz source, one rank per layer."""
+    def q(s):
+        return '"' + s.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+    lines = [
+        "digraph lineage {",
+        "  rankdir=LR;",
+        "  node [shape=box, fontsize=10];",
+    ]
+    by_layer = {}
+    for name, layer in layers.items():
+        by_layer.setdefault(layer, []).append(name)
+    for layer in sorted(by_layer):
+        members = "; ".join(q(n) for n in sorted(by_layer[layer]))
+        lines.append(f"  {{ rank=same; {members}; }}")
+    for name in sorted(layers):
+        attrs = f"label={q(_label(name, sizes))}"
+        if name in seeds:
+            attrs += ", style=bold"
+        lines.append(f"  {q(name)} [{attrs}];")
+    for u, v in edges:
+        lines.append(f"  {q(u)} -> {q(v)};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def to_svg(layers, edges, seeds=(), sizes=None, col_w=260, row_h=28, box_w=220):
+    """Self-contained SVG of the layered slice, no graphviz required."""
+    by_layer = {}
+    for name, layer in layers.items():
+        by_layer.setdefault(layer, []).append(name)
+    lo = min(by_layer) if by_layer else 0
+
+    pos = {}
+    rows = 0
+    for layer, names in by_layer.items():
+        for i, name in enumerate(sorted(names)):
+            pos[name] = (20 + (layer - lo) * col_w, 20 + i * row_h)
+        rows = max(rows, len(names))
+    width = 40 + (len(by_layer) - 1) * col_w + box_w if by_layer else 40
+    height = 40 + rows * row_h
+
+    box_h = row_h - 8
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="sans-serif" font-size="10">',
+        '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" '
+        'markerWidth="6" markerHeight="6" orient="auto">'
+        '<path d="M0,0 L10,5 L0,10 z"/></marker></defs>',
+    ]
+    for u, v in edges:
+        (x1, y1), (x2, y2) = pos[u], pos[v]
+        out.append(f'<line x1="{x1 + box_w}" y1="{y1 + box_h / 2}" x2="{x2}" y2="{y2 + box_h / 2}" '
+                   f'stroke="#888" marker-end="url(#arrow)"/>')
+    for name, (x, y) in pos.items():
+        weight = ' font-weight="bold"' if name in seeds else ""
+        out.append(f'<rect x="{x}" y="{y}" width="{box_w}" height="{box_h}" fill="#fff" stroke="#333"/>')
+        out.append(f'<text x="{x + 4}" y="{y + box_h - 6}"{weight}>'
+                   f'{escape(_label(name, sizes)[:40])}</text>')
+    out.append("</svg>")
+    return "\n".join(out) + "\n"
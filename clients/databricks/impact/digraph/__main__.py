@@ -2,6 +2,9 @@
 """
 Build a dependency graph from a JSON node dict and export a CSV (and optional PNG).
 
+For large graphs pick a few nodes with --node and export only their k-hop
+neighbourhood as DOT or SVG (--dot/--svg); see the package docstring.
+
 JSON format (example):
 {
   "node.name": {
@@ -23,7 +26,14 @@ import csv
 import os
 from typing import Dict, Any, List, Optional
 
-import networkx as nx
+from tbd.impact import load_graph
+from . import DIRECTIONS, neighbourhood, subgraph_edges, collapse, to_dot, to_svg
+
+# Only needed for the whole-graph CSV/PNG export
+try:
+    import networkx as nx
+except ImportError:
+    nx = None
 
 # Only used if you pass --png; kept optional so the script works without it
 try:
@@ -33,8 +43,10 @@ except Exception:
     _HAS_MPL = False
 
 
-def build_graph(nodes: Dict[str, Any]) -> nx.DiGraph:
+def build_graph(nodes: Dict[str, Any]) -> "nx.DiGraph":
     """Build a DiGraph from the node dict."""
+    if nx is None:
+        raise RuntimeError("networkx is not available. Install it or export a slice with --node.")
     G = nx.DiGraph()
     for node, payload in nodes.items():
         if not isinstance(payload, dict):
@@ -70,7 +82,7 @@ def build_graph(nodes: Dict[str, Any]) -> nx.DiGraph:
     return G
 
 
-def dependencies_to_rows(G: nx.DiGraph) -> List[Dict[str, Optional[str]]]:
+def dependencies_to_rows(G: "nx.DiGraph") -> List[Dict[str, Optional[str]]]:
     """Convert graph edges (and isolated nodes) into CSV rows."""
     rows: List[Dict[str, Optional[str]]] = []
     for u, v in G.edges():
@@ -103,6 +115,43 @@ def dependencies_to_rows(G: nx.DiGraph) -> List[Dict[str, Optional[str]]]:
     return rows
 
 
+def slice_to_rows(graph, layers) -> List[Dict[str, Optional[str]]]:
+    """CSV rows for a neighbourhood slice of a LineageGraph."""
+    rows: List[Dict[str, Optional[str]]] = []
+    linked = set()
+    for u, v in subgraph_edges(graph, layers):
+        linked.update((u, v))
+        rows.append({"node": u, "downstream": v, **graph.metadata(u)})
+    for n in layers:
+        if n not in linked:
+            rows.append({"node": n, "downstream": None, **graph.metadata(n)})
+    return rows
+
+
+def write_slice(args) -> None:
+    graph = load_graph(args.json_path)
+    layers = neighbourhood(graph, args.nodes, hops=args.hops, direction=args.direction)
+    print(f"Slice: {len(layers)} of {len(graph)} nodes")
+
+    if args.csv_path:
+        rows = slice_to_rows(graph, layers)
+        write_csv(rows, args.csv_path)
+        print(f"Wrote CSV: {os.path.abspath(args.csv_path)}  (rows: {len(rows)})")
+
+    sizes = None
+    if args.collapse:
+        layers, edges, sizes = collapse(graph, layers, args.collapse, keep=args.nodes)
+    else:
+        edges = list(subgraph_edges(graph, layers))
+
+    for path, render in ((args.dot_path, to_dot), (args.svg_path, to_svg)):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(render(layers, edges, seeds=set(args.nodes), sizes=sizes))
+            print(f"Wrote {render.__name__[3:].upper()}: {os.path.abspath(path)}")
+
+
 def write_csv(rows: List[Dict[str, Optional[str]]], csv_path: str) -> None:
     os.makedirs(os.path.dirname(os.path.abspath(csv_path)) or ".", exist_ok=True)
     fieldnames = ["node", "downstream", "owner", "created_by", "updated_by", "email"]
@@ -113,7 +162,7 @@ def write_csv(rows: List[Dict[str, Optional[str]]], csv_path: str) -> None:
             writer.writerow(r)
 
 
-def render_png(G: nx.DiGraph, png_path: str) -> None:
+def render_png(G: "nx.DiGraph", png_path: str) -> None:
     """Render a simple spring-layout PNG of the graph (optional)."""
     if not _HAS_MPL:
         raise RuntimeError("matplotlib is not available. Install it or run without --png.")
@@ -142,11 +191,26 @@ def render_png(G: nx.DiGraph, png_path: str) -> None:
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Export dependency CSV (and optional PNG) from a node JSON.")
-    parser.add_argument("json_path", help="Path to the JSON file.")
-    parser.add_argument("--csv", dest="csv_path", default="dependencies.csv", help="Output CSV path. Default: dependencies.csv")
+    parser.add_argument("json_path", help="Path to the JSON file (or a saved LineageGraph).")
+    parser.add_argument("--csv", dest="csv_path", default=None, help="Output CSV path. Default: dependencies.csv, or none for a slice")
     parser.add_argument("--png", dest="png_path", default=None, help="Optional PNG output path to render the graph.")
+    parser.add_argument("--node", dest="nodes", action="append", default=[], help="Slice around this node (repeatable).")
+    parser.add_argument("--hops", type=int, default=2, help="Neighbourhood size for --node. Default: 2")
+    parser.add_argument("--direction", choices=DIRECTIONS, default="both", help="Follow edges up, down or both. Default: both")
+    parser.add_argument("--collapse", choices=["owner", "schema"], default=None, help="Merge non-selected nodes into one node per owner or schema.")
+    parser.add_argument("--dot", dest="dot_path", default=None, help="Write the slice as Graphviz DOT.")
+    parser.add_argument("--svg", dest="svg_path", default=None, help="Write the slice as a layered SVG.")
     args = parser.parse_args()
 
+    if args.dot_path or args.svg_path or args.nodes:
+        if not args.nodes:
+            parser.error("--dot/--svg need at least one --node")
+        if args.png_path:
+            parser.error("--png draws the whole graph; use --svg for a slice")
+        write_slice(args)
+        return
+    args.csv_path = args.csv_path or "dependencies.csv"
+
     # Load JSON
     with open(args.json_path, "r", encoding="utf-8") as f:
         nodes = json.load(f)
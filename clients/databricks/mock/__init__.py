@@ -0,0 +1,311 @@
+"""
+Local stand-in for the Databricks REST APIs the clients use, for tests and
+benchmarks.  Stdlib only.
+
+    workspace = MockWorkspace(runtime=lambda sql: 0.5)
+    with serve(workspace) as host:
+        query.start_statement(host, "token", "wh", "SELECT 1", None, None)
+
+SQL Statement Execution: statements "run" for ``runtime(sql)`` seconds;
+``results(sql)`` supplies (columns, rows) once they succeed.
+``wait_timeout`` and cancel behave as the real API does.
+
+Unity Catalog tables and table lineage are served from ``lineage``, a dict
+of full table name -> downstream full names, e.g. from synthetic_lineage.
+Table listings are paged ``page_size`` at a time when set.
+
+Every request first waits ``latency`` seconds (a number, or a function of
+method and path) and then fails with ``error_status`` with probability
+``error_rate``.  Server-side handling times are kept per endpoint in
+``timings``.
+"""
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_BASE = "/api/2.0/sql/statements"
+TABLES_API = "/api/2.1/unity-catalog/tables"
+LINEAGE_API = "/api/2.0/lineage-tracking/table-lineage"
+
+
+def _no_runtime(statement):
+    return 0.0
+
+
+def _one_row(statement):
+    return [{"name": "1", "type_name": "INT", "position": 0}], [["1"]]
+
+
+def synthetic_lineage(tables: int, catalog: str = "main", schemas: int = 1, fanout: int = 3,
+                      window: int = 50, seed: int = 0) -> dict:
+    """
+    A random lineage DAG over ``tables`` tables spread across ``schemas``
+    schemas of ``catalog``.  Table i feeds up to ``fanout`` of the next
+    ``window`` tables, so depth grows with size as it does in real
+    warehouses; the last tables are sinks.
+
+    :return: {full name: [downstream full names]}
+    """
+    rnd = random.Random(seed)
+    names = [f"{catalog}.s{i % schemas}.t{i:06d}" for i in range(tables)]
+    lineage = {}
+    for i, name in enumerate(names):
+        later = names[i + 1:i + 1 + window]
+        lineage[name] = rnd.sample(later, min(len(later), rnd.randint(0, fanout)))
+    return lineage
+
+
+class MockWorkspace:
+    def __init__(self, runtime=None, results=None, chunk_rows=1000, lineage=None, page_size=None,
+                 latency=0.0, error_rate=0.0, error_status=503, seed=0):
+        self.runtime = runtime or _no_runtime
+        self.results = results or _one_row
+        self.chunk_rows = chunk_rows
+        self.lineage = lineage or {}
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.statements = {}
+        self.requests = 0
+        self.errors = 0
+        self.timings = defaultdict(list)  # endpoint -> server-side seconds per request
+        self.base_url = ""  # set by serve(), used for external links
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._schemas = defaultdict(list)
+        for name in self.lineage:
+            catalog, schema, _ = name.split(".")
+            self._schemas[catalog, schema].append(name)
+
+    # ---------- statements ----------
+
+    def submit(self, body):
+        statement_id = uuid.uuid4().hex
+        statement = body.get("statement", "")
+        st = {
+            "statement": statement,
+            "done_at": time.time() + self.runtime(statement),
+            "canceled": False,
+            "result": None,
+            "external": body.get("disposition") == "EXTERNAL_LINKS",
+        }
+        with self._lock:
+            self.statements[statement_id] = st
+
+        m = re.fullmatch(r"(\d+)s", body.get("wait_timeout", "10s"))
+        wait = int(m.group(1)) if m else 10
+        if wait:
+            time.sleep(max(0.0, min(st["done_at"], time.time() + wait) - time.time()))
+            if body.get("on_wait_timeout") == "CANCEL" and self._state(st) != "SUCCEEDED":
+                st["canceled"] = True
+        return self.status(statement_id)
+
+    def _state(self, st):
+        if st["canceled"]:
+            return "CANCELED"
+        if time.time() >= st["done_at"]:
+            return "SUCCEEDED"
+        return "RUNNING"
+
+    def _result(self, st):
+        if st["result"] is None:
+            columns, rows = self.results(st["statement"])
+            n = self.chunk_rows
+            chunks = [rows[i:i + n] for i in range(0, len(rows), n)] or [[]]
+            st["result"] = columns, chunks
+        return st["result"]
+
+    def _chunk(self, statement_id, chunks, idx):
+        offset = sum(len(c) for c in chunks[:idx])
+        chunk = {
+            "chunk_index": idx,
+            "row_offset": offset,
+            "row_count": len(chunks[idx]),
+        }
+        if idx + 1 < len(chunks):
+            chunk["next_chunk_index"] = idx + 1
+        if self.statements[statement_id]["external"]:
+            chunk["external_link"] = f"{self.base_url}/_links/{statement_id}/{idx}"
+            return {"external_links": [chunk]}
+        chunk["data_array"] = chunks[idx]
+        return chunk
+
+    def link(self, statement_id, idx):
+        """Body of an external link: the bare JSON array of rows."""
+        _, chunks = self._result(self.statements[statement_id])
+        return chunks[idx]
+
+    def status(self, statement_id):
+        st = self.statements[statement_id]
+        state = self._state(st)
+        resp = {"statement_id": statement_id, "status": {"state": state}}
+        if state == "SUCCEEDED":
+            columns, chunks = self._result(st)
+            resp["manifest"] = {
+                "format": "JSON_ARRAY",
+                "schema": {"column_count": len(columns), "columns": columns},
+                "total_chunk_count": len(chunks),
+                "total_row_count": sum(len(c) for c in chunks),
+                "chunks": [{"chunk_index": i, "row_count": len(c)} for i, c in enumerate(chunks)],
+            }
+            resp["result"] = self._chunk(statement_id, chunks, 0)
+        return resp
+
+    def chunk(self, statement_id, idx):
+        st = self.statements[statement_id]
+        _, chunks = self._result(st)
+        return self._chunk(statement_id, chunks, idx)
+
+    def cancel(self, statement_id):
+        st = self.statements[statement_id]
+        if self._state(st) == "RUNNING":
+            st["canceled"] = True
+        return {}
+
+    # ---------- unity catalog ----------
+
+    @staticmethod
+    def table_info(full_name):
+        catalog, schema, name = full_name.split(".")
+        owner = f"{schema}-owners@example.com"
+        return {"full_name": full_name, "catalog_name": catalog, "schema_name": schema,
+                "name": name, "table_type": "MANAGED", "owner": owner,
+                "created_by": f"creator.{name}@example.com", "updated_by": f"etl.{schema}@example.com"}
+
+    def list_tables(self, params):
+        names = self._schemas.get((params.get("catalog_name"), params.get("schema_name")), [])
+        start = int(params.get("page_token") or 0)
+        size = int(params.get("max_results") or self.page_size or len(names) or 1)
+        resp = {"tables": [self.table_info(n) for n in names[start:start + size]]}
+        if start + size < len(names):
+            resp["next_page_token"] = str(start + size)
+        return resp
+
+    def table_lineage(self, params):
+        name = urllib.parse.unquote(params.get("table_name", ""))
+        if params.get("direction", "DOWNSTREAM") != "DOWNSTREAM":
+            upstream = [n for n, down in self.lineage.items() if name in down]
+            return {"upstreams": [{"tableInfo": self._lineage_info(n)} for n in upstream]}
+        return {"downstreams": [{"tableInfo": self._lineage_info(n)} for n in self.lineage.get(name, [])]}
+
+    @staticmethod
+    def _lineage_info(full_name):
+        catalog, schema, name = full_name.split(".")
+        return {"catalog_name": catalog, "schema_name": schema, "name": name, "table_type": "TABLE"}
+
+    # ---------- routing ----------
+
+    @staticmethod
+    def endpoint(path):
+        """Coarse endpoint name a request is timed under."""
+        path = path.split("?", 1)[0]
+        if path.startswith(TABLES_API):
+            return "tables" if path == TABLES_API else "table"
+        if path.startswith(LINEAGE_API):
+            return "lineage"
+        if path.startswith("/_links/"):
+            return "link"
+        if "/result/chunks/" in path:
+            return "chunk"
+        return "statement" if path.startswith(API_BASE) else "other"
+
+    def _fault(self, method, path):
+        latency = self.latency(method, path) if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+        if self.error_rate:
+            with self._lock:
+                failed = self._random.random() < self.error_rate
+                self.errors += failed
+            if failed:
+                return self.error_status, {"error_code": "TEMPORARILY_UNAVAILABLE",
+                                           "message": "Injected failure"}
+        return None
+
+    def route(self, method, path, body):
+        """:return: (http status, json response)"""
+        fault = self._fault(method, path)
+        if fault:
+            return fault
+        path, _, qs = path.partition("?")
+        params = dict(urllib.parse.parse_qsl(qs))
+        if method == "GET" and path == TABLES_API:
+            return 200, self.list_tables(params)
+        if method == "GET" and path.startswith(TABLES_API + "/"):
+            name = urllib.parse.unquote(path[len(TABLES_API) + 1:])
+            if name not in self.lineage:
+                return 404, {"error_code": "TABLE_DOES_NOT_EXIST", "message": f"Table '{name}' does not exist."}
+            return 200, self.table_info(name)
+        if method == "GET" and path == LINEAGE_API:
+            return 200, self.table_lineage(params)
+        if method == "POST" and path == API_BASE:
+            return 200, self.submit(body)
+        m = re.fullmatch(r"/_links/([^/]+)/(\d+)", path)
+        if m and method == "GET" and m.group(1) in self.statements:
+            return 200, self.link(m.group(1), int(m.group(2)))
+        m = re.fullmatch(API_BASE + r"/([^/]+)(/cancel|/result/chunks/(\d+))?", path)
+        if m:
+            statement_id, tail, idx = m.groups()
+            if statement_id not in self.statements:
+                return 404, {"error_code": "NOT_FOUND", "message": f"No statement {statement_id}"}
+            if method == "GET" and tail is None:
+                return 200, self.status(statement_id)
+            if method == "POST" and tail == "/cancel":
+                return 200, self.cancel(statement_id)
+            if method == "GET" and idx is not None:
+                return 200, self.chunk(statement_id, int(idx))
+        return 404, {"error_code": "ENDPOINT_NOT_FOUND", "message": f"{method} {path}"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _handle(self, method):
+        workspace = self.server.workspace
+        started = time.perf_counter()
+        with workspace._lock:
+            workspace.requests += 1
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        code, resp = workspace.route(method, self.path, body)
+        data = json.dumps(resp).encode("utf-8")
+        elapsed = time.perf_counter() - started
+        with workspace._lock:
+            workspace.timings[workspace.endpoint(self.path)].append(elapsed)
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def serve(workspace=None, port=0):
+    """Run ``workspace`` on localhost in a background thread; yields the host URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.workspace = workspace or MockWorkspace()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.workspace.base_url = base_url
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield base_url
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+Databricks Statement Execution API (no external deps; pyarrow only for
+--result-format ARROW_STREAM)
+
+Env vars (required):
+  DATABRICKS_HOST           e.g. https://abc-12345.cloud.databricks.com
+  DATABRICKS_TOKEN          personal access token
+  DATABRICKS_WAREHOUSE_ID   SQL Warehouse ID
+Optional:
+  DATABRICKS_CATALOG
+  DATABRICKS_SCHEMA
+  QUERY                     SQL text (fallback if not passed as --query)
+  DATABRICKS_QUERY_CACHE    result cache directory; setting it turns --cache on
+
+Output (--format):
+  json     one document with columns and all rows (default)
+  ndjson   one JSON object per row, streamed
+  csv/tsv  header plus one line per row, streamed
+
+Results (--result-format):
+  JSON_ARRAY    inline JSON (default), or via EXTERNAL_LINKS with --disposition
+  ARROW_STREAM  EXTERNAL_LINKS, typed values, needs pyarrow
+  CSV           EXTERNAL_LINKS
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import time
+import random
+import argparse
+import urllib.parse
+import urllib.request
+import urllib.error
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import ResultCache, DEFAULT_DIR, DEFAULT_TTL, DEFAULT_MAX_BYTES
+from .rows import iter_dicts, iter_tuples
+from tbd.trace import span, endpoint
+
+# Only needed for ARROW_STREAM results
+try:
+    import pyarrow.ipc as pa_ipc
+    _HAS_ARROW = True
+except ImportError:
+    _HAS_ARROW = False
+
+API_BASE = "/api/2.0/sql/statements"
+
+# chunk prefetching defaults, see iter_chunks
+WORKERS = 4
+MAX_IN_FLIGHT = 8
+
+DISPOSITIONS = ("INLINE", "EXTERNAL_LINKS")
+RESULT_FORMATS = ("JSON_ARRAY", "ARROW_STREAM", "CSV")
+BATCH_ROWS = 4096  # rows per batch when decoding CSV links
+
+# Server-side wait on submit (the API allows 0 or 5-50 seconds), then
+# jittered exponential backoff between status polls.
+WAIT_TIMEOUT = 10
+POLL_INITIAL = 0.1
+POLL_FACTOR = 1.6
+POLL_MAX = 5.0
+
+TERMINAL_STATES = ("SUCCEEDED", "FAILED", "CANCELED", "CLOSED")
+
+
+def env(name: str, required: bool = True, default: str | None = None) -> str:
+    val = os.environ.get(name, default)
+    if required and not val:
+        sys.exit(f"Missing required env var: {name}")
+    return val
+
+
+def _headers(token: str) -> dict:
+    return {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+    }
+
+
+def _http_json(method: str, url: str, headers: dict, payload: dict | None = None) -> dict:
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers=headers, method=method.upper())
+    try:
+        with span(f"http {method.upper()} {endpoint(urllib.parse.urlsplit(url).path)}") as s, \
+                urllib.request.urlopen(req) as resp:
+            s["status"] = resp.status
+            body = resp.read()
+            return json.loads(body.decode("utf-8")) if body else {}
+    except urllib.error.HTTPError as e:
+        details = e.read().decode("utf-8") if e.fp else ""
+        msg = f"HTTP {e.code} {e.reason} for {url}\n{details}"
+        raise RuntimeError(msg) from None
+    except urllib.error.URLError as e:
+        raise RuntimeError(f"Network error for {url}: {e.reason}") from None
+
+
+def _download(url: str) -> bytes:
+    """GET a presigned external link; it must not carry the workspace token."""
+    try:
+        with span("http download") as s, urllib.request.urlopen(url) as resp:
+            s["status"] = resp.status
+            data = resp.read()
+            s["bytes"] = len(data)
+            return data
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(f"HTTP {e.code} {e.reason} downloading result link") from None
+    except urllib.error.URLError as e:
+        raise RuntimeError(f"Network error downloading result link: {e.reason}") from None
+
+
+def _wait_timeout(seconds: float) -> str:
+    """Clamp to what the API accepts: 0s, or 5s to 50s."""
+    seconds = int(seconds)
+    if seconds < 5:
+        return "0s"
+    return f"{min(seconds, 50)}s"
+
+
+def start_statement(host: str, token: str, warehouse_id: str, statement: str,
+                    catalog: str | None, schema: str | None,
+                    disposition: str | None = None, result_format: str | None = None,
+                    wait_timeout: float = WAIT_TIMEOUT) -> dict:
+    """
+    Submit a statement and return the API response.  With ``wait_timeout``
+    the server holds the request until the statement finishes or the wait
+    runs out, so short queries come back already SUCCEEDED.
+    """
+    url = f"{host}{API_BASE}"
+    payload: dict = {
+        "statement": statement,
+        "warehouse_id": warehouse_id,
+        "wait_timeout": _wait_timeout(wait_timeout),
+        "on_wait_timeout": "CONTINUE",
+        # INLINE + JSON_ARRAY are the API defaults; only sent when asked for.
+    }
+    if result_format and result_format != "JSON_ARRAY":
+        disposition = "EXTERNAL_LINKS"  # the only disposition for these formats
+    if disposition:
+        payload["disposition"] = disposition
+    if result_format:
+        payload["format"] = result_format
+    options: dict = {}
+    if catalog:
+        options["catalog"] = catalog
+    if schema:
+        options["schema"] = schema
+    if options:
+        payload["options"] = options
+
+    return _http_json("POST", url, _headers(token), payload)
+
+
+def submit_statement(host: str, token: str, warehouse_id: str, statement: str,
+                     catalog: str | None, schema: str | None, **kwargs) -> str:
+    return start_statement(host, token, warehouse_id, statement, catalog, schema, **kwargs)["statement_id"]
+
+
+def cancel_statement(host: str, token: str, statement_id: str) -> None:
+    _http_json("POST", f"{host}{API_BASE}/{statement_id}/cancel", _headers(token))
+
+
+def poll_delays(initial: float = POLL_INITIAL, factor: float = POLL_FACTOR, cap: float = POLL_MAX):
+    """Exponential backoff with jitter: each delay is drawn from [d/2, d]."""
+    delay = initial
+    while True:
+        yield random.uniform(delay / 2, delay)
+        delay = min(cap, delay * factor)
+
+
+def wait_for_done(host: str, token: str, statement_id: str, timeout_s: float = 600,
+                  poll_s: float | None = None, first: dict | None = None) -> dict:
+    """
+    Poll until the statement reaches a terminal state.
+
+    :param poll_s: fixed poll interval; by default polls back off from
+        POLL_INITIAL to POLL_MAX seconds
+    :param first: response from start_statement, returned as is when the
+        server-side wait already finished the statement
+    :raises TimeoutError: after cancelling the statement on the server
+    """
+    if first is not None and first.get("status", {}).get("state") in TERMINAL_STATES:
+        return first
+    url = f"{host}{API_BASE}/{statement_id}"
+    deadline = time.time() + timeout_s
+    delays = poll_delays() if poll_s is None else iter(lambda: poll_s, None)
+    state = "UNKNOWN"
+    try:
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                cancel_statement(host, token, statement_id)
+                raise TimeoutError(f"Timed out waiting for statement {statement_id} to finish "
+                                   f"(last state={state}); cancelled")
+            time.sleep(min(next(delays), remaining))
+            resp = _http_json("GET", url, _headers(token))
+            state = resp.get("status", {}).get("state", "UNKNOWN")
+            if state in TERMINAL_STATES:
+                return resp
+    except KeyboardInterrupt:
+        cancel_statement(host, token, statement_id)
+        raise
+
+
+def fetch_chunk(host: str, token: str, statement_id: str, chunk_index: int) -> dict:
+    url = f"{host}{API_BASE}/{statement_id}/result/chunks/{chunk_index}"
+    return _http_json("GET", url, _headers(token))
+
+
+def _prefetch(fetch, indices, sizes: dict,
+              workers: int, max_in_flight: int, max_bytes: int | None):
+    """
+    Run ``fetch(chunk_index)`` concurrently and yield the results in index order.
+
+    Futures wait in a FIFO (the reorder buffer) until their turn.  New
+    fetches start only while fewer than ``max_in_flight`` chunks, and (when
+    the manifest gives byte counts) fewer than ``max_bytes`` bytes, are
+    fetched but not yet consumed.
+    """
+    indices = iter(indices)
+    pending = deque()
+    buffered = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            while True:
+                while len(pending) < max_in_flight and (
+                        max_bytes is None or buffered < max_bytes or not pending):
+                    idx = next(indices, None)
+                    if idx is None:
+                        break
+                    size = sizes.get(idx, 0)
+                    pending.append((size, pool.submit(fetch, idx)))
+                    buffered += size
+                if not pending:
+                    return
+                size, future = pending.popleft()
+                buffered -= size
+                yield future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+_JSON_WS = " \t\r\n"
+
+
+def _json_array_batches(payload: bytes):
+    """
+    Decode a JSON_ARRAY link (``[[...], [...]]``, or a ``data_array``
+    object) one row at a time instead of building the whole list at once.
+    """
+    text = payload.decode("utf-8")
+    decoder = json.JSONDecoder()
+    pos = len(text) - len(text.lstrip(_JSON_WS))
+    if text.startswith("{", pos):
+        yield json.loads(text).get("data_array", [])
+        return
+    if not text.startswith("[", pos):
+        return
+    pos += 1
+    batch = []
+    while True:
+        while pos < len(text) and text[pos] in _JSON_WS + ",":
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            break
+        row, pos = decoder.raw_decode(text, pos)
+        batch.append(row)
+        if len(batch) >= BATCH_ROWS:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def decode_link(payload: bytes, result_format: str, col_names: list[str]):
+    """
+    Decode one downloaded external link into batches of row arrays.
+
+    CSV and ARROW_STREAM are decoded incrementally, one batch at a time.
+    """
+    match result_format:
+        case "ARROW_STREAM":
+            if not _HAS_ARROW:
+                raise RuntimeError("pyarrow is not available. Install it or use --result-format CSV.")
+            for batch in pa_ipc.open_stream(payload):
+                yield list(zip(*(col.to_pylist() for col in batch.columns)))
+        case "CSV":
+            reader = csv.reader(io.TextIOWrapper(io.BytesIO(payload), encoding="utf-8", newline=""))
+            batch = []
+            first = True
+            for row in reader:
+                if first:
+                    first = False
+                    if row == col_names:
+                        continue  # header
+                batch.append(row)
+                if len(batch) >= BATCH_ROWS:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        case _:
+            yield from _json_array_batches(payload)
+
+
+def _chunk_links(host: str, token: str, statement_id: str, chunk_index: int, known: dict) -> list[dict]:
+    if chunk_index in known:
+        return known[chunk_index]
+    return fetch_chunk(host, token, statement_id, chunk_index).get("external_links", [])
+
+
+def _iter_external(result_envelope: dict, host: str, token: str, statement_id: str,
+                   workers: int, max_in_flight: int, max_bytes: int | None):
+    first = result_envelope.get("result", {})
+    manifest = result_envelope.get("manifest", {})
+    result_format = manifest.get("format", "JSON_ARRAY")
+    col_names = [c.get("name") for c in result_columns(result_envelope)]
+
+    known: dict = {}
+    for link in first.get("external_links", []):
+        known.setdefault(link.get("chunk_index", 0), []).append(link)
+    start = min(known, default=0)
+
+    def fetch(chunk_index):
+        links = _chunk_links(host, token, statement_id, chunk_index, known)
+        return [_download(link["external_link"]) for link in links]
+
+    total = manifest.get("total_chunk_count")
+    if total is not None and workers > 1:
+        sizes = {c.get("chunk_index"): c.get("byte_count", 0) for c in manifest.get("chunks", [])}
+        for payloads in _prefetch(fetch, range(start, total), sizes, workers, max_in_flight, max_bytes):
+            for payload in payloads:
+                yield from decode_link(payload, result_format, col_names)
+        return
+
+    chunk_index = start if known else None
+    while chunk_index is not None:
+        links = _chunk_links(host, token, statement_id, chunk_index, known)
+        for link in links:
+            yield from decode_link(_download(link["external_link"]), result_format, col_names)
+        chunk_index = links[-1].get("next_chunk_index") if links else None
+
+
+def iter_chunks(result_envelope: dict, host: str, token: str, statement_id: str,
+                workers: int = WORKERS, max_in_flight: int = MAX_IN_FLIGHT,
+                max_bytes: int | None = None):
+    """
+    Yields batches of row arrays in result order.  Inline results yield one
+    batch per chunk, starting with the inline first chunk; EXTERNAL_LINKS
+    results yield the decoded batches of each downloaded link.
+
+    When the manifest advertises total_chunk_count the remaining chunks are
+    prefetched by ``workers`` threads; otherwise next_chunk_index is followed
+    one request at a time.
+    """
+    first = result_envelope.get("result", {})
+    if "external_links" in first:
+        yield from _iter_external(result_envelope, host, token, statement_id,
+                                  workers, max_in_flight, max_bytes)
+        return
+
+    yield first.get("data_array", [])
+
+    manifest = result_envelope.get("manifest", {})
+    total = manifest.get("total_chunk_count")
+    if total is not None and workers > 1:
+        start = first.get("chunk_index", 0) + 1
+        sizes = {c.get("chunk_index"): c.get("byte_count", 0) for c in manifest.get("chunks", [])}
+
+        def fetch(chunk_index):
+            return fetch_chunk(host, token, statement_id, chunk_index).get("data_array", [])
+
+        yield from _prefetch(fetch, range(start, total), sizes, workers, max_in_flight, max_bytes)
+        return
+
+    next_chunk = first.get("next_chunk_index", result_envelope.get("next_chunk_index"))
+    while next_chunk is not None:
+        chunk = fetch_chunk(host, token, statement_id, next_chunk)
+        yield chunk.get("data_array", [])
+        next_chunk = chunk.get("next_chunk_index")
+
+
+def result_columns(result_envelope: dict) -> list[dict]:
+    return result_envelope.get("manifest", {}).get("schema", {}).get("columns", [])
+
+
+def rows_from_chunks(columns: list[dict], chunks, coerce: bool = False, result_format: str | None = None):
+    """
+    Rows as dicts (col_name -> value) from batches of row arrays.  See
+    rows.iter_tuples and rows.iter_columns for leaner representations.
+    """
+    if coerce:
+        return iter_dicts(columns, chunks, coerce=True, result_format=result_format)
+    col_names = [c.get("name") for c in columns]
+    return (dict(zip(col_names, arr)) for data in chunks for arr in data)
+
+
+def iter_rows(result_envelope: dict, host: str, token: str, statement_id: str, **prefetch):
+    """
+    Yields rows as dicts (col_name -> value), a bounded number of chunks in
+    memory at a time.  ``prefetch`` is passed on to iter_chunks.
+    """
+    return rows_from_chunks(result_columns(result_envelope),
+                            iter_chunks(result_envelope, host, token, statement_id, **prefetch))
+
+
+def collect_rows(result_envelope: dict, host: str, token: str, statement_id: str,
+                 **prefetch) -> tuple[list[dict], list[dict]]:
+    """
+    Returns (rows, columns), where:
+      - rows is a list of dicts (col_name -> value)
+      - columns is the raw schema column list from the API
+    """
+    rows = list(iter_rows(result_envelope, host, token, statement_id, **prefetch))
+    return rows, result_columns(result_envelope)
+
+
+def rows_for_format(columns: list[dict], chunks, fmt: str, coerce: bool = False,
+                    result_format: str | None = None):
+    """
+    Tuples for csv/tsv, which need no names per row; dicts otherwise.
+    ``result_format`` is the wire format, which decides how NULLs look.
+    """
+    if fmt in ("csv", "tsv"):
+        return iter_tuples(columns, chunks, coerce=coerce, result_format=result_format)
+    return rows_from_chunks(columns, chunks, coerce=coerce, result_format=result_format)
+
+
+def write_rows(rows, columns: list[dict], out, fmt: str = "ndjson") -> int:
+    """
+    Stream rows (dicts or tuples in column order) to a text file object in
+    ndjson, csv or tsv.  Coerced values JSON can't encode are written as str.
+
+    :return: number of rows written
+    """
+    col_names = [c.get("name") for c in columns]
+    count = 0
+    if fmt == "ndjson":
+        for row in rows:
+            if not isinstance(row, dict):
+                row = dict(zip(col_names, row))
+            out.write(json.dumps(row, separators=(",", ":"), default=str) + "\n")
+            count += 1
+    elif fmt in ("csv", "tsv"):
+        writer = csv.writer(out, delimiter="," if fmt == "csv" else "\t", lineterminator="\n")
+        writer.writerow(col_names)
+        for row in rows:
+            writer.writerow([row.get(c) for c in col_names] if isinstance(row, dict) else row)
+            count += 1
+    else:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    return count
+
+
+def write_result(statement_id: str, columns: list[dict], rows, out, fmt: str = "json") -> int:
+    """
+    write_rows, plus the "json" format: a single document with the
+    statement id, columns and all rows (which are held in memory).
+    """
+    if fmt != "json":
+        return write_rows(rows, columns, out, fmt)
+    rows = list(rows)
+    doc = {
+        "statement_id": statement_id,
+        "state": "SUCCEEDED",
+        "row_count": len(rows),
+        "columns": columns,   # includes names & types
+        "rows": rows,
+    }
+    out.write(json.dumps(doc, indent=2, default=str) + "\n")
+    return len(rows)
+
+
+def execute(host: str, token: str, warehouse_id: str, statement: str,
+            catalog: str | None, schema: str | None, cache: ResultCache | None = None,
+            timeout: float = 600, wait_timeout: float = WAIT_TIMEOUT,
+            disposition: str | None = None, result_format: str | None = None, **prefetch):
+    """
+    Run one statement to completion, or serve it from ``cache``.
+
+    :return: (statement_id, columns, chunks) with chunks yielding batches of
+             row arrays; rows are fetched (and cached) as chunks is consumed
+    :raises RuntimeError: when the statement does not succeed
+    """
+    key = cache.key(statement, warehouse_id, catalog, schema, result_format) if cache else None
+    hit = cache.get(key) if cache else None
+    if hit:
+        header, chunks = hit
+        print(f"{header['statement_id']}: cached result", file=sys.stderr)
+        return header["statement_id"], header["columns"], chunks
+
+    started = time.time()
+    first = start_statement(host, token, warehouse_id, statement, catalog, schema,
+                            disposition=disposition, result_format=result_format,
+                            wait_timeout=min(wait_timeout, timeout))
+    stmt_id = first["statement_id"]
+    status = wait_for_done(host, token, stmt_id, first=first,
+                           timeout_s=timeout - (time.time() - started))
+
+    state = status.get("status", {}).get("state")
+    if state != "SUCCEEDED":
+        err = status.get("status", {}).get("error", {})
+        message = err.get("message") or json.dumps(err)
+        raise RuntimeError(f"Statement {stmt_id} ended in state {state}: {message}")
+
+    columns = result_columns(status)
+    chunks = iter_chunks(status, host, token, stmt_id, **prefetch)
+    if cache:
+        chunks = cache.store(key, columns, chunks, stmt_id)
+    return stmt_id, columns, chunks
+
+
+def _open_output(path: str | None):
+    if path is None:
+        return open(sys.stdout.fileno(), "w", encoding="utf-8", newline="", closefd=False)
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a SELECT via Databricks Statement Execution API (stdlib only).")
+    parser.add_argument("--query", help="SQL to execute (defaults to QUERY env var)")
+    parser.add_argument("--timeout", type=int, default=600,
+                        help="Timeout in seconds, the statement is cancelled after it (default: 600)")
+    parser.add_argument("--wait-timeout", type=int, default=WAIT_TIMEOUT,
+                        help=f"Seconds the server may hold the submit request, 0 or 5-50 (default: {WAIT_TIMEOUT})")
+    parser.add_argument("--format", choices=["json", "ndjson", "csv", "tsv"], default="json",
+                        help="Output format (default: json). ndjson/csv/tsv stream row by row")
+    parser.add_argument("--output", default=None, help="Write results to this file instead of stdout")
+    parser.add_argument("--disposition", choices=DISPOSITIONS, default=None,
+                        help="Result disposition (default: INLINE; EXTERNAL_LINKS for large extracts)")
+    parser.add_argument("--result-format", choices=RESULT_FORMATS, default=None,
+                        help="Wire format of results; ARROW_STREAM and CSV imply EXTERNAL_LINKS")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help=f"Concurrent chunk downloads (default: {WORKERS}, 1 disables prefetch)")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT,
+                        help=f"Max chunks fetched ahead of the writer (default: {MAX_IN_FLIGHT})")
+    parser.add_argument("--max-in-flight-mb", type=float, default=None,
+                        help="Max MB fetched ahead of the writer, when the manifest reports sizes")
+    parser.add_argument("--cache", action="store_true", default=bool(os.environ.get("DATABRICKS_QUERY_CACHE")),
+                        help="Reuse results of identical queries from a local cache")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="Always run the statement, even if DATABRICKS_QUERY_CACHE is set")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL,
+                        help=f"Seconds a cached result stays valid (default: {DEFAULT_TTL})")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / 2**20,
+                        help=f"Cache size before least recently used results are dropped (default: {DEFAULT_MAX_BYTES // 2**20})")
+    parser.add_argument("--coerce", action="store_true",
+                        help="Convert values to the column types in the result schema (ints, decimals, timestamps)")
+    parser.add_argument("--batch", default=None,
+                        help="Run every ;-separated statement in this file ('-' for stdin) concurrently")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Statements in flight at once with --batch (default: 4)")
+    parser.add_argument("--output-dir", default=".",
+                        help="Directory for per-statement outputs with --batch (default: .)")
+    args = parser.parse_args()
+
+    host = env("DATABRICKS_HOST")
+    token = env("DATABRICKS_TOKEN")
+    warehouse_id = env("DATABRICKS_WAREHOUSE_ID")
+    catalog = os.environ.get("DATABRICKS_CATALOG")
+    schema = os.environ.get("DATABRICKS_SCHEMA")
+    statement = args.query or env("QUERY", required=False)
+    if not statement and not args.batch:
+        statement = sys.stdin.read()
+
+    # normalize host (no trailing slash)
+    host = host.rstrip("/")
+
+    cache = None
+    if args.cache:
+        cache = ResultCache(os.environ.get("DATABRICKS_QUERY_CACHE") or DEFAULT_DIR,
+                            ttl=args.cache_ttl, max_bytes=int(args.cache_max_mb * 2**20))
+
+    try:
+        prefetch = {
+            "workers": args.workers,
+            "max_in_flight": args.max_in_flight,
+            "max_bytes": None if args.max_in_flight_mb is None else int(args.max_in_flight_mb * 2**20),
+        }
+        if args.batch:
+            from .batch import read_statements, run_batch
+            results = run_batch(read_statements(args.batch), host, token, warehouse_id, catalog, schema,
+                                out_dir=args.output_dir, fmt=args.format, concurrency=args.concurrency,
+                                coerce=args.coerce,
+                                cache=cache, timeout=args.timeout, wait_timeout=args.wait_timeout,
+                                disposition=args.disposition, result_format=args.result_format, **prefetch)
+            if any(r["error"] for r in results):
+                sys.exit(1)
+            return
+
+        stmt_id, columns, chunks = execute(host, token, warehouse_id, statement, catalog, schema,
+                                           cache=cache, timeout=args.timeout, wait_timeout=args.wait_timeout,
+                                           disposition=args.disposition, result_format=args.result_format,
+                                           **prefetch)
+        rows = rows_for_format(columns, chunks, args.format, coerce=args.coerce,
+                               result_format=args.result_format)
+        with _open_output(args.output) as fp:
+            count = write_result(stmt_id, columns, rows, fp, args.format)
+        if args.format != "json":
+            print(f"{stmt_id}: {count} rows", file=sys.stderr)
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
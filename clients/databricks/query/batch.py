@@ -0,0 +1,93 @@
+"""
+Run many statements concurrently, each streamed to its own output file.
+
+    python -m clients.databricks.query --batch profile.sql --concurrency 8 \
+        --format ndjson --output-dir out/
+
+Outputs are named by position in the script (0001.ndjson, ...).  A line per
+statement is printed to stderr as it finishes, then a summary, which is also
+written to summary.json in the output directory.
+"""
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from . import execute, rows_for_format, write_result
+from .sql import split_statements
+
+
+def read_statements(path: str) -> list[str]:
+    if path == "-":
+        return split_statements(sys.stdin.read())
+    with open(path, encoding="utf-8") as f:
+        return split_statements(f.read())
+
+
+def _run_one(index: int, statement: str, out_path: str, fmt: str, host: str, token: str,
+             warehouse_id: str, catalog: str | None, schema: str | None, coerce: bool = False,
+             **options) -> dict:
+    started = time.time()
+    result = {"index": index, "statement": statement, "output": out_path,
+              "statement_id": None, "rows": 0, "seconds": None, "error": None}
+    tmp = out_path + ".part"
+    try:
+        stmt_id, columns, chunks = execute(host, token, warehouse_id, statement, catalog, schema, **options)
+        result["statement_id"] = stmt_id
+        with open(tmp, "w", encoding="utf-8", newline="") as fp:
+            rows = rows_for_format(columns, chunks, fmt, coerce=coerce,
+                                   result_format=options.get("result_format"))
+            result["rows"] = write_result(stmt_id, columns, rows, fp, fmt)
+        os.replace(tmp, out_path)
+    except Exception as e:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        result["error"] = str(e)
+    result["seconds"] = round(time.time() - started, 3)
+    return result
+
+
+def _report(r: dict, out=sys.stderr) -> None:
+    head = " ".join(r["statement"].split())[:60]
+    if r["error"]:
+        print(f"[{r['index']:04d}] FAILED  {r['seconds']:8.2f}s  {head}\n       {r['error']}", file=out)
+    else:
+        print(f"[{r['index']:04d}] ok      {r['seconds']:8.2f}s  {r['rows']:>9} rows  {head}", file=out)
+
+
+def run_batch(statements: list[str], host: str, token: str, warehouse_id: str,
+              catalog: str | None = None, schema: str | None = None, out_dir: str = ".",
+              fmt: str = "ndjson", concurrency: int = 4, **options) -> list[dict]:
+    """
+    Execute ``statements`` with at most ``concurrency`` in flight.
+    ``options`` are passed on to execute (cache, timeouts, prefetch, ...).
+
+    :return: one result dict per statement, in script order
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.time()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [
+            pool.submit(_run_one, i, stmt, os.path.join(out_dir, f"{i:04d}.{fmt}"), fmt,
+                        host, token, warehouse_id, catalog, schema, **options)
+            for i, stmt in enumerate(statements, 1)
+        ]
+        for future in as_completed(futures):
+            r = future.result()
+            _report(r)
+            results.append(r)
+    results.sort(key=lambda r: r["index"])
+
+    wall = time.time() - started
+    failed = [r for r in results if r["error"]]
+    busy = sum(r["seconds"] for r in results)
+    print(f"{len(results)} statements, {len(failed)} failed, "
+          f"{sum(r['rows'] for r in results)} rows in {wall:.2f}s "
+          f"(sum of statement times {busy:.2f}s)", file=sys.stderr)
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump({"seconds": round(wall, 3), "failed": len(failed), "statements": results}, f, indent=2)
+    return results
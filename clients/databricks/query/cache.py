@@ -0,0 +1,174 @@
+"""
+On-disk cache of statement results.
+
+Entries are keyed by normalized SQL plus warehouse, catalog, schema and
+result format.  Each entry is one gzip file: a JSON header line (statement
+id, columns, creation time) followed by one JSON array per row, so hits
+stream straight from disk and misses are written while the rows are being
+consumed.  Entries expire after ``ttl`` seconds and the least recently used
+ones are evicted once the directory grows past ``max_bytes``.
+
+Typed values (ARROW_STREAM results) that JSON has no type for are written
+as single-key objects such as ``{"$datetime": "..."}`` and turned back
+into the same type when read, so a hit returns what a miss did.
+"""
+import base64
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+
+from .sql import normalize_sql
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "tbd", "query")
+DEFAULT_TTL = 3600
+DEFAULT_MAX_BYTES = 256 * 2**20
+BATCH_ROWS = 4096
+
+# tag -> (type, encode, decode); datetime before date, it is a subclass
+_TAGGED = {
+    "$datetime": (datetime.datetime, datetime.datetime.isoformat, datetime.datetime.fromisoformat),
+    "$date": (datetime.date, datetime.date.isoformat, datetime.date.fromisoformat),
+    "$time": (datetime.time, datetime.time.isoformat, datetime.time.fromisoformat),
+    "$timedelta": (datetime.timedelta, datetime.timedelta.total_seconds,
+                   lambda v: datetime.timedelta(seconds=v)),
+    "$decimal": (Decimal, str, Decimal),
+    "$bytes": (bytes, lambda v: base64.b64encode(v).decode("ascii"), base64.b64decode),
+}
+
+
+def _encode(value):
+    for tag, (cls, encode, _) in _TAGGED.items():
+        if isinstance(value, cls):
+            return {tag: encode(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj):
+    if len(obj) == 1:
+        (tag, value), = obj.items()
+        if tag in _TAGGED:
+            return _TAGGED[tag][2](value)
+    return obj
+
+
+def _dumps(row) -> str:
+    return json.dumps(row, separators=(",", ":"), default=_encode)
+
+
+def _loads(line):
+    return json.loads(line, object_hook=_decode)
+
+
+class ResultCache:
+    def __init__(self, directory: str = DEFAULT_DIR, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(statement: str, warehouse_id: str, catalog: str | None = None,
+            schema: str | None = None, result_format: str | None = None) -> str:
+        parts = [normalize_sql(statement), warehouse_id, catalog, schema, result_format or "JSON_ARRAY"]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json.gz")
+
+    def get(self, key: str):
+        """
+        :return: (header, chunks) where chunks yields batches of row arrays,
+                 or None on a miss or an expired entry
+        """
+        path = self._path(key)
+        try:
+            fp = gzip.open(path, "rt", encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        try:
+            header = json.loads(fp.readline())
+        except (OSError, ValueError):
+            fp.close()
+            self._remove(path)
+            return None
+        if time.time() - header.get("created", 0) > self.ttl:
+            fp.close()
+            self._remove(path)
+            return None
+        os.utime(path)  # mtime doubles as last use for eviction
+        return header, self._read(fp)
+
+    @staticmethod
+    def _read(fp):
+        with fp:
+            batch = []
+            for line in fp:
+                batch.append(_loads(line))
+                if len(batch) >= BATCH_ROWS:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    def store(self, key: str, columns: list[dict], chunks, statement_id: str | None = None):
+        """
+        Pass ``chunks`` through unchanged while writing them to the cache.
+        The entry only becomes visible once every chunk has been consumed.
+        """
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        complete = False
+        try:
+            with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as fp:
+                fp.write(json.dumps({"statement_id": statement_id, "columns": columns,
+                                     "created": time.time()}) + "\n")
+                for data in chunks:
+                    for row in data:
+                        fp.write(_dumps(row) + "\n")
+                    yield data
+            os.replace(tmp, path)
+            complete = True
+        finally:
+            if not complete:
+                self._remove(tmp)
+        self.evict()
+
+    def evict(self):
+        """Remove expired entries, then least recently used ones over max_bytes."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json.gz"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            # mtime is last use, so anything unused for a whole ttl has expired
+            if total <= self.max_bytes and now - mtime <= self.ttl:
+                continue
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json.gz"):
+                self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,131 @@
+"""
+Row representations for statement results.
+
+The API sends every chunk as a list of row arrays.  Besides the dict rows of
+rows_from_chunks, results can be consumed as
+
+- tuples: one namedtuple class per result, so rows cost no more than a tuple
+  and the column names are shared
+- column batches: one dict of column name -> list (or array, for non-null
+  numeric columns) per chunk
+
+With ``coerce`` values are converted from their JSON strings using the
+manifest schema.  Conversion runs per column over a whole chunk (transpose,
+map, transpose back) rather than per value in the row loop.  CSV results
+have no separate NULL, so for them an empty field in any converted column
+becomes None.
+"""
+import datetime
+from array import array
+from collections import namedtuple
+from decimal import Decimal
+
+INTEGER_TYPES = {"BYTE", "SHORT", "INT", "LONG", "TINYINT", "SMALLINT", "INTEGER", "BIGINT"}
+FLOAT_TYPES = {"FLOAT", "DOUBLE", "REAL"}
+
+
+def _bool(v):
+    return v if isinstance(v, bool) else v.lower() == "true"
+
+
+def _date(v):
+    return datetime.date.fromisoformat(v) if isinstance(v, str) else v
+
+
+def _timestamp(v):
+    return datetime.datetime.fromisoformat(v) if isinstance(v, str) else v
+
+
+def _csv_null(conv):
+    def convert(v):
+        return None if v == "" else conv(v)
+    return convert
+
+
+def converter(column: dict, result_format: str | None = None):
+    """Value converter for a manifest column, or None when strings are kept."""
+    conv = _converter(column)
+    if conv is not None and result_format == "CSV":
+        return _csv_null(conv)
+    return conv
+
+
+def _converter(column: dict):
+    type_name = (column.get("type_name") or column.get("type_text") or "").upper()
+    if type_name in INTEGER_TYPES:
+        return int
+    if type_name in FLOAT_TYPES:
+        return float
+    if type_name == "DECIMAL":
+        return Decimal
+    if type_name == "BOOLEAN":
+        return _bool
+    if type_name == "DATE":
+        return _date
+    if type_name.startswith("TIMESTAMP"):
+        return _timestamp
+    return None
+
+
+def converters(columns: list[dict], result_format: str | None = None) -> list:
+    return [converter(c, result_format) for c in columns]
+
+
+def coerce_columns(data: list, convs: list) -> list:
+    """Transpose one chunk into columns and convert each column in one pass."""
+    if not data:
+        return [[] for _ in convs]
+    cols = []
+    for col, conv in zip(zip(*data), convs):
+        if conv is None:
+            cols.append(list(col))
+        elif None in col:
+            cols.append([None if v is None else conv(v) for v in col])
+        else:
+            cols.append(list(map(conv, col)))
+    return cols
+
+
+def row_type(columns: list[dict]):
+    """namedtuple class for a result; invalid identifiers are renamed _N."""
+    return namedtuple("Row", [c.get("name") or "_" for c in columns], rename=True)
+
+
+def iter_tuples(columns: list[dict], chunks, coerce: bool = False,
+                result_format: str | None = None):
+    """Yields one namedtuple per row; all rows share the class from row_type."""
+    make = row_type(columns)._make
+    convs = converters(columns, result_format) if coerce else None
+    for data in chunks:
+        if convs:
+            yield from map(make, zip(*coerce_columns(data, convs)))
+        else:
+            yield from map(make, data)
+
+
+def iter_dicts(columns: list[dict], chunks, coerce: bool = False,
+               result_format: str | None = None):
+    names = [c.get("name") for c in columns]
+    for row in iter_tuples(columns, chunks, coerce, result_format):
+        yield dict(zip(names, row))
+
+
+def iter_columns(columns: list[dict], chunks, coerce: bool = False,
+                 result_format: str | None = None):
+    """
+    Yields one dict of column name -> values per chunk.  Coerced integer and
+    float columns without nulls are packed into arrays.
+    """
+    names = [c.get("name") for c in columns]
+    kinds = [_converter(c) for c in columns] if coerce else [None] * len(columns)
+    convs = converters(columns, result_format) if coerce else kinds
+    for data in chunks:
+        batch = {}
+        for name, kind, values in zip(names, kinds, coerce_columns(data, convs)):
+            if kind in (int, float) and None not in values:
+                try:
+                    values = array("q" if kind is int else "d", values)
+                except OverflowError:
+                    pass
+            batch[name] = values
+        yield batch
@@ -0,0 +1,47 @@
+"""
+Just enough SQL lexing to compare and split statements: quoted strings and
+identifiers are kept intact, comments and whitespace are not significant.
+"""
+import re
+
+TOKENS = re.compile(
+    r"""'(?:[^'\\]|\\.|'')*'"""     # string literals
+    r'''|"(?:[^"\\]|\\.|"")*"'''
+    r"|`[^`]*`"                     # quoted identifiers
+    r"|--[^\n]*|/\*.*?\*/"          # comments
+    r"|\s+"
+    r"|[^'\"`\s;]+?(?=--|/\*|['\"`\s;]|$)"
+    r"|.",
+    re.DOTALL,
+)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Drop comments, collapse whitespace, lower-case everything outside
+    quotes and strip trailing semicolons.
+    """
+    out = []
+    for tok in TOKENS.findall(sql):
+        if tok[0] in "'\"`":
+            out.append(tok)
+        elif tok.startswith("--") or tok.startswith("/*") or tok.isspace():
+            if out and out[-1] != " ":
+                out.append(" ")
+        else:
+            out.append(tok.lower())
+    return "".join(out).strip().rstrip(";").strip()
+
+
+def split_statements(sql: str) -> list[str]:
+    """Split a script on semicolons outside quotes and comments."""
+    statements, current = [], []
+    for tok in TOKENS.findall(sql):
+        if tok == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(tok)
+    statements.append("".join(current).strip())
+    return [s for s in statements if normalize_sql(s)]
+
@@ -1,19 +1,23 @@
 """
 Schema extraction
 """
-import argparse, sys
+import argparse, json, sys
 import logging
 from argparse import ArgumentParser
 
 from tbd.schema.formatters import render
 from .schema import schema_read, write_table, table_print, from_source_yaml
-from .impact import impact
-from os.path import join
+from .schema.pack import read_hub, pack, unpack, SNAPSHOT
+from .schema.diff import diff, changed_tables
+from .schema.dupes import DupeIndex, THRESHOLD
+from .schema.typemap import convert_mysql2spark
+from .impact import impact, query as impact_query, GRAPH_FILE
+from os.path import join, isfile
 from .editor import editor
-from .models import Exposure
+from .models import Exposure, open_writer
 from io import FileIO
 import yaml
-from tbd import utils
+from tbd import utils, trace
 
 
 DATA_STORE = "databricks"
@@ -25,18 +29,36 @@ tbd impact
 EPILOG = """verbs:
     import: add schema from an origin definition of tables.
     `tbd --origin data/paycheckprediction_schemas.csv import`
+    `tbd --origin data/paycheckprediction_schemas.csv --changed-only import`
+
+    diff: what an import would change in the hub, as JSON lines: tables
+    added or dropped, columns added or dropped, type and flag changes.
+    `tbd --origin data/paycheckprediction_schemas.csv --database earnin diff`
     
     show: display tables or table 
     `tbd show tablename`
     
     search: fuzzy match table names
     `tbd search {q}`
+
+    dupes: clusters of identical and near-identical tables across the
+    hub, as JSON lines, by column names and types.
+    `tbd dupes --threshold 0.9`
     
     edit: modify a table schema
     `tbd edit tablename`
+
+    pack: compile the hub into one snapshot file (hub/.tbd.pack) that
+    show, search, edit and export read instead of parsing every YAML file.
+    it is refreshed automatically when source files change.
+    `tbd pack`
+
+    unpack: write the hub's source YAML files back out from its snapshot
+    `tbd --dest hub unpack`
     
     impact: analyze downstream dependencies on schemas
     `tbd impact main earnin`
+    `tbd impact query main.earnin.users` (offline, from impact.graph or --origin)
     
     expose: add an known exposure. exposures define a dependency on data,
     which must be managed as data changes.
@@ -71,12 +93,19 @@ parser.add_argument("--format", default="spark",
                     help="output format")
 parser.add_argument("-v", "--verbose", action="store_true",
                     help="print more")
+parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                    help=f"dupes: lowest column set similarity to cluster (default {THRESHOLD})")
+parser.add_argument("--changed-only", action="store_true",
+                    help="import: write only tables that are new or changed in the hub")
+parser.add_argument("--profile", action="store_true",
+                    help="time the run in nested spans (verb, files, HTTP calls, renders);\n"
+                         "also enabled by TBD_TRACE=summary|chrome|cprofile[:path]")
+parser.add_argument("--profile-format", choices=trace.MODES, default="summary",
+                    help="summary table on stderr, Chrome trace JSON or a cProfile dump")
+parser.add_argument("--profile-output", default=None,
+                    help="where to write the profile (tbd-trace.json, tbd.prof)")
 parser.add_argument("rest", nargs=argparse.REMAINDER)
 
-if len(sys.argv) == 1:
-    parser.print_help()
-    sys.exit(0)
-
 def selected_tables(rest, origin):
     target_table = ""
     tail = []
@@ -86,20 +115,14 @@ def selected_tables(rest, origin):
         target_table = rest[0]
 
     origin = join(origin, *tail)
-    schema = schema_read(in_file=origin,
-                         schema_reader=from_source_yaml)
-    for table in schema:
-        if not target_table:
-            yield table
-        elif table.name == target_table:
-            yield table
+    match = (lambda name: name == target_table) if target_table else None
+    yield from read_hub(origin, match=match)
 
 def search(*terms, origin):
     """
     fuzzy match tables
     """
-    schema = schema_read(in_file=origin,
-                         schema_reader=from_source_yaml)
+    schema = read_hub(origin, match=lambda name: any(term in name for term in terms))
     res = []
     for table in schema:
         for term in terms:
@@ -108,6 +131,10 @@ def search(*terms, origin):
 
     return res
 
+def hub_folder(dest, database=None):
+    """Where import writes ``database``'s tables."""
+    return join(dest, database) if database else dest
+
 def add_exposure(rest, dest):
     exp = Exposure(*rest)
     with open(f"{dest}/{exp.name}.exposure.yaml", "w") as fp:
@@ -119,6 +146,9 @@ def main():
 
     :return:
     """
+    if len(sys.argv) == 1:
+        parser.print_help()
+        sys.exit(0)
     args = parser.parse_args()
 
     origin = args.origin
@@ -130,57 +160,99 @@ def main():
     if dest == "hub":
         dest = args.hub
 
-    match args.verb:
-        # ingress
-        case "import":
-            schema = schema_read(in_file=origin)
-            for table in schema:
-                print(table)
-                table_print(table)
-                write_table(table,
-                            database_name=args.database,
-                            out_folder=dest)
-
-        case "expose":
-            add_exposure(args.rest, dest)
-
-        case "impact":
-            # TODO, needs testing
-            dataset = args.rest
-            ir = impact(*dataset,
-                        output=(".".join(dataset) + ".impact"))
-            ir.save("impact.graph")
-            ir.write_report(".".join(dataset) + ".impact.tsv")
-
-        # view/modify
-        case "show":
-            tables = list(selected_tables(args.rest, origin))
-            if len(tables) == 1:
-                print(tables[0])
-            else:
-                names = [table.name for table in tables]
-                utils.ls(names, args.verbose)
-
-        case "edit":
-            for table in selected_tables(args.rest, origin):
-                editor(table.filename)
-
-        case "search":
-            for table in search(*args.rest, origin=origin):
-                print(table.name)
-        # egress
-        case "export":
-            for table in selected_tables(args.rest, origin):
-                print(render(table, format_type=args.format))
-                ans = input("Add an exposure?")
-                if ans.lower() != "n":
-                    add_exposure(args.rest, dest)
-
-
-        case _:
-            raise NotImplementedError(f"Verb {args.verb} not implemented")
-
-
+    if args.profile:
+        trace.enable(args.profile_format, args.profile_output)
+
+    with trace.span(f"verb {args.verb}", rest=" ".join(args.rest)):
+        match args.verb:
+            # ingress
+            case "import":
+                schema = schema_read(in_file=origin)
+                if args.changed_only:
+                    schema = changed_tables(schema, read_hub(hub_folder(dest, args.database)),
+                                            normalize=convert_mysql2spark)
+                for table in schema:
+                    print(table)
+                    table_print(table)
+                    write_table(table,
+                                database_name=args.database,
+                                out_folder=dest)
+
+            case "diff":
+                counts = {}
+                for change in diff(schema_read(in_file=origin),
+                                   read_hub(hub_folder(dest, args.database)),
+                                   normalize=convert_mysql2spark):
+                    counts[change["change"]] = counts.get(change["change"], 0) + 1
+                    print(json.dumps(change))
+                summary = ", ".join(f"{kind}: {n}" for kind, n in counts.items())
+                print(summary or "no changes", file=sys.stderr)
+
+            case "expose":
+                add_exposure(args.rest, dest)
+
+            case "pack":
+                snapshot = pack(origin)
+                print(f"packed {len(snapshot)} tables into {join(origin, SNAPSHOT)}")
+
+            case "unpack":
+                path = origin if isfile(origin) else join(origin, SNAPSHOT)
+                print(f"wrote {unpack(path, dest)} files to {dest}")
+
+            case "impact":
+                match args.rest:
+                    case ["query", *tables]:
+                        graph = GRAPH_FILE if args.origin == HUB else args.origin
+                        try:
+                            affected = impact_query(*tables, path=graph)
+                        except KeyError as e:
+                            sys.exit(f"unknown table {e.args[0]}")
+                        utils.ls(affected, args.verbose)
+                    case dataset:
+                        # TODO, needs testing
+                        name = ".".join(dataset) + ".impact"
+                        with open_writer(GRAPH_FILE) as graph, \
+                                open_writer(name + ".tsv") as report:
+                            impact(*dataset, output=name,
+                                   writers=(graph, report), collect=False)
+
+            # view/modify
+            case "show":
+                tables = list(selected_tables(args.rest, origin))
+                if len(tables) == 1:
+                    print(tables[0])
+                else:
+                    names = [table.name for table in tables]
+                    utils.ls(names, args.verbose)
+
+            case "edit":
+                for table in selected_tables(args.rest, origin):
+                    editor(table.filename)
+
+            case "search":
+                for table in search(*args.rest, origin=origin):
+                    print(table.name)
+
+            case "dupes":
+                index = DupeIndex(threshold=args.threshold).update(read_hub(origin))
+                for cluster in index.clusters():
+                    print(json.dumps({
+                        "identical": cluster["identical"],
+                        "similarity": round(cluster["similarity"], 3),
+                        "tables": [{"name": t.name, "file": t.filename} for t in cluster["tables"]],
+                    }))
+
+            # egress
+            case "export":
+                for table in selected_tables(args.rest, origin):
+                    print(render(table, format_type=args.format))
+                    ans = input("Add an exposure?")
+                    if ans.lower() != "n":
+                        add_exposure(args.rest, dest)
+
+
+            case _:
+                raise NotImplementedError(f"Verb {args.verb} not implemented")
 
 
 if __name__ == "__main__":
@@ -1,205 +1,296 @@
 import curses
-import yaml
 from pathlib import Path
-from collections import OrderedDict
 from tbd.models import *
+from .sources import SourcesFile
+
+# ---------- VIEW ----------
+
+COLUMN_FIELDS = (None, "name", "type", "nullable", "primary_key", "unique", "description")
+TOGGLES = {"nullable", "primary_key", "unique"}
+
+
+class TableView:
+    """
+    The editable fields of one table, computed from their index, so drawing
+    a screenful costs the same for 5 columns or 5,000.
+
+    Field 0 is the table description, then each column has a header and one
+    field per COLUMN_FIELDS entry.  Call ``refresh`` after columns are
+    added, renamed or removed.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.refresh()
+
+    def refresh(self):
+        self.columns = self.table.columns
+        self._names = [c.name.lower() for c in self.columns]
+
+    def __len__(self):
+        return 1 + len(COLUMN_FIELDS) * len(self.columns)
+
+    def field(self, i):
+        """(label, value, column, attribute) of field ``i``; column is None for the table."""
+        if i == 0:
+            return "Table description", self.table.description, None, "description"
+        column = self.columns[(i - 1) // len(COLUMN_FIELDS)]
+        attr = COLUMN_FIELDS[(i - 1) % len(COLUMN_FIELDS)]
+        if attr is None:
+            return f"Column: {column.name}", None, column, None
+        return f"  {attr}", getattr(column, "dtype" if attr == "type" else attr), column, attr
+
+    def line(self, i):
+        label, value, _, attr = self.field(i)
+        return label if attr is None else f"{label:<20} : {value}"
+
+    def column_field(self, k):
+        """Index of column ``k``'s header field."""
+        return 1 + len(COLUMN_FIELDS) * k
+
+    def find(self, query, start=0):
+        """
+        Header field of the first column at or after field ``start``
+        (wrapping) whose name contains ``query``, case-insensitively; None
+        when there is none.
+        """
+        if not query or not self._names:
+            return None
+        query = query.lower()
+        n = len(self._names)
+        first = max(0, (start - 1) // len(COLUMN_FIELDS))
+        for k in range(first, first + n):
+            if query in self._names[k % n]:
+                return self.column_field(k % n)
+        return None
+
+
+def scroll(top, cursor, height):
+    """First visible row so that ``cursor`` is on screen, moving as little as possible."""
+    if height <= 0:
+        return cursor
+    if cursor < top:
+        return cursor
+    if cursor >= top + height:
+        return cursor - height + 1
+    return top
+
+
+class LineCache:
+    """
+    What was last drawn at each screen position; ``draw`` only writes text
+    that changed, padded to its region's width so shorter text leaves no
+    trail.  ``reset`` after a resize forgets everything.
+    """
+
+    def __init__(self, win):
+        self.win = win
+        self.lines = {}
+        self.writes = 0
+
+    def draw(self, y, x, text, width, attr=0):
+        h, w = self.win.getmaxyx()
+        width = min(width, w - x - 1)
+        if y < 0 or y >= h or width <= 0:
+            return
+        text = text[:width].ljust(width)
+        if self.lines.get((y, x)) == (text, attr):
+            return
+        self.lines[(y, x)] = (text, attr)
+        self.writes += 1
+        try:
+            self.win.addstr(y, x, text, attr)
+        except curses.error:
+            pass
+
+    def reset(self):
+        self.lines.clear()
+        self.win.erase()
 
-# ---------- YAML ↔ MODELS ----------
 
+# ---------- CURSES EDITOR ----------
 
-def load_database_from_dbt(path: Path) -> Database:
-    with open(path) as f:
-        raw = yaml.safe_load(f)
-
-    source = raw["sources"][0]  # single-source assumption
-    db = Database(source["name"])
-
-    for t in source.get("tables", []):
-        table = Table(
-            name=t["name"],
-            description=t.get("description"),
-            columns=t.get("columns", []),
-        )
-        db.add_table(table)
-
-    return db, raw
-
-
-def write_database_to_dbt(db: Database, raw: dict):
-    source = raw["sources"][0]
-    source["tables"] = [t.to_dict() for t in db.tables]
-
+FOOTER = ("↑↓ PgUp PgDn Navigate  ←→ Table  / Find  n Next  Enter Edit  Space Toggle  "
+          "a Add Col  d Delete  s Save  q Quit")
+BODY_TOP = 3  # first screen row of the field list
 
-# ---------- CURSES EDITOR ----------
 
 def edit_dbt_sources_curses(path: str | Path):
     path = Path(path)
-    db, raw = load_database_from_dbt(path)
+    doc = SourcesFile.load(path)
+    if not len(doc):
+        raise ValueError(f"{path} has no source tables")
+    qualify = len(doc.sources) > 1
+    names = [f"{source}.{name}" if qualify else name for source, name in doc.names()]
 
     def curses_app(stdscr):
         curses.curs_set(0)
         stdscr.keypad(True)
+        screen = LineCache(stdscr)
 
         table_idx = 0
+        table_top = 0
+        view = TableView(doc.table(table_idx))
         field_idx = 0
-
-        def safe_addstr(y, x, text, attr=0):
-            try:
-                h, w = stdscr.getmaxyx()
-                if y < 0 or y >= h:
-                    return
-                if x < 0 or x >= w:
-                    return
-                max_len = w - x - 1
-                if max_len <= 0:
-                    return
-                stdscr.addstr(y, x, text[:max_len], attr)
-            except curses.error:
-                pass
+        top = 0
+        status = ""
 
         def text_input(y, x, prompt, initial=""):
             curses.echo()
-            safe_addstr(y, x, prompt)
+            screen.draw(y, x, prompt, len(prompt))
             stdscr.clrtoeol()
+            screen.lines.pop((y, x), None)
             value = stdscr.getstr(y, x + len(prompt)).decode()
             curses.noecho()
+            screen.reset()
             return value if value else initial
 
-        while True:
-            stdscr.clear()
+        def search(start):
+            """Incremental search: jumps as the query is typed, Enter keeps, Esc goes back."""
+            nonlocal field_idx, status
+            origin, query = field_idx, ""
+            while True:
+                status = f"/{query}"
+                draw()
+                key = stdscr.getch()
+                if key in (10, curses.KEY_ENTER):
+                    break
+                if key == 27:
+                    field_idx, query = origin, ""
+                    break
+                if key in (curses.KEY_BACKSPACE, 127, 8):
+                    query = query[:-1]
+                elif 32 <= key < 127:
+                    query += chr(key)
+                else:
+                    continue
+                found = view.find(query, start)
+                field_idx = origin if found is None else found
+            status = ""
+            return query
+
+        def draw():
+            nonlocal top, table_top
             h, w = stdscr.getmaxyx()
             split = max(24, w // 4)
+            height = max(1, h - BODY_TOP - 2)
 
             # ---------- LEFT PANE ----------
-            safe_addstr(0, 2, "Tables", curses.A_BOLD)
-            for i, table in enumerate(db.tables):
-                attr = curses.A_REVERSE if i == table_idx else 0
-                safe_addstr(2 + i, 2, table.name[: split - 4], attr)
+            screen.draw(0, 2, "Tables", split - 4, curses.A_BOLD)
+            table_top = scroll(table_top, table_idx, height + 1)
+            for row in range(height + 1):
+                i = table_top + row
+                name = names[i] if i < len(names) else ""
+                screen.draw(2 + row, 2, name, split - 4, curses.A_REVERSE if i == table_idx else 0)
 
             # ---------- RIGHT PANE ----------
-            table = db.tables[table_idx]
             x0 = split + 2
-            y = 1
-
-            safe_addstr(y, x0, f"Table: {table.name}", curses.A_BOLD)
-            y += 2
-
-            fields = [("Table description", table.description)]
-
-            for col in table.columns:
-                fields.extend([
-                    (f"Column: {col.name}", None),
-                    ("  name", col.name),
-                    ("  type", col.dtype),
-                    ("  nullable", col.nullable),
-                    ("  primary_key", col.primary_key),
-                    ("  unique", col.unique),
-                    ("  description", col.metadata.get("description")),
-                ])
-
-            # Render fields
-            cursor_y_positions = []
-            for i, (label, value) in enumerate(fields):
-                attr = curses.A_REVERSE if i == field_idx else 0
-                line = f"{label:<20} : {value}"
-                safe_addstr(y, x0, line[: w - x0 - 2], attr)
-                cursor_y_positions.append(y)
-                y += 1
+            screen.draw(1, x0, f"Table: {view.table.name}  ({len(view.columns)} columns)",
+                        w - x0 - 2, curses.A_BOLD)
+            top = scroll(top, field_idx, height)
+            for row in range(height):
+                i = top + row
+                text = view.line(i) if i < len(view) else ""
+                screen.draw(BODY_TOP + row, x0, text, w - x0 - 2,
+                            curses.A_REVERSE if i == field_idx else 0)
 
             # Footer
-            safe_addstr(
-                h - 1,
-                2,
-                "↑↓ Navigate  Enter Edit  Space Toggle  a Add Col  r Rename  d Delete  s Save  q Quit",
-                curses.A_DIM,
-            )
-
+            screen.draw(h - 2, 2, status, w)
+            screen.draw(h - 1, 2, FOOTER, w, curses.A_DIM)
             stdscr.refresh()
 
+        query = ""
+        while True:
+            draw()
             key = stdscr.getch()
+            h, w = stdscr.getmaxyx()
+            x0 = max(24, w // 4) + 2
+            page = max(1, h - BODY_TOP - 3)
+            status = ""
 
             # ---------- GLOBAL ----------
             if key == ord("q"):
                 break
 
-            if key == ord("s"):
-                write_database_to_dbt(db, raw)
-                with open(path, "w") as f:
-                    yaml.safe_dump(raw, f, sort_keys=False)
+            if key == curses.KEY_RESIZE:
+                screen.reset()
+
+            elif key == ord("s"):
+                written = doc.save()
+                status = f"saved {written} table(s) to {path}" if written else "no changes"
 
             # ---------- TABLE NAV ----------
-            if key == curses.KEY_LEFT:
-                table_idx = max(0, table_idx - 1)
-                field_idx = 0
-            elif key == curses.KEY_RIGHT:
-                table_idx = min(len(db.tables) - 1, table_idx + 1)
-                field_idx = 0
+            elif key in (curses.KEY_LEFT, curses.KEY_RIGHT):
+                step = -1 if key == curses.KEY_LEFT else 1
+                table_idx = min(len(names) - 1, max(0, table_idx + step))
+                view = TableView(doc.table(table_idx))
+                field_idx = top = 0
 
             # ---------- FIELD NAV ----------
             elif key == curses.KEY_UP:
                 field_idx = max(0, field_idx - 1)
             elif key == curses.KEY_DOWN:
-                field_idx = min(len(fields) - 1, field_idx + 1)
+                field_idx = min(len(view) - 1, field_idx + 1)
+            elif key == curses.KEY_PPAGE:
+                field_idx = max(0, field_idx - page)
+            elif key == curses.KEY_NPAGE:
+                field_idx = min(len(view) - 1, field_idx + page)
+            elif key == curses.KEY_HOME:
+                field_idx = 0
+            elif key == curses.KEY_END:
+                field_idx = len(view) - 1
+
+            # ---------- SEARCH ----------
+            elif key == ord("/"):
+                query = search(field_idx)
+            elif key == ord("n"):
+                found = view.find(query, field_idx + len(COLUMN_FIELDS))
+                if found is None:
+                    status = f"no column matches {query!r}" if query else "no search"
+                else:
+                    field_idx = found
 
             # ---------- EDIT ----------
             elif key in (10, curses.KEY_ENTER):
-                label, value = fields[field_idx]
-
-                if label == "Table description":
-                    table.description = text_input(
-                        cursor_y_positions[field_idx],
-                        x0,
-                        "Table description: ",
-                        table.description or "",
-                    )
-
-                elif label.strip() == "name":
-                    col = table.columns[(field_idx - 1) // 7]
-                    new = text_input(
-                        cursor_y_positions[field_idx],
-                        x0,
-                        "Column name: ",
-                        col.name,
-                    )
-                    table.rename_column(col.name, new)
-
-                elif label.strip() == "type":
-                    col = table.columns[(field_idx - 2) // 7]
-                    col.dtype = text_input(
-                        cursor_y_positions[field_idx],
-                        x0,
-                        "Type: ",
-                        col.dtype,
-                    )
-
-                elif label.strip() == "description":
-                    col = table.columns[(field_idx - 6) // 7]
-                    col.metadata["description"] = text_input(
-                        cursor_y_positions[field_idx],
-                        x0,
-                        "Description: ",
-                        col.metadata.get("description", ""),
-                    )
+                label, value, col, attr = view.field(field_idx)
+                y = BODY_TOP + field_idx - top
+
+                if col is None:
+                    view.table.description = text_input(
+                        y, x0, "Table description: ", view.table.description or "")
+
+                elif attr == "name":
+                    new = text_input(y, x0, "Column name: ", col.name)
+                    if new != col.name:
+                        view.table.rename_column(col.name, new)
+                        view.refresh()
+
+                elif attr == "type":
+                    col.dtype = text_input(y, x0, "Type: ", col.dtype or "")
+
+                elif attr == "description":
+                    col.description = text_input(y, x0, "Description: ", col.description or "")
 
             # ---------- TOGGLES ----------
             elif key == ord(" "):
-                label, _ = fields[field_idx]
-                if label.strip() in {"nullable", "primary_key", "unique"}:
-                    col = table.columns[(field_idx - 3) // 7]
-                    setattr(col, label.strip(), not bool(getattr(col, label.strip())))
+                _, value, col, attr = view.field(field_idx)
+                if attr in TOGGLES:
+                    setattr(col, attr, not bool(value))
 
             # ---------- COLUMN OPS ----------
             elif key == ord("a"):
                 name = text_input(h - 3, 2, "New column name: ")
                 dtype = text_input(h - 2, 2, "Type: ")
-                table.add_column(Column(name=name, dtype=dtype))
+                view.table.add_column(Column(name=name, dtype=dtype))
+                view.refresh()
+                field_idx = view.column_field(len(view.columns) - 1)
 
             elif key == ord("d"):
-                label, _ = fields[field_idx]
-                if label.startswith("Column:"):
-                    col_name = label.split(":", 1)[1].strip()
-                    table._columns.pop(col_name)
-                    field_idx = max(0, field_idx - 1)
+                _, _, col, attr = view.field(field_idx)
+                if col is not None and attr is None:
+                    view.table._columns.pop(col.name)
+                    view.refresh()
+                    field_idx = min(max(0, field_idx - 1), len(view) - 1)
 
         curses.endwin()
 
@@ -0,0 +1,248 @@
+"""
+dbt sources files as the editor sees them.
+
+``SourcesFile.load`` composes the YAML once, without constructing it,
+and records every table of every source with the span of text it came
+from.  A table is turned into a ``Table`` the first time it is asked for.
+
+``save`` writes back only the tables whose content changed.  Each one is
+merged into the mapping it was read from, so keys tbd does not model
+(tests, tags, loaded_at_field, ...) are kept.  It is rendered at the same
+indentation and spliced over its old text, leaving the rest of the file,
+comments included, as it was.  The file is replaced atomically.  Tables
+whose text uses YAML anchors or aliases cannot be spliced safely; when
+one of those changed, the whole document is dumped instead.
+"""
+import os
+import re
+import tempfile
+
+import yaml
+
+from tbd.models import Column, Table
+
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # PyYAML without libyaml
+    from yaml import SafeLoader as _Loader
+
+__all__ = ["SourcesFile"]
+
+_COLUMN_ATTRS = {"description": "description", "nullable": "nullable", "default": "default",
+                 "primary_key": "primary_key", "unique": "unique", "metadata": "meta"}
+_ANCHOR = re.compile(r"(^|[\s\[{,])[&*][^\s,\]}]")
+
+
+def _mapping_get(node, key):
+    for k, v in node.value:
+        if k.value == key:
+            return v
+    return None
+
+
+def _content_end(text, start, end):
+    """End of the node's own text: trailing blank and comment-only lines belong to what follows."""
+    lines = text[start:end].split("\n")
+    while len(lines) > 1 and (not lines[-1].strip() or lines[-1].lstrip().startswith("#")):
+        lines.pop()
+    return start + len("\n".join(lines).rstrip())
+
+
+def _column_dict(raw):
+    """Column(**raw) keywords: dbt's data_type and meta as Column's type and metadata."""
+    if ("type" not in raw and "data_type" in raw) or ("metadata" not in raw and "meta" in raw):
+        raw = dict(raw)
+        raw.setdefault("type", raw.get("data_type"))
+        raw.setdefault("metadata", raw.get("meta"))
+    return raw
+
+
+def _put(d, key, value):
+    if value is None:
+        d.pop(key, None)
+    else:
+        d[key] = value
+
+
+def merge_column(raw, column):
+    """``raw`` with the column's modelled fields that differ from it written over it."""
+    d = dict(raw)
+    base = Column(**_column_dict(raw)) if raw.get("name") else None
+    if base is None or column.name != base.name:
+        d["name"] = column.name
+    if base is None or column.dtype != base.dtype:
+        _put(d, "data_type" if "data_type" in raw and "type" not in raw else "type", column.dtype)
+    for attr, key in _COLUMN_ATTRS.items():
+        value = getattr(column, attr)
+        if base is None or value != getattr(base, attr):
+            if attr == "metadata" and not value:
+                value = None
+            _put(d, key, value)
+    return d
+
+
+def merge_table(raw, table, origins):
+    """``raw`` updated from ``table``; ``origins`` maps id(column) to the mapping it was read from."""
+    d = dict(raw)
+    d["name"] = table.name
+    if table.description != raw.get("description"):
+        _put(d, "description", table.description)
+    columns = [merge_column(origins.get(id(c), {}), c) for c in table.columns]
+    if columns or "columns" in raw:
+        d["columns"] = columns
+    return d
+
+
+class _Entry:
+    __slots__ = ("source", "name", "node", "start", "end", "column", "raw", "table", "origins")
+
+    def __init__(self, source, name, node, start, end, column):
+        self.source = source
+        self.name = name
+        self.node = node
+        self.start = start
+        self.end = end
+        self.column = column
+        self.raw = self.table = self.origins = None
+
+
+class SourcesFile:
+    def __init__(self, path, text, loader, entries):
+        self.path = path
+        self.text = text
+        self._loader = loader
+        self._entries = entries
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        loader = _Loader(text)
+        return cls(path, text, loader, cls._index(text, loader))
+
+    @staticmethod
+    def _index(text, loader):
+        root = loader.get_single_node()
+        entries = []
+        sources = _mapping_get(root, "sources") if isinstance(root, yaml.MappingNode) else None
+        for source in getattr(sources, "value", []):
+            if not isinstance(source, yaml.MappingNode):
+                continue
+            name = _mapping_get(source, "name")
+            tables = _mapping_get(source, "tables")
+            for node in getattr(tables, "value", []):
+                table_name = _mapping_get(node, "name") if isinstance(node, yaml.MappingNode) else None
+                start = node.start_mark.index
+                entries.append(_Entry(getattr(name, "value", None), getattr(table_name, "value", None),
+                                      node, start, _content_end(text, start, node.end_mark.index),
+                                      node.start_mark.column))
+        return entries
+
+    # ---------- access ----------
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def sources(self):
+        return list(dict.fromkeys(e.source for e in self._entries))
+
+    def names(self):
+        """(source, table) for every table, in file order."""
+        return [(e.source, e.name) for e in self._entries]
+
+    def raw(self, i):
+        entry = self._entries[i]
+        if entry.raw is None:
+            entry.raw = self._loader.construct_document(entry.node)
+        return entry.raw
+
+    def table(self, i) -> Table:
+        """The i-th table, constructed on first access and then kept, edits included."""
+        entry = self._entries[i]
+        if entry.table is None:
+            raw = self.raw(i)
+            columns = raw.get("columns") or []
+            table = Table(name=raw["name"], description=raw.get("description"),
+                          columns=[_column_dict(c) for c in columns], filename=self.path)
+            entry.origins = {id(col): c for col, c in zip(table.columns, columns)}
+            entry.table = table
+        return entry.table
+
+    def modified(self):
+        """Indexes of tables whose content differs from what was read (or last saved)."""
+        return [i for i, e in enumerate(self._entries)
+                if e.table is not None and merge_table(e.raw, e.table, e.origins) != e.raw]
+
+    # ---------- saving ----------
+
+    def _render(self, entry, d):
+        text = yaml.safe_dump(d, sort_keys=False, allow_unicode=True).rstrip("\n")
+        return text.replace("\n", "\n" + " " * entry.column)
+
+    def save(self) -> int:
+        """Write changed tables back; returns how many were written."""
+        changed = self.modified()
+        if not changed:
+            return 0
+        entries = self._entries
+        merged = {i: merge_table(entries[i].raw, entries[i].table, entries[i].origins) for i in changed}
+        if any(_ANCHOR.search(self.text, entries[i].start, entries[i].end) for i in changed):
+            text = self._dump_all(merged)
+        else:
+            text = self._splice(merged)
+        self._write(self.path, text)
+        self.text = text
+        for i, d in merged.items():
+            entries[i].raw = d
+            entries[i].origins = {id(col): c for col, c in zip(entries[i].table.columns, d.get("columns", []))}
+        return len(changed)
+
+    def _splice(self, merged):
+        """The text with each merged table rendered over its span; moves later spans along."""
+        parts, pos, delta = [], 0, 0
+        for i, entry in enumerate(self._entries):
+            start, end = entry.start, entry.end
+            entry.start += delta
+            if i in merged:
+                new = self._render(entry, merged[i])
+                parts += [self.text[pos:start], new]
+                pos = end
+                delta += len(new) - (end - start)
+            entry.end += delta
+        parts.append(self.text[pos:])
+        return "".join(parts)
+
+    def _dump_all(self, merged):
+        """The whole document dumped with the merged tables in place; spans are found again."""
+        data = yaml.load(self.text, Loader=_Loader)
+        i = 0
+        for source in data.get("sources") or []:
+            if not isinstance(source, dict):
+                continue
+            tables = source.get("tables") or []
+            for k in range(len(tables)):
+                if i in merged:
+                    tables[k] = merged[i]
+                i += 1
+        text = yaml.safe_dump(data, sort_keys=False, allow_unicode=True)
+        self._loader = _Loader(text)
+        for entry, new in zip(self._entries, self._index(text, self._loader)):
+            entry.node, entry.start, entry.end, entry.column = new.node, new.start, new.end, new.column
+        return text
+
+    def _write(self, path, text):
+        folder = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            if os.path.exists(path):
+                os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def __repr__(self):
+        return f"SourcesFile({self.path}, sources={len(self.sources)}, tables={len(self)})"
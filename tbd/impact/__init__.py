@@ -1,5 +1,10 @@
+from os.path import getmtime, isfile
+
 from clients import databricks
-from tbd.models import ImpactReport
+from tbd.models import ImpactReport, LineageGraph
+from .reach import ReachabilityIndex
+
+GRAPH_FILE = "impact.graph"
 
 
 def impact(*args, **kwargs) -> ImpactReport:
@@ -9,4 +14,51 @@ def impact(*args, **kwargs) -> ImpactReport:
     :param kwargs:
     :return: generator of results
     """
-    return databricks.impact(*args, **kwargs)
\ No newline at end of file
+    return databricks.impact(*args, **kwargs)
+
+
+def load_graph(path=GRAPH_FILE) -> LineageGraph:
+    """
+    Open a saved impact graph, either a LineageGraph file or ImpactReport JSON.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic == b"TBDG":
+        return LineageGraph.load(path)
+    return ImpactReport.load(path).to_graph()
+
+
+def load_index(path=GRAPH_FILE) -> ReachabilityIndex:
+    """
+    Reachability index for the graph at ``path``, cached next to it as
+    ``{path}.reach`` and rebuilt when the graph is newer.  When the cache
+    cannot be written (a read-only checkout) the index is only kept in memory.
+    """
+    graph = load_graph(path)
+    index_path = path + ".reach"
+    if isfile(index_path) and getmtime(index_path) >= getmtime(path):
+        try:
+            return ReachabilityIndex.load(index_path, graph)
+        except ValueError:
+            pass
+    index = ReachabilityIndex.from_graph(graph)
+    try:
+        index.save(index_path)
+    except OSError:
+        pass
+    return index
+
+
+def query(*tables, path=GRAPH_FILE):
+    """
+    Offline impact lookup: every dataset downstream of any of ``tables``.
+
+    :raises KeyError: with the name of a table the graph does not have
+    """
+    index = load_index(path)
+    affected = set()
+    for table in tables:
+        if table not in index:
+            raise KeyError(table)
+        affected.update(index.affected_by(table))
+    return sorted(affected)
@@ -0,0 +1,272 @@
+"""
+Reachability index over a LineageGraph.
+
+Strongly connected components are condensed and every component keeps a
+bitset (a python int) of the components it can reach.  ``is_downstream``
+is then a single bit test and ``affected_by`` a walk over set bits, with
+no graph traversal at query time.  Unknown names raise KeyError.
+"""
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"TBDR"
+VERSION = 1
+
+# magic, version, byteorder (0 little, 1 big), nodes, components
+_HEADER = struct.Struct("<4sHHQQ")
+
+
+def _components(graph):
+    """
+    Iterative Tarjan SCC.
+
+    :return: (comp, count) where comp[node_id] is the component id.  Ids are
+             assigned sinks first, so successors always have smaller ids.
+    """
+    n = len(graph)
+    offsets, targets = graph._fwd_offsets, graph._fwd_targets
+    index = array("q", [-1]) * n
+    low = array("q", [0]) * n
+    comp = array("I", [0]) * n
+    on_stack = bytearray(n)
+    stack = []
+    counter = 0
+    count = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        work = [(root, offsets[root])]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        while work:
+            u, j = work[-1]
+            if j < offsets[u + 1]:
+                work[-1] = (u, j + 1)
+                v = targets[j]
+                if index[v] == -1:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = 1
+                    work.append((v, offsets[v]))
+                elif on_stack[v]:
+                    low[u] = min(low[u], index[v])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[u])
+            if low[u] == index[u]:
+                while True:
+                    v = stack.pop()
+                    on_stack[v] = 0
+                    comp[v] = count
+                    if v == u:
+                        break
+                count += 1
+    return comp, count
+
+
+class ReachabilityIndex:
+    """
+    Precomputed transitive closure of a lineage graph.
+
+    Build with ``from_graph`` (or ``from_report``), then ``add_edge`` keeps
+    it current without a rebuild.
+    """
+
+    def __init__(self, graph, comp, closure):
+        self.graph = graph
+        self._comp = comp
+        self._closure = closure
+        self._members = None
+        self._cyclic = None
+        self._extra = {}  # nodes added after build: name -> node id
+        self._extra_names = []
+
+    @classmethod
+    def from_graph(cls, graph):
+        comp, count = _components(graph)
+        members = [[] for _ in range(count)]
+        for u in range(len(graph)):
+            members[comp[u]].append(u)
+
+        offsets, targets = graph._fwd_offsets, graph._fwd_targets
+        closure = [0] * count
+        for c in range(count):  # sinks first, successors are already done
+            bits = 1 << c
+            for u in members[c]:
+                for j in range(offsets[u], offsets[u + 1]):
+                    d = comp[targets[j]]
+                    if d != c:
+                        bits |= closure[d]
+            closure[c] = bits
+        index = cls(graph, comp, closure)
+        index._members = members
+        return index
+
+    @classmethod
+    def from_report(cls, report):
+        return cls.from_graph(report.to_graph())
+
+    # ---------- ids ----------
+
+    def _id(self, name):
+        try:
+            return self.graph.node_id(name)
+        except KeyError:
+            return self._extra[name]
+
+    def _name(self, node_id):
+        n = len(self.graph)
+        if node_id < n:
+            return self.graph.name(node_id)
+        return self._extra_names[node_id - n]
+
+    def _intern(self, name):
+        try:
+            return self._id(name)
+        except KeyError:
+            pass
+        node_id = len(self.graph) + len(self._extra_names)
+        self._extra[name] = node_id
+        self._extra_names.append(name)
+        self._comp.append(len(self._closure))
+        self._closure.append(1 << len(self._closure))
+        if self._members is not None:
+            self._members.append([node_id])
+        return node_id
+
+    def members(self, c):
+        if self._members is None:
+            self._members = [[] for _ in range(len(self._closure))]
+            for u in range(len(self._comp)):
+                self._members[self._comp[u]].append(u)
+        return self._members[c]
+
+    def cyclic(self):
+        """Components on a cycle: more than one member, or a node with an edge to itself."""
+        if self._cyclic is None:
+            offsets, targets = self.graph._fwd_offsets, self.graph._fwd_targets
+            cyclic = set()
+            for u in range(len(self.graph)):
+                c = self._comp[u]
+                if c in cyclic:
+                    continue
+                if len(self.members(c)) > 1 or u in targets[offsets[u]:offsets[u + 1]]:
+                    cyclic.add(c)
+            self._cyclic = cyclic
+        return self._cyclic
+
+    # ---------- queries ----------
+
+    def __contains__(self, name):
+        try:
+            self._id(name)
+        except KeyError:
+            return False
+        return True
+
+    def is_downstream(self, source, target):
+        """
+        True if ``target`` is (transitively) downstream of ``source``.  A
+        dataset is downstream of itself only when it is on a cycle.
+        """
+        a, b = self._comp[self._id(source)], self._comp[self._id(target)]
+        if a == b:
+            return a in self.cyclic()
+        return bool(self._closure[a] >> b & 1)
+
+    def affected_by(self, name):
+        """Names of every other dataset downstream of ``name``."""
+        u = self._id(name)
+        bits = self._closure[self._comp[u]]
+        out = []
+        while bits:
+            low = bits & -bits
+            for v in self.members(low.bit_length() - 1):
+                if v != u:
+                    out.append(self._name(v))
+            bits ^= low
+        return out
+
+    # ---------- updates ----------
+
+    def add_edge(self, source, target):
+        """
+        Record a new ``source -> target`` dependency.
+
+        Every component that reaches ``source`` now also reaches whatever
+        ``target`` reaches; that covers new cycles as well.
+        """
+        u, v = self._intern(source), self._intern(target)
+        cu, cv = self._comp[u], self._comp[v]
+        cyclic = self.cyclic()
+        closure = self._closure
+        if u == v:
+            cyclic.add(cu)
+        if closure[cu] >> cv & 1:
+            return
+        if closure[cv] >> cu & 1:  # closes a cycle through everything between v and u
+            cyclic.update(c for c in range(len(closure)) if closure[cv] >> c & 1 and closure[c] >> cu & 1)
+        gained = closure[cv]
+        for c in range(len(closure)):
+            if closure[c] >> cu & 1:
+                closure[c] |= gained
+
+    # ---------- persistence ----------
+
+    def save(self, output_path):
+        """Persist the closure; names stay in the graph file it was built from."""
+        if self._extra_names:
+            raise ValueError("Index has nodes outside its graph; rebuild from an updated graph.")
+        blobs = [c.to_bytes((c.bit_length() + 7) // 8, "little") for c in self._closure]
+        lengths = array("Q", [len(b) for b in blobs])
+        comp = array("I", self._comp)
+        tmp = f"{output_path}.{os.getpid()}.tmp"  # a failed write never leaves half an index
+        try:
+            with open(tmp, "wb") as f:
+                byteorder = 0 if sys.byteorder == "little" else 1
+                f.write(_HEADER.pack(MAGIC, VERSION, byteorder, len(comp), len(blobs)))
+                f.write(comp.tobytes())
+                f.write(lengths.tobytes())
+                for b in blobs:
+                    f.write(b)
+            os.replace(tmp, output_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path, graph):
+        with open(path, "rb") as f:
+            buf = f.read()
+        magic, version, byteorder, n, count = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a reachability index")
+        if n != len(graph):
+            raise ValueError(f"{path} was built for a different graph")
+        pos = _HEADER.size
+        comp = array("I")
+        comp.frombytes(buf[pos:pos + 4 * n])
+        pos += 4 * n
+        lengths = array("Q")
+        lengths.frombytes(buf[pos:pos + 8 * count])
+        pos += 8 * count
+        if byteorder != (0 if sys.byteorder == "little" else 1):
+            comp.byteswap()
+            lengths.byteswap()
+        closure = []
+        for size in lengths:
+            closure.append(int.from_bytes(buf[pos:pos + size], "little"))
+            pos += size
+        return cls(graph, comp, closure)
+
+    def __repr__(self):
+        return f"ReachabilityIndex(nodes={len(self._comp)}, components={len(self._closure)})"
@@ -1,2 +1,4 @@
 from .data import *
 from .meta import *
+from .graph import *
+from .writers import *
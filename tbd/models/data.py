@@ -78,9 +78,11 @@ class Table:
     def rename_column(self, old_name, new_name):
         if new_name in self._columns:
             raise ValueError(f"Column '{new_name}' already exists")
-        col = self._columns.pop(old_name)
+        col = self._columns[old_name]
         col.name = new_name
-        self._columns[new_name] = col
+        # rebuilt rather than popped and re-added, so the column keeps its place
+        self._columns = OrderedDict((new_name if name == old_name else name, c)
+                                    for name, c in self._columns.items())
 
     def add_column(self, column):
         if isinstance(column, dict):
@@ -0,0 +1,360 @@
+"""
+Compact lineage graph.
+
+Node names are interned to integer ids, adjacency is stored CSR style
+(offsets + targets) in both directions and metadata lives in one integer
+column per field that points into a shared string table.  The whole
+structure is a handful of flat arrays, so it saves to a single binary
+file which can be memory-mapped back without parsing.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+__all__ = ["LineageGraph"]
+
+META_FIELDS = ("owner", "created_by", "updated_by", "email")
+
+MAGIC = b"TBDG"
+VERSION = 1
+NONE = 0xFFFFFFFF  # string id for a missing metadata value
+
+# magic, version, byteorder (0 little, 1 big), reserved, nodes, edges, strings
+_HEADER = struct.Struct("<4sBBHQQQ")
+_ALIGN = 8
+
+
+def _zeros(typecode, n):
+    return array(typecode, bytes(array(typecode).itemsize * n))
+
+
+def _csr(n, src, dst):
+    """Counting sort (src, dst) edge lists into CSR offsets/targets."""
+    offsets = _zeros("Q", n + 1)
+    for s in src:
+        offsets[s + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    pos = array("Q", offsets[:-1])
+    targets = _zeros("I", len(dst))
+    for s, d in zip(src, dst):
+        targets[pos[s]] = d
+        pos[s] += 1
+    return offsets, targets
+
+
+class _Strings:
+    """Offsets + utf-8 blob, decoded lazily on access."""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_list(cls, values):
+        offsets = _zeros("Q", len(values) + 1)
+        blob = bytearray()
+        for i, v in enumerate(values):
+            blob += v.encode("utf-8")
+            offsets[i + 1] = len(blob)
+        return cls(offsets, bytes(blob))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+
+class LineageGraph:
+    """
+    Read-mostly dataset lineage graph.
+
+    Build one from an impact graph dict (``{dataset: {"metadata": {...},
+    "downstream": [...]}}``) with ``from_dict``, or ``load`` a file written
+    by ``save``.
+    """
+
+    def __init__(self, strings, n_nodes, fwd, rev, meta, order=None, ids=None):
+        self._strings = strings
+        self._n = n_nodes
+        self._fwd_offsets, self._fwd_targets = fwd
+        self._rev_offsets, self._rev_targets = rev
+        self._meta = meta
+        self._order = order
+        self._ids = ids
+        self._buffer = None
+
+    # ---------- construction ----------
+
+    @classmethod
+    def from_dict(cls, nodes):
+        ids = {}
+        values = []
+
+        def intern(s):
+            i = ids.get(s)
+            if i is None:
+                i = ids[s] = len(values)
+                values.append(s)
+            return i
+
+        for node in nodes:
+            intern(node)
+
+        src, dst = array("I"), array("I")
+        for node, payload in nodes.items():
+            u = ids[node]
+            seen = set()
+            for downstream in (payload or {}).get("downstream") or []:
+                v = intern(downstream)
+                if v not in seen:
+                    seen.add(v)
+                    src.append(u)
+                    dst.append(v)
+        n = len(values)
+
+        meta = {field: array("I", [NONE]) * n for field in META_FIELDS}
+        extra = {}
+        for node, payload in nodes.items():
+            u = ids[node]
+            md = (payload or {}).get("metadata") or {}
+            for field in META_FIELDS:
+                value = md.get(field)
+                if value is None:
+                    continue
+                value = str(value)
+                sid = ids.get(value)
+                if sid is None:
+                    sid = extra.get(value)
+                if sid is None:
+                    sid = extra[value] = len(values)
+                    values.append(value)
+                meta[field][u] = sid
+
+        return cls(_Strings.from_list(values), n,
+                   _csr(n, src, dst), _csr(n, dst, src), meta,
+                   ids={values[i]: i for i in range(n)})
+
+    @classmethod
+    def from_report(cls, report):
+        return cls.from_dict(report.graph)
+
+    # ---------- lookup ----------
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def edge_count(self):
+        return len(self._fwd_targets)
+
+    def __contains__(self, name):
+        try:
+            self.node_id(name)
+        except KeyError:
+            return False
+        return True
+
+    def name(self, node_id):
+        return self._strings[node_id]
+
+    def node_id(self, name):
+        if self._ids is not None:
+            return self._ids[name]
+        # loaded graphs: binary search the name-sorted permutation
+        order = self._order
+        lo = bisect_left(range(len(order)), name, key=lambda i: self._strings[order[i]])
+        if lo < len(order) and self._strings[order[lo]] == name:
+            return order[lo]
+        raise KeyError(name)
+
+    def nodes(self):
+        for i in range(self._n):
+            yield self._strings[i]
+
+    def edges(self):
+        offsets, targets = self._fwd_offsets, self._fwd_targets
+        for u in range(self._n):
+            name = self._strings[u]
+            for j in range(offsets[u], offsets[u + 1]):
+                yield name, self._strings[targets[j]]
+
+    def metadata(self, name):
+        u = self.node_id(name)
+        out = {}
+        for field in META_FIELDS:
+            sid = self._meta[field][u]
+            out[field] = None if sid == NONE else self._strings[sid]
+        return out
+
+    def successors(self, name):
+        u = self.node_id(name)
+        return [self._strings[v] for v in
+                self._fwd_targets[self._fwd_offsets[u]:self._fwd_offsets[u + 1]]]
+
+    def predecessors(self, name):
+        u = self.node_id(name)
+        return [self._strings[v] for v in
+                self._rev_targets[self._rev_offsets[u]:self._rev_offsets[u + 1]]]
+
+    # ---------- traversal ----------
+
+    def _bfs(self, starts, offsets, targets, max_depth=None):
+        """Yield (node_id, depth) reachable from ``starts``, excluding them."""
+        visited = bytearray(self._n)
+        queue = deque()
+        for s in starts:
+            visited[s] = 1
+            queue.append((s, 0))
+        while queue:
+            u, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for j in range(offsets[u], offsets[u + 1]):
+                v = targets[j]
+                if not visited[v]:
+                    visited[v] = 1
+                    yield v, depth + 1
+                    queue.append((v, depth + 1))
+
+    def blast_radius(self, *names, max_depth=None):
+        """
+        Everything downstream of ``names``.
+
+        :return: dict of dataset -> hops from the nearest start, in BFS order
+        """
+        starts = [self.node_id(n) for n in names]
+        return {self._strings[v]: d for v, d in
+                self._bfs(starts, self._fwd_offsets, self._fwd_targets, max_depth)}
+
+    def ancestry(self, *names, max_depth=None):
+        """Everything upstream of ``names``, as dataset -> hops."""
+        starts = [self.node_id(n) for n in names]
+        return {self._strings[v]: d for v, d in
+                self._bfs(starts, self._rev_offsets, self._rev_targets, max_depth)}
+
+    def shortest_path(self, source, target):
+        """
+        Shortest downstream path from ``source`` to ``target``.
+
+        :return: list of dataset names, or None when unreachable
+        """
+        s, t = self.node_id(source), self.node_id(target)
+        if s == t:
+            return [source]
+        offsets, targets = self._fwd_offsets, self._fwd_targets
+        parent = {s: s}
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            for j in range(offsets[u], offsets[u + 1]):
+                v = targets[j]
+                if v in parent:
+                    continue
+                parent[v] = u
+                if v == t:
+                    path = [v]
+                    while v != s:
+                        v = parent[v]
+                        path.append(v)
+                    return [self._strings[i] for i in reversed(path)]
+                queue.append(v)
+        return None
+
+    def to_dict(self):
+        """Inverse of ``from_dict``; only nodes with metadata or edges are keyed."""
+        out = {}
+        offsets, targets = self._fwd_offsets, self._fwd_targets
+        for u in range(self._n):
+            md = {}
+            for field in META_FIELDS:
+                sid = self._meta[field][u]
+                md[field] = None if sid == NONE else self._strings[sid]
+            downstream = [self._strings[targets[j]] for j in range(offsets[u], offsets[u + 1])]
+            if downstream or any(v is not None for v in md.values()):
+                out[self._strings[u]] = {"metadata": md, "downstream": downstream}
+        return out
+
+    # ---------- persistence ----------
+
+    def _sections(self):
+        order = self._order
+        if order is None:
+            order = array("I", sorted(range(self._n), key=self._strings.__getitem__))
+        yield self._fwd_offsets
+        yield self._fwd_targets
+        yield self._rev_offsets
+        yield self._rev_targets
+        for field in META_FIELDS:
+            yield self._meta[field]
+        yield order
+        yield self._strings.offsets
+        yield self._strings.blob
+
+    def save(self, output_path):
+        byteorder = 0 if sys.byteorder == "little" else 1
+        with open(output_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, byteorder, 0,
+                                 self._n, self.edge_count, len(self._strings)))
+            pos = _HEADER.size
+            for section in self._sections():
+                pad = -pos % _ALIGN
+                f.write(bytes(pad))
+                data = memoryview(section).cast("B")
+                f.write(data)
+                pos += pad + len(data)
+
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        """
+        Open a graph written by ``save``.
+
+        With ``use_mmap`` the arrays are views over the mapped file, so only
+        the pages a query touches are read from disk.
+        """
+        with open(path, "rb") as f:
+            if use_mmap:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buf = f.read()
+        magic, version, byteorder, _, n, m, n_strings = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a lineage graph file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported lineage graph version {version} in {path}")
+        swap = byteorder != (0 if sys.byteorder == "little" else 1)
+
+        view = memoryview(buf)
+        pos = _HEADER.size
+
+        def take(typecode, count):
+            nonlocal pos
+            pos += -pos % _ALIGN
+            size = array(typecode).itemsize * count
+            chunk = view[pos:pos + size]
+            pos += size
+            if typecode == "B":
+                return chunk
+            if swap:
+                arr = array(typecode, bytes(chunk))
+                arr.byteswap()
+                return arr
+            return chunk.cast(typecode)
+
+        fwd = take("Q", n + 1), take("I", m)
+        rev = take("Q", n + 1), take("I", m)
+        meta = {field: take("I", n) for field in META_FIELDS}
+        order = take("I", n)
+        str_offsets = take("Q", n_strings + 1)
+        blob = take("B", str_offsets[-1])
+
+        graph = cls(_Strings(str_offsets, blob), n, fwd, rev, meta, order=order)
+        graph._buffer = buf
+        return graph
+
+    def __repr__(self):
+        return f"LineageGraph(nodes={self._n}, edges={self.edge_count})"
@@ -1,5 +1,7 @@
 import json
 from collections import OrderedDict
+from .graph import LineageGraph
+from .writers import open_writer, read_report, TsvReportWriter
 
 
 def is_snake(s):
@@ -58,21 +60,22 @@ class ImpactReport:
     def __init__(self, graph):
         self.graph = graph
 
+    @classmethod
+    def load(cls, path):
+        """Read a report saved in any of the writer formats (JSON, JSONL, columnar)."""
+        return cls(dict(read_report(path)))
+
     def save(self, output_path):
-        with open(output_path, "w") as f:
-            json.dump(self.graph, f, indent=2)
+        """Format follows the extension, see tbd.models.writers."""
+        with open_writer(output_path) as writer:
+            writer.write_graph(self.graph)
+
+    def to_graph(self):
+        """Compact, queryable form of the report. See LineageGraph."""
+        return LineageGraph.from_dict(self.graph)
 
     def write_report(self, output_path):
-        with open(output_path + ".tsv", "w") as f:
-            f.write(
-                "\t".join(["dataset", "owner", "created_by", "updated_by", "email"])
-            )
-            for dataset, d in self.graph.items():
-                metadata = d["meta"]
-                downstream = d["downstream"]
-                f.write(
-                    "\t".join(map(str,
-                                  [dataset, metadata["owner"], metadata["created_by"], metadata["updated_by"],
-                                   metadata["email"]]
-                                  )) + "\n"
-                )
+        if not output_path.endswith(".tsv"):
+            output_path += ".tsv"
+        with TsvReportWriter(output_path) as writer:
+            writer.write_graph(self.graph)
@@ -0,0 +1,251 @@
+"""
+Streaming impact report writers.
+
+Every writer takes one crawled node at a time, ``write(dataset, node)``
+where node is ``{"metadata": {...}, "downstream": [...]}`` as the crawler
+builds it, so a report can be written while the crawl is still running
+and without holding the whole graph.
+
+Formats, chosen from the file extension by ``open_writer``:
+
+- ``.jsonl``  one compact JSON object per node, flushed per line
+- ``.tsv``    dataset, owner, created_by, updated_by, email
+- ``.tbdc``   columnar binary, blocks of rows with one array per column
+- otherwise   a single compact JSON object, as ``ImpactReport.save`` wrote
+"""
+import json
+import struct
+import sys
+from array import array
+
+__all__ = ["open_writer", "read_report", "JsonReportWriter", "JsonlReportWriter",
+           "TsvReportWriter", "ColumnarReportWriter"]
+
+REPORT_FIELDS = ("owner", "created_by", "updated_by", "email")
+
+COLUMNAR_MAGIC = b"TBDC"
+COLUMNAR_VERSION = 1
+_BLOCK = struct.Struct("<4sII")  # marker, rows, payload bytes
+_BLOCK_MARKER = b"BLK0"
+
+
+class ReportWriter:
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.count = 0
+        self._fp = self._open()
+
+    def _open(self):
+        return open(self.output_path, "w", encoding="utf-8")
+
+    def write(self, dataset, node):
+        raise NotImplementedError
+
+    def write_graph(self, graph):
+        for dataset, node in graph.items():
+            self.write(dataset, node)
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonReportWriter(ReportWriter):
+    """``{dataset: node, ...}``; only valid JSON once closed."""
+
+    def _open(self):
+        fp = super()._open()
+        fp.write("{")
+        return fp
+
+    def write(self, dataset, node):
+        if self.count:
+            self._fp.write(",\n")
+        self._fp.write(json.dumps(dataset))
+        self._fp.write(":")
+        self._fp.write(json.dumps(node, separators=(",", ":")))
+        self.count += 1
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.write("}\n")
+        super().close()
+
+
+class JsonlReportWriter(ReportWriter):
+    def write(self, dataset, node):
+        record = {"dataset": dataset,
+                  "metadata": node.get("metadata") or {},
+                  "downstream": node.get("downstream") or []}
+        self._fp.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._fp.flush()
+        self.count += 1
+
+
+class TsvReportWriter(ReportWriter):
+    def _open(self):
+        fp = super()._open()
+        fp.write("\t".join(("dataset",) + REPORT_FIELDS) + "\n")
+        return fp
+
+    def write(self, dataset, node):
+        metadata = node.get("metadata") or {}
+        self._fp.write(
+            "\t".join(map(str, [dataset] + [metadata.get(f) for f in REPORT_FIELDS])) + "\n"
+        )
+        self._fp.flush()
+        self.count += 1
+
+
+def _le(arr):
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode, buf):
+    arr = array(typecode)
+    arr.frombytes(buf)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _encode_strings(values):
+    """int32 lengths (-1 for None) followed by the utf-8 blob."""
+    lengths = array("i")
+    blob = bytearray()
+    for v in values:
+        if v is None:
+            lengths.append(-1)
+            continue
+        b = str(v).encode("utf-8")
+        lengths.append(len(b))
+        blob += b
+    return _le(lengths) + struct.pack("<I", len(blob)) + bytes(blob)
+
+
+def _decode_strings(buf, pos, count):
+    lengths = _from_le("i", buf[pos:pos + 4 * count])
+    pos += 4 * count
+    (size,) = struct.unpack_from("<I", buf, pos)
+    pos += 4
+    blob = buf[pos:pos + size]
+    out, i = [], 0
+    for n in lengths:
+        if n < 0:
+            out.append(None)
+        else:
+            out.append(blob[i:i + n].decode("utf-8"))
+            i += n
+    return out, pos + size
+
+
+class ColumnarReportWriter(ReportWriter):
+    """
+    Rows are buffered and written ``block_size`` at a time.  Each block
+    holds the dataset column, one column per metadata field, per-row
+    downstream counts and the flattened downstream names.  A reader stops
+    at the last complete block, so a file being written is still readable.
+    """
+
+    def __init__(self, output_path, block_size=1024):
+        self.block_size = block_size
+        self._rows = []
+        super().__init__(output_path)
+
+    def _open(self):
+        fp = open(self.output_path, "wb")
+        fp.write(COLUMNAR_MAGIC + struct.pack("<I", COLUMNAR_VERSION))
+        return fp
+
+    def write(self, dataset, node):
+        self._rows.append((dataset, node.get("metadata") or {}, node.get("downstream") or []))
+        self.count += 1
+        if len(self._rows) >= self.block_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        parts = [_encode_strings([r[0] for r in rows])]
+        for field in REPORT_FIELDS:
+            parts.append(_encode_strings([r[1].get(field) for r in rows]))
+        parts.append(_le(array("I", [len(r[2]) for r in rows])))
+        parts.append(_encode_strings([d for r in rows for d in r[2]]))
+        payload = b"".join(parts)
+        self._fp.write(_BLOCK.pack(_BLOCK_MARKER, len(rows), len(payload)) + payload)
+        self._fp.flush()
+
+    def close(self):
+        if self._fp is not None:
+            self.flush()
+        super().close()
+
+
+def _read_columnar(path):
+    with open(path, "rb") as f:
+        buf = f.read()
+    if buf[:4] != COLUMNAR_MAGIC:
+        raise ValueError(f"{path} is not a columnar impact report")
+    (version,) = struct.unpack_from("<I", buf, 4)
+    if version != COLUMNAR_VERSION:
+        raise ValueError(f"Unsupported columnar report version {version} in {path}")
+    pos = 8
+    while pos + _BLOCK.size <= len(buf):
+        marker, n, size = _BLOCK.unpack_from(buf, pos)
+        start = pos + _BLOCK.size
+        if marker != _BLOCK_MARKER or start + size > len(buf):
+            break  # partially written block
+        pos = start
+        datasets, pos = _decode_strings(buf, pos, n)
+        columns = {}
+        for field in REPORT_FIELDS:
+            columns[field], pos = _decode_strings(buf, pos, n)
+        counts = _from_le("I", buf[pos:pos + 4 * n])
+        pos += 4 * n
+        downstream, pos = _decode_strings(buf, pos, sum(counts))
+        i = 0
+        for row, dataset in enumerate(datasets):
+            metadata = {field: columns[field][row] for field in REPORT_FIELDS}
+            yield dataset, {"metadata": metadata, "downstream": downstream[i:i + counts[row]]}
+            i += counts[row]
+
+
+def read_report(path):
+    """Yield ``(dataset, node)`` from any report written by these writers (TSV excepted)."""
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic == COLUMNAR_MAGIC:
+        yield from _read_columnar(path)
+    elif str(path).endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # partially written line
+                record = json.loads(line)
+                yield record["dataset"], {"metadata": record.get("metadata") or {},
+                                          "downstream": record.get("downstream") or []}
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from json.load(f).items()
+
+
+def open_writer(output_path, **kwargs):
+    path = str(output_path)
+    if path.endswith(".jsonl"):
+        return JsonlReportWriter(output_path)
+    if path.endswith(".tsv"):
+        return TsvReportWriter(output_path)
+    if path.endswith(".tbdc"):
+        return ColumnarReportWriter(output_path, **kwargs)
+    return JsonReportWriter(output_path)
@@ -6,6 +6,7 @@ from collections import OrderedDict
 from glob import glob
 from os.path import join, isdir, isfile
 from os import makedirs
+from tbd.trace import span
 
 def schema_csv_to_hub(fp):
     """
@@ -30,7 +31,8 @@ def schema_csv_to_hub(fp):
 
 
 def from_source_yaml(fp, database_name=None):
-    data = yaml.safe_load(fp)
+    with span("yaml.load", file=fp.name):
+        data = yaml.safe_load(fp)
 
     for source in data.get("sources", []):
         # TODO schema!
@@ -93,8 +95,10 @@ def write_table(table, out_folder=None, database_name=None, formatter=None):
         out.append(database_name)
     makedirs(join(*out), exist_ok=True)
     out_filename = join(*out, f"{table.name}.source.yaml")
-    with open(out_filename, "w") as out_fp:
-        out_fp.write(formatter(table, database_name))
+    with span("write", file=out_filename):
+        text = formatter(table, database_name)
+        with open(out_filename, "w") as out_fp:
+            out_fp.write(text)
 
 
 def schema_read(schema_reader=None, recurse=True, **kwargs):
@@ -118,10 +122,11 @@ def schema_read(schema_reader=None, recurse=True, **kwargs):
         if not isfile(filename):
             continue
 
-        in_file = open(filename, "r")
-        hub = schema_reader(in_file)
+        # parse the whole file inside the span, so it doesn't time the consumer
+        with span("parse", file=filename), open(filename, "r") as in_file:
+            tables = list(schema_reader(in_file))
 
-        for table in hub:
+        for table in tables:
             yield table
 
 def table_print(table):
@@ -0,0 +1,143 @@
+"""
+Schema diff between an import origin and the hub.
+
+Every table gets a stable 64-bit fingerprint over the sorted name, type
+and flags (nullable, primary key, unique) of its columns, so column order
+and descriptions do not count as changes.  The hub side is indexed by
+table name and the origin streamed against it: tables with equal
+fingerprints are skipped without looking at their columns, the rest are
+compared by joining columns on name.
+
+    for change in diff(schema_read(in_file="mysql.csv"), read_hub("hub"),
+                       normalize=convert_mysql2spark):
+        print(change)  # {"change": "type_changed", "table": ..., ...}
+
+``normalize`` maps origin types to what ``import`` writes, so an origin
+that was already imported compares equal.
+"""
+from hashlib import blake2b
+
+__all__ = ["TableFingerprint", "compare", "diff", "changed_tables", "CHANGES"]
+
+CHANGES = ("table_added", "table_dropped", "column_added", "column_dropped",
+           "type_changed", "flags_changed")
+
+_FLAGS = ("nullable", "primary_key", "unique")
+
+
+class _Types(dict):
+    """``normalize`` as a lookup: each type string is normalized once."""
+
+    def __init__(self, normalize):
+        super().__init__({None: None})
+        self.normalize = normalize
+
+    def __missing__(self, dtype):
+        self[dtype] = result = self.normalize(dtype)
+        return result
+
+
+def _digest(lines) -> int:
+    text = "\x1e".join(lines)
+    return int.from_bytes(blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class TableFingerprint:
+    """
+    ``digest`` over the table's columns; ``columns``, computed on first use,
+    maps each column name to ``(dtype, (nullable, primary_key, unique))``.
+    """
+    __slots__ = ("name", "digest", "_table", "_normalize", "_columns")
+
+    def __init__(self, table, normalize=None):
+        self.name = table.name
+        self._table = table
+        if normalize is not None and not isinstance(normalize, _Types):
+            normalize = _Types(normalize)
+        self._normalize = normalize
+        self._columns = None
+        if normalize is None:
+            lines = sorted(f"{c.name}\x1f{c.dtype}\x1f{c.nullable}\x1f{c.primary_key}\x1f{c.unique}"
+                           for c in table.columns)
+        else:
+            lines = sorted(f"{c.name}\x1f{normalize[c.dtype]}\x1f{c.nullable}\x1f{c.primary_key}\x1f{c.unique}"
+                           for c in table.columns)
+        self.digest = _digest(lines)
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            types = self._normalize
+            self._columns = {c.name: (c.dtype if types is None else types[c.dtype],
+                                      (c.nullable, c.primary_key, c.unique))
+                             for c in self._table.columns}
+        return self._columns
+
+    def __eq__(self, other):
+        return isinstance(other, TableFingerprint) and self.digest == other.digest
+
+    def __hash__(self):
+        return self.digest
+
+    def __repr__(self):
+        return f"TableFingerprint({self.name}, {self.digest:016x})"
+
+
+def compare(origin_tables, hub_tables, normalize=None):
+    """
+    Yields ``(table, ours, theirs)`` for every table whose fingerprint
+    differs: ``theirs`` is None for a table the hub does not have, and
+    ``table`` and ``ours`` are None for hub tables missing from the origin.
+    """
+    hub = {}
+    for table in hub_tables:
+        fp = TableFingerprint(table)
+        hub[fp.name] = fp
+    if normalize is not None:
+        normalize = _Types(normalize)
+    for table in origin_tables:
+        ours = TableFingerprint(table, normalize)
+        theirs = hub.pop(ours.name, None)
+        if theirs is None or theirs.digest != ours.digest:
+            yield table, ours, theirs
+    for name in sorted(hub):
+        yield None, None, hub[name]
+
+
+def _flags(flags):
+    return dict(zip(_FLAGS, flags))
+
+
+def _column_changes(ours, theirs):
+    for name, (dtype, flags) in ours.columns.items():
+        other = theirs.columns.get(name)
+        if other is None:
+            yield {"change": "column_added", "table": ours.name, "column": name, "type": dtype}
+            continue
+        if other[0] != dtype:
+            yield {"change": "type_changed", "table": ours.name, "column": name,
+                   "from": other[0], "to": dtype}
+        if other[1] != flags:
+            yield {"change": "flags_changed", "table": ours.name, "column": name,
+                   "from": _flags(other[1]), "to": _flags(flags)}
+    for name, (dtype, _) in theirs.columns.items():
+        if name not in ours.columns:
+            yield {"change": "column_dropped", "table": ours.name, "column": name, "type": dtype}
+
+
+def diff(origin_tables, hub_tables, normalize=None):
+    """Yields one dict per change, with ``change`` one of CHANGES."""
+    for _, ours, theirs in compare(origin_tables, hub_tables, normalize):
+        if theirs is None:
+            yield {"change": "table_added", "table": ours.name, "columns": len(ours.columns)}
+        elif ours is None:
+            yield {"change": "table_dropped", "table": theirs.name, "columns": len(theirs.columns)}
+        else:
+            yield from _column_changes(ours, theirs)
+
+
+def changed_tables(origin_tables, hub_tables, normalize=None):
+    """Origin tables that are new or differ from the hub; what an import needs to write."""
+    for table, _, _ in compare(origin_tables, hub_tables, normalize):
+        if table is not None:
+            yield table
@@ -0,0 +1,140 @@
+"""
+Duplicate and near-duplicate tables.
+
+Tables with the same fingerprint (``tbd.schema.diff``: column names, types
+and flags) are identical copies.  One table of each identical group then
+goes into a MinHash index over its set of ``name:type`` columns, and
+locality sensitive hashing (``bands`` buckets of ``rows`` signature values)
+proposes candidate pairs, which are kept when their actual Jaccard
+similarity is at least ``threshold``.  Each table is hashed once and each
+bucket compared against one member, so the work grows with the number of
+tables rather than pairs of them.
+
+    index = DupeIndex(threshold=0.8)
+    for table in read_hub("hub"):
+        index.add(table)
+    for cluster in index.clusters():
+        print(cluster["similarity"], [t.filename for t in cluster["tables"]])
+"""
+import random
+from hashlib import blake2b
+
+from .diff import TableFingerprint
+
+__all__ = ["DupeIndex", "jaccard", "THRESHOLD"]
+
+THRESHOLD = 0.8
+NUM_PERM = 32
+BANDS = 8  # 4 rows each: a pair at similarity 0.8 shares a bucket with p = 0.985, at 0.5 p = 0.40
+_PRIME = (1 << 61) - 1
+
+
+def jaccard(a, b) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _tokens(table):
+    return frozenset(f"{c.name.lower()}:{(c.dtype or '').lower()}" for c in table.columns)
+
+
+class DupeIndex:
+    def __init__(self, threshold: float = THRESHOLD, num_perm: int = NUM_PERM, bands: int = BANDS,
+                 seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rnd = random.Random(seed)
+        self._perms = [(rnd.randrange(1, _PRIME), rnd.randrange(_PRIME)) for _ in range(num_perm)]
+        self._token_hashes = {}
+        self._exact = {}  # digest -> [tables]
+        self._reps = []  # (tables, tokens, signature)
+
+    def _token_signature(self, token):
+        values = self._token_hashes.get(token)
+        if values is None:
+            x = int.from_bytes(blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+            values = self._token_hashes[token] = tuple((a * x + b) % _PRIME for a, b in self._perms)
+        return values
+
+    def signature(self, tokens):
+        """MinHash signature of a token set; each distinct token is hashed once per index."""
+        return tuple(map(min, zip(*(self._token_signature(t) for t in tokens))))
+
+    def add(self, table) -> None:
+        digest = TableFingerprint(table).digest
+        group = self._exact.get(digest)
+        if group is not None:
+            group.append(table)
+            return
+        group = self._exact[digest] = [table]
+        tokens = _tokens(table)
+        self._reps.append((group, tokens, self.signature(tokens) if tokens else None))
+
+    def update(self, tables) -> "DupeIndex":
+        for table in tables:
+            self.add(table)
+        return self
+
+    def _similar_pairs(self):
+        """(i, j, similarity) for representatives LSH proposes and Jaccard confirms."""
+        buckets = {}
+        for i, (_, _, sig) in enumerate(self._reps):
+            if sig is None:
+                continue
+            for band in range(self.bands):
+                key = (band, sig[band * self.rows:(band + 1) * self.rows])
+                buckets.setdefault(key, []).append(i)
+        seen = set()
+        for members in buckets.values():
+            anchor = members[0]
+            for other in members[1:]:
+                if (anchor, other) in seen:
+                    continue
+                seen.add((anchor, other))
+                similarity = jaccard(self._reps[anchor][1], self._reps[other][1])
+                if similarity >= self.threshold:
+                    yield anchor, other, similarity
+
+    def clusters(self, min_size: int = 2) -> list[dict]:
+        """
+        ``{"similarity": lowest pairwise similarity that joined it,
+        "identical": whether every table has the same fingerprint,
+        "tables": [...]}``, largest first.
+        """
+        parent = list(range(len(self._reps)))
+        lowest = {}
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j, similarity in self._similar_pairs():
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[rj] = ri
+                lowest[ri] = min(similarity, lowest.pop(ri, 1.0), lowest.pop(rj, 1.0))
+
+        members = {}
+        for i in range(len(self._reps)):
+            members.setdefault(find(i), []).append(i)
+        out = []
+        for root, reps in members.items():
+            tables = [t for i in reps for t in self._reps[i][0]]
+            if len(tables) < min_size:
+                continue
+            out.append({"similarity": lowest.get(root, 1.0), "identical": len(reps) == 1,
+                        "tables": tables})
+        out.sort(key=lambda c: (-len(c["tables"]), -c["similarity"]))
+        return out
+
+    def __len__(self):
+        return sum(len(group) for group in self._exact.values())
+
+    def __repr__(self):
+        return f"DupeIndex(tables={len(self)}, distinct={len(self._reps)})"
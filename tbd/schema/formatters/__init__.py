@@ -1,5 +1,6 @@
 from .spark import spark_ddl_str
 from .dbt_yaml import to_source_yaml
+from tbd.trace import span
 # from .sql import *
 # from .tsv import *
 # from .comment_on import *
@@ -12,6 +13,11 @@ def render(table, format_type="tsv", database_name=None):
     :param database_name: Optional database name for certain formats
     :return: Formatted schema string
     """
+    with span(f"render {format_type.lower()}", table=table.name):
+        return _render(table, format_type, database_name)
+
+
+def _render(table, format_type, database_name):
     match format_type.lower():
         case "spark":
             return spark_ddl_str(table)
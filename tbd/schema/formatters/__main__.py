@@ -1,36 +1,59 @@
+"""
+Render DMS control messages as DDL, TSV or COMMENT ON statements.
+
+    python -m tbd.schema.formatters --format ddl stream.jsonl
+    python -m tbd.schema.formatters --format tsv --out tsv/ --processes 4 *.jsonl
+
+Every line of each file is read; malformed lines are reported on stderr
+with their file and line number and the run goes on.  Throughput is
+printed on stderr at the end.
+"""
 import os
-from argparse import ArgumentParser
+import sys
+from argparse import ArgumentParser, RawDescriptionHelpFormatter
 
-from . import control_msg2tsv, control_msg2comment
-from .sql import control_msg2ddl
-from json import loads, decoder
-from schemer import dir_for
+from .comment_on import dir_for
+from .dms import FORMATS, BATCH, Stats, process, write_result
 
-ROOT_DIR = os.environ["PWD"]
+ROOT_DIR = os.environ.get("PWD", os.getcwd())
 
-parser = ArgumentParser(description='convert schemas between formats')
+parser = ArgumentParser(description=__doc__, formatter_class=RawDescriptionHelpFormatter)
 parser.add_argument('files', nargs='+')
-parser.add_argument("--format", default='ddl', choices=['ddl', 'tsv', 'comment'],
+parser.add_argument("--format", default='ddl', choices=FORMATS,
                     help="output format")
 parser.add_argument("-w", "--write", action='store_true', default=False,
-                    help="write output to files")
-args = parser.parse_args()
-
-for file in args.files:
-    with open(os.path.join(ROOT_DIR, file)) as f:
-        line = None
-        try:
-            line = f.readline()
-            msg = {"value": loads(line)}
-            database = msg["value"]["metadata"]["schema-name"]
-            match args.format:
-                case "ddl":
-                    print(control_msg2ddl(msg))
-                case "tsv":
-                    write_dir = dir_for(database, "tsv") if args.write else None
-                    print(control_msg2tsv(msg, write_dir))
-                case "comment":
-                    print(control_msg2comment(msg))
-        except decoder.JSONDecodeError:
-            print(f"Error in {file}")
-            print(line)
+                    help="write one file per table to the schemer directory for its database")
+parser.add_argument("--out", default=None,
+                    help="write one file per table to this directory instead of printing")
+parser.add_argument("--processes", type=int, default=1,
+                    help="render in this many worker processes")
+parser.add_argument("--batch-size", type=int, default=BATCH,
+                    help="lines per worker batch")
+
+
+def main():
+    args = parser.parse_args()
+    if args.write and dir_for is None:
+        parser.error("--write needs schemer; use --out DIR")
+
+    paths = [os.path.join(ROOT_DIR, file) for file in args.files]
+    stats = Stats()
+    for result in process(paths, args.format, args.processes, args.batch_size, stats):
+        if result.error is not None:
+            print(f"Error in {result.path}:{result.lineno}: {result.error}", file=sys.stderr)
+        elif result.skipped:
+            continue
+        elif args.out or args.write:
+            try:
+                out_dir = args.out or dir_for(result.database, args.format)
+                write_result(result, out_dir, args.format)
+            except (OSError, ValueError) as e:
+                stats.failed(result)
+                print(f"Error in {result.path}:{result.lineno}: {type(e).__name__}: {e}", file=sys.stderr)
+        else:
+            print(result.text)
+    print(stats.summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
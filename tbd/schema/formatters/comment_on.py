@@ -1,7 +1,11 @@
 from ..typemap import convert_mysql2spark
-from schemer import dir_for
 
-def control_msg2comment(msg: dict):
+try:
+    from schemer import dir_for
+except ImportError:  # only needed to find TSV files written by an earlier run
+    dir_for = None
+
+def control_msg2comment(msg: dict, tsv: str = None):
     """
     TODO
     - NULLABLE
@@ -12,7 +16,9 @@ def control_msg2comment(msg: dict):
     https://docs.databricks.com/aws/en/sql/language-manual/sql-ref-syntax-ddl-create-table-using
 
     :param msg: DMS control message
-    :return: DDL CREATE TABLE statement
+    :param tsv: control_msg2tsv output for msg; read from the schemer
+        TSV directory when not given
+    :return: COMMENT ON statements
     """
     value = msg["value"]
     metadata = value["metadata"]
@@ -21,16 +27,17 @@ def control_msg2comment(msg: dict):
     table_def = value["control"]["table-def"]
     columns = table_def["columns"]
     pks = table_def.get("primary-key", [])
-    tsv_dir = dir_for(database, "tsv")
-
-    tsv = None
-    try:
-        tsv = open(f"{tsv_dir}/{database}.{table_name}.tsv", "r")
-    except FileNotFoundError:
-        print("Build TSV files before running this step.")
+    if tsv is None:
+        if dir_for is None:
+            raise RuntimeError("schemer is needed to read TSV files; pass the TSV text instead")
+        try:
+            with open(f"{dir_for(database, 'tsv')}/{database}.{table_name}.tsv", "r") as fp:
+                tsv = fp.read()
+        except FileNotFoundError:
+            raise FileNotFoundError("Build TSV files before running this step.")
 
     # table
-    lines = tsv.readlines()
+    lines = [line for line in tsv.splitlines() if line.strip()]
     table = lines.pop(0)
     table = table.split("\t")
 
@@ -43,7 +50,7 @@ def control_msg2comment(msg: dict):
         try:
             database, table_name, column_name, type_, desc = col.split("\t")
         except ValueError:
-            print(col)
+            raise ValueError(f"malformed TSV row {col!r}") from None
         # col_fields = col.split("\t")
         # col = col_fields[2]
         # desc = col_fields[-1]
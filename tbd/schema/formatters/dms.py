@@ -0,0 +1,187 @@
+"""
+Streaming DMS control-message processing.
+
+Every line of every input file is a message (JSONL; a file holding a
+single message is one line).  Control messages carrying a ``table-def``
+are rendered as DDL, TSV or COMMENT ON statements; other messages (data
+records, heartbeats) are skipped.  Lines are parsed and rendered in
+batches, in a process pool when ``processes`` is more than one, and come
+back in input order.  A line that is not JSON or not a well-formed control
+message is reported as an error with its file and line number; it never
+stops the run.
+
+    stats = Stats()
+    for result in process(paths, "ddl", processes=4, stats=stats):
+        if result.error is None:
+            print(result.text)
+    print(stats.summary())
+"""
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .comment_on import control_msg2comment
+from .sql import control_msg2ddl
+from .tsv import control_msg2tsv
+
+__all__ = ["FORMATS", "EXTENSIONS", "Result", "Stats", "read_lines", "render_line", "process",
+           "write_result"]
+
+FORMATS = ("ddl", "tsv", "comment")
+EXTENSIONS = {"ddl": "sql", "tsv": "tsv", "comment": "comment.sql"}
+BATCH = 512
+
+
+class Result:
+    """One input line: the rendered text, or why it was skipped or failed."""
+    __slots__ = ("path", "lineno", "database", "table", "text", "error", "skipped")
+
+    def __init__(self, path, lineno, database=None, table=None, text=None, error=None, skipped=False):
+        self.path = path
+        self.lineno = lineno
+        self.database = database
+        self.table = table
+        self.text = text
+        self.error = error
+        self.skipped = skipped
+
+    def __repr__(self):
+        what = self.error or ("skipped" if self.skipped else f"{self.database}.{self.table}")
+        return f"Result({self.path}:{self.lineno} {what})"
+
+
+class Stats:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.lines = self.rendered = self.skipped = self.errors = self.bytes = 0
+        self.tables = set()
+
+    def add(self, result, size):
+        self.lines += 1
+        self.bytes += size
+        if result.error is not None:
+            self.errors += 1
+        elif result.skipped:
+            self.skipped += 1
+        else:
+            self.rendered += 1
+            self.tables.add((result.database, result.table))
+
+    def failed(self, result):
+        """A rendered result that could not be written after all."""
+        self.rendered -= 1
+        self.errors += 1
+        self.tables.discard((result.database, result.table))
+
+    def summary(self) -> str:
+        seconds = max(time.perf_counter() - self.start, 1e-9)
+        return (f"{self.lines} messages ({self.rendered} rendered, {len(self.tables)} tables, "
+                f"{self.skipped} skipped, {self.errors} errors) in {seconds:.2f}s: "
+                f"{self.lines / seconds:,.0f} msg/s, {self.bytes / seconds / 1e6:.1f} MB/s")
+
+
+def read_lines(paths):
+    """Yields (path, line number, line) for every non-blank line of every file."""
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for lineno, line in enumerate(f, 1):
+                if line.strip():
+                    yield path, lineno, line
+
+
+def _message(line):
+    obj = json.loads(line)
+    if not isinstance(obj, dict):
+        raise ValueError(f"expected a JSON object, got {type(obj).__name__}")
+    # a bare DMS message, or one wrapped the way Kafka consumers deliver it
+    return obj if "value" in obj and "metadata" not in obj else {"value": obj}
+
+
+def render_line(path, lineno, line, fmt) -> Result:
+    try:
+        msg = _message(line)
+        value = msg["value"]
+        if "table-def" not in (value.get("control") or {}):
+            return Result(path, lineno, skipped=True)
+        metadata = value["metadata"]
+        database, table = metadata["schema-name"], metadata["table-name"]
+        match fmt:
+            case "ddl":
+                text = control_msg2ddl(msg)
+            case "tsv":
+                text = control_msg2tsv(msg)
+            case "comment":
+                text = control_msg2comment(msg, tsv=control_msg2tsv(msg))
+            case _:
+                raise ValueError(f"Unsupported format {fmt}")
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return Result(path, lineno, error=f"{type(e).__name__}: {e}")
+    return Result(path, lineno, database, table, text)
+
+
+def _render_batch(batch, fmt):
+    return [render_line(path, lineno, line, fmt) for path, lineno, line in batch]
+
+
+def _batches(items, size):
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def process(paths, fmt="ddl", processes: int = 1, batch_size: int = BATCH, stats: Stats = None):
+    """
+    Yields a Result per non-blank line of ``paths``, in input order.  With
+    more than one process, batches of ``batch_size`` lines are rendered in a
+    process pool, at most two batches per process in flight.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format {fmt}; expected one of {', '.join(FORMATS)}")
+    lines = read_lines(paths)
+
+    def counted(batch, results):
+        if stats is not None:
+            for (_, _, line), result in zip(batch, results):
+                stats.add(result, len(line))
+        return results
+
+    if processes <= 1:
+        for batch in _batches(lines, batch_size):
+            yield from counted(batch, _render_batch(batch, fmt))
+        return
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = deque()
+        for batch in _batches(lines, batch_size):
+            pending.append((batch, pool.submit(_render_batch, batch, fmt)))
+            if len(pending) >= 2 * processes:
+                batch, future = pending.popleft()
+                yield from counted(batch, future.result())
+        while pending:
+            batch, future = pending.popleft()
+            yield from counted(batch, future.result())
+
+
+def _file_part(name) -> str:
+    """A schema or table name from a message, if it is safe in a file name."""
+    if not isinstance(name, str) or not name or name in (".", "..") or "\0" in name \
+            or "/" in name or os.sep in name or (os.altsep and os.altsep in name):
+        raise ValueError(f"unsafe name for a file: {name!r}")
+    return name
+
+
+def write_result(result, out_dir, fmt) -> str:
+    """
+    Write a rendered table to ``out_dir/<database>.<table>.<ext>``; a later
+    message for the table replaces it.
+
+    :raises ValueError: when the database or table name is not a plain file name
+    """
+    name = f"{_file_part(result.database)}.{_file_part(result.table)}.{EXTENSIONS[fmt]}"
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(result.text)
+    return path
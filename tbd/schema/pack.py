@@ -0,0 +1,394 @@
+"""
+Packed hub snapshot.
+
+``tbd pack`` compiles every source file under a hub into ``.tbd.pack``
+in the hub folder: tables and columns as flat arrays pointing into one
+shared string table, aligned so the file can be memory-mapped and read
+without parsing, the same layout as the lineage graph file.
+
+The snapshot keeps a manifest of the files it was built from (path, size,
+mtime).  ``read_hub`` serves tables from it while the manifest matches
+the folder; files that were added, removed or changed since are parsed
+again, only those, and the snapshot is rewritten.  A hub without a
+snapshot is read from YAML as before.
+
+``tbd unpack`` writes the source files back out from a snapshot.  It
+writes what tbd models: sources, tables and columns with their type,
+description, default, flags and meta; other keys are not kept.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from glob import glob
+from os.path import isdir, isfile, join, relpath
+
+import yaml
+
+from tbd.models import Column, Table
+from tbd.models.graph import _Strings, _zeros
+from tbd.schema import from_source_yaml, schema_read
+from tbd.trace import span
+
+__all__ = ["HubSnapshot", "SNAPSHOT", "read_hub", "pack", "unpack", "hub_files"]
+
+SNAPSHOT = ".tbd.pack"
+MAGIC = b"TBDP"
+VERSION = 1
+NONE = 0xFFFFFFFF  # string id for a missing value
+
+# magic, version, byteorder (0 little, 1 big), reserved, files, tables, columns, strings
+_HEADER = struct.Struct("<4sBBHQQQQ")
+_ALIGN = 8
+
+_TABLE_FIELDS = ("name", "description", "source", "database")
+_COLUMN_FIELDS = ("name", "type", "description", "default", "meta")
+_FLAGS = ("nullable", "primary_key", "unique")  # two bits each: unset, false, true
+
+
+def _layout(n_files, n_tables, n_columns, n_strings):
+    """(section, typecode, length) in file order."""
+    return ([("file_path", "I", n_files), ("file_size", "Q", n_files),
+             ("file_mtime", "Q", n_files), ("file_tables", "Q", n_files + 1)]
+            + [(f"table_{f}", "I", n_tables) for f in _TABLE_FIELDS]
+            + [("table_columns", "Q", n_tables + 1)]
+            + [(f"column_{f}", "I", n_columns) for f in _COLUMN_FIELDS]
+            + [("column_flags", "B", n_columns), ("string_offsets", "Q", n_strings + 1)])
+
+
+def _flags(column):
+    bits = 0
+    for i, attr in enumerate(_FLAGS):
+        value = getattr(column, attr)
+        if value is not None:
+            bits |= (2 if value else 1) << (2 * i)
+    return bits
+
+
+def _unflag(bits):
+    out = {}
+    for i, attr in enumerate(_FLAGS):
+        state = bits >> (2 * i) & 3
+        out[attr] = None if state == 0 else state == 2
+    return out
+
+
+def hub_files(origin):
+    """Every file ``schema_read`` would read under ``origin``, in the same order."""
+    for filename in glob(join(origin, "*")):
+        if isdir(filename):
+            yield from hub_files(filename)
+        elif isfile(filename):
+            yield filename
+
+
+def read_source_file(path):
+    """[(source name, database, Table), ...] for one dbt sources file."""
+    with span("parse", file=path), open(path) as fp:
+        with span("yaml.load", file=path):
+            data = yaml.safe_load(fp) or {}
+    out = []
+    for source in data.get("sources", []):
+        for d in source.get("tables", []):
+            out.append((source.get("name"), source.get("database"), Table(**d, filename=path)))
+    return out
+
+
+def _stat(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class HubSnapshot:
+    """
+    Tables of a hub as flat arrays.  ``build`` one from parsed files or
+    ``load`` a file written by ``save``; tables are decoded on access.
+    """
+
+    def __init__(self, root, sections, strings, buffer=None):
+        self.root = root
+        self._s = sections
+        self._strings = strings
+        self._buffer = buffer
+
+    # ---------- construction ----------
+
+    @classmethod
+    def build(cls, root, entries):
+        """
+        ``entries`` is ``[(path, size, mtime_ns, [(source, database, Table), ...]), ...]``.
+        """
+        strings, ids = [], {}
+
+        def intern(value):
+            if value is None:
+                return NONE
+            text = value if isinstance(value, str) else str(value)
+            i = ids.get(text)
+            if i is None:
+                i = ids[text] = len(strings)
+                strings.append(text)
+            return i
+
+        def as_json(value):
+            return json.dumps(value, default=str)
+
+        n_tables = sum(len(tables) for *_, tables in entries)
+        n_columns = sum(len(t.columns) for *_, tables in entries for _, _, t in tables)
+        s = {name: _zeros(code, length) for name, code, length
+             in _layout(len(entries), n_tables, n_columns, 0) if name != "string_offsets"}
+        t = c = 0
+        for f, (path, size, mtime, tables) in enumerate(entries):
+            s["file_path"][f] = intern(relpath(path, root))
+            s["file_size"][f] = size
+            s["file_mtime"][f] = mtime
+            for source, database, table in tables:
+                s["table_name"][t] = intern(table.name)
+                s["table_description"][t] = intern(table.description)
+                s["table_source"][t] = intern(source)
+                s["table_database"][t] = intern(database)
+                for column in table.columns:
+                    s["column_name"][c] = intern(column.name)
+                    s["column_type"][c] = intern(column.dtype)
+                    s["column_description"][c] = intern(column.description)
+                    s["column_default"][c] = intern(as_json(column.default)) \
+                        if column.default is not None else NONE
+                    s["column_meta"][c] = intern(as_json(column.metadata)) if column.metadata else NONE
+                    s["column_flags"][c] = _flags(column)
+                    c += 1
+                t += 1
+                s["table_columns"][t] = c
+            s["file_tables"][f + 1] = t
+        return cls(root, s, _Strings.from_list(strings))
+
+    # ---------- access ----------
+
+    def __len__(self):
+        return len(self._s["table_name"])
+
+    def _str(self, i):
+        return None if i == NONE else self._strings[i]
+
+    def manifest(self):
+        """relative path -> (size, mtime_ns, file index)"""
+        s = self._s
+        return {self._strings[s["file_path"][f]]: (s["file_size"][f], s["file_mtime"][f], f)
+                for f in range(len(s["file_path"]))}
+
+    def file_tables(self, f):
+        """Table indexes that came from file ``f``."""
+        return range(self._s["file_tables"][f], self._s["file_tables"][f + 1])
+
+    def name(self, t):
+        return self._strings[self._s["table_name"][t]]
+
+    def source(self, t):
+        return self._str(self._s["table_source"][t]), self._str(self._s["table_database"][t])
+
+    def table(self, t, filename=None):
+        s = self._s
+        columns = []
+        for c in range(s["table_columns"][t], s["table_columns"][t + 1]):
+            default, meta = s["column_default"][c], s["column_meta"][c]
+            columns.append(Column(
+                self._strings[s["column_name"][c]],
+                dtype=self._str(s["column_type"][c]),
+                description=self._str(s["column_description"][c]),
+                default=None if default == NONE else json.loads(self._strings[default]),
+                metadata=None if meta == NONE else json.loads(self._strings[meta]),
+                **_unflag(s["column_flags"][c])))
+        return Table(self.name(t), columns=columns,
+                     description=self._str(s["table_description"][t]), filename=filename)
+
+    def file_entry(self, f, path):
+        return [(*self.source(t), self.table(t, path)) for t in self.file_tables(f)]
+
+    # ---------- persistence ----------
+
+    def save(self, output_path):
+        """Write atomically, so a reader never sees a half-written snapshot."""
+        s = self._s
+        byteorder = 0 if sys.byteorder == "little" else 1
+        layout = _layout(len(s["file_path"]), len(self), len(s["column_name"]), len(self._strings))
+        tmp = f"{output_path}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, VERSION, byteorder, 0, len(s["file_path"]), len(self),
+                                     len(s["column_name"]), len(self._strings)))
+                pos = _HEADER.size
+                sections = [s[name] for name, _, _ in layout[:-1]]
+                sections += [self._strings.offsets, self._strings.blob]
+                for section in sections:
+                    pad = -pos % _ALIGN
+                    f.write(bytes(pad))
+                    data = memoryview(section).cast("B")
+                    f.write(data)
+                    pos += pad + len(data)
+            os.replace(tmp, output_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path, root=None, use_mmap=True):
+        """Open a snapshot; ``root`` defaults to the folder it is in."""
+        with open(path, "rb") as f:
+            if use_mmap:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buf = f.read()
+        if len(buf) < _HEADER.size:
+            raise ValueError(f"{path} is not a hub snapshot")
+        magic, version, byteorder, _, *counts = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a hub snapshot")
+        if version != VERSION:
+            raise ValueError(f"Unsupported hub snapshot version {version} in {path}")
+        swap = byteorder != (0 if sys.byteorder == "little" else 1)
+
+        view = memoryview(buf)
+        pos = _HEADER.size
+        sections = {}
+        for name, typecode, count in _layout(*counts) + [("string_blob", "B", None)]:
+            if count is None:
+                count = sections["string_offsets"][-1]
+            pos += -pos % _ALIGN
+            size = _zeros(typecode, 0).itemsize * count
+            chunk = view[pos:pos + size]
+            pos += size
+            if typecode == "B":
+                sections[name] = chunk
+            elif swap:
+                arr = _zeros(typecode, 0)
+                arr.frombytes(chunk)
+                arr.byteswap()
+                sections[name] = arr
+            else:
+                sections[name] = chunk.cast(typecode)
+        strings = _Strings(sections.pop("string_offsets"), sections.pop("string_blob"))
+        return cls(root or os.path.dirname(os.path.abspath(path)), sections, strings, buf)
+
+    def __repr__(self):
+        return f"HubSnapshot(files={len(self._s['file_path'])}, tables={len(self)})"
+
+
+def _refresh(origin, snapshot):
+    """
+    ``build`` entries for the files under ``origin`` now, reusing the
+    snapshot for unchanged files, and whether anything changed.
+    """
+    known = snapshot.manifest() if snapshot is not None else {}
+    entries, changed = [], snapshot is None
+    for path in hub_files(origin):
+        size, mtime = _stat(path)
+        hit = known.pop(relpath(path, origin), None)
+        if hit is not None and hit[:2] == (size, mtime):
+            entries.append((path, size, mtime, snapshot.file_entry(hit[2], path)))
+        else:
+            entries.append((path, size, mtime, read_source_file(path)))
+            changed = True
+    return entries, changed or bool(known)
+
+
+def _open_snapshot(origin):
+    path = join(origin, SNAPSHOT)
+    if not isfile(path):
+        return None
+    try:
+        return HubSnapshot.load(path, root=origin)
+    except ValueError:
+        return None
+
+
+def _fresh(origin, snapshot):
+    known = snapshot.manifest()
+    count = 0
+    for path in hub_files(origin):
+        hit = known.get(relpath(path, origin))
+        if hit is None or hit[:2] != _stat(path):
+            return False
+        count += 1
+    return count == len(known)
+
+
+def read_hub(origin, match=None):
+    """
+    Tables under ``origin``, like ``schema_read`` with ``from_source_yaml``,
+    served from the hub snapshot when there is one.  ``match`` filters on
+    table name before a table is decoded.  A stale snapshot is rebuilt and
+    saved; on a read-only hub the rebuilt one is served without saving.
+    """
+    snapshot = _open_snapshot(origin) if isdir(origin) else None
+    if snapshot is None:
+        for table in schema_read(in_file=origin, schema_reader=from_source_yaml):
+            if match is None or match(table.name):
+                yield table
+        return
+
+    with span("snapshot.check", file=origin):
+        fresh = _fresh(origin, snapshot)
+    if not fresh:
+        with span("snapshot.refresh", file=origin):
+            entries, _ = _refresh(origin, snapshot)
+            snapshot = HubSnapshot.build(origin, entries)
+            try:
+                snapshot.save(join(origin, SNAPSHOT))
+            except OSError:
+                pass
+    for path, (_, _, f) in snapshot.manifest().items():
+        filename = join(origin, path)
+        for t in snapshot.file_tables(f):
+            if match is None or match(snapshot.name(t)):
+                yield snapshot.table(t, filename)
+
+
+def pack(origin):
+    """(Re)build ``origin``'s snapshot; returns it."""
+    with span("pack", file=origin):
+        entries, _ = _refresh(origin, _open_snapshot(origin))
+        snapshot = HubSnapshot.build(origin, entries)
+        snapshot.save(join(origin, SNAPSHOT))
+    return snapshot
+
+
+def _column_yaml(column):
+    d = {"name": column.name}
+    if column.dtype is not None:
+        d["type"] = column.dtype
+    if column.description is not None:
+        d["description"] = column.description
+    for attr in ("nullable", "default", "primary_key", "unique"):
+        value = getattr(column, attr)
+        if value is not None:
+            d[attr] = value
+    if column.metadata:
+        d["meta"] = column.metadata
+    return d
+
+
+def unpack(path, dest):
+    """Write the source files in the snapshot at ``path`` under ``dest``; returns the file count."""
+    snapshot = HubSnapshot.load(path)
+    count = 0
+    for rel, (_, _, f) in snapshot.manifest().items():
+        sources = {}
+        for t in snapshot.file_tables(f):
+            source, database = snapshot.source(t)
+            table = snapshot.table(t)
+            entry = sources.setdefault((source, database), {"name": source, "database": database,
+                                                            "tables": []})
+            d = {"name": table.name}
+            if table.description is not None:
+                d["description"] = table.description
+            d["columns"] = [_column_yaml(c) for c in table.columns]
+            entry["tables"].append(d)
+        out = join(dest, rel)
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with span("write", file=out), open(out, "w") as fp:
+            yaml.safe_dump({"version": 2, "sources": [
+                {k: v for k, v in s.items() if v is not None} for s in sources.values()]},
+                fp, sort_keys=False)
+        count += 1
+    return count
@@ -0,0 +1,220 @@
+"""
+Nested timing spans for finding where a tbd run spends its time.
+
+    from tbd.trace import span
+
+    with span("parse", file=path):
+        ...
+    with span("http GET /api/...") as s:
+        s["status"] = 200
+
+A span that exits with an exception records its type, and its HTTP code
+as ``status`` when it has one.
+
+Tracing is off unless ``tbd --profile`` or the TBD_TRACE environment
+variable turns it on; off, ``span`` returns a shared no-op, so leaving the
+calls in costs a function call and a global lookup.
+
+TBD_TRACE is ``MODE[:PATH]``:
+
+- ``summary``   per span name: calls, total, self and max time (also
+                TBD_TRACE=1, true or yes), printed to stderr or written to PATH
+- ``chrome``    Chrome trace event JSON (chrome://tracing, Perfetto),
+                PATH defaults to tbd-trace.json
+- ``cprofile``  a cProfile dump for pstats/snakeviz, PATH defaults to
+                tbd.prof; spans are not recorded
+
+Other values are ignored with a warning.  Output is written when the
+process exits.
+"""
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+__all__ = ["span", "enable", "disable", "finish", "enabled", "endpoint", "MODES"]
+
+MODES = ("summary", "chrome", "cprofile")
+DEFAULT_PATHS = {"summary": None, "chrome": "tbd-trace.json", "cprofile": "tbd.prof"}
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setitem__(self, key, value):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "attrs", "start", "child")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.child = 0
+
+    def __setitem__(self, key, value):
+        self.attrs[key] = value
+
+    def __enter__(self):
+        self.tracer._stack().append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+            if isinstance(getattr(exc, "code", None), int):  # urllib's HTTPError
+                self.attrs.setdefault("status", exc.code)
+        stack = self.tracer._stack()
+        stack.pop()
+        duration = end - self.start
+        if stack:
+            stack[-1].child += duration
+        self.tracer.events.append((self.name, self.start, duration, duration - self.child,
+                                   threading.get_ident(), len(stack), self.attrs))
+        return False
+
+
+class Tracer:
+    def __init__(self):
+        self.events = []  # (name, start ns, duration ns, self ns, thread, depth, attrs)
+        self.origin = time.perf_counter_ns()
+        self._local = threading.local()
+
+    def _stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def summary(self) -> str:
+        rows = {}
+        for name, _, duration, own, _, _, _ in self.events:
+            calls, total, self_total, longest = rows.get(name, (0, 0, 0, 0))
+            rows[name] = (calls + 1, total + duration, self_total + own, max(longest, duration))
+        wall = (time.perf_counter_ns() - self.origin) or 1
+        lines = [f"{'span':<48}{'calls':>8}{'total ms':>11}{'self ms':>11}{'max ms':>10}{'% wall':>8}"]
+        for name, (calls, total, own, longest) in sorted(rows.items(), key=lambda kv: -kv[1][2]):
+            lines.append(f"{name[:47]:<48}{calls:>8}{total / 1e6:>11.1f}{own / 1e6:>11.1f}"
+                         f"{longest / 1e6:>10.1f}{100 * own / wall:>7.1f}%")
+        lines.append(f"{'wall':<48}{'':>8}{wall / 1e6:>11.1f}")
+        return "\n".join(lines)
+
+    def chrome(self) -> dict:
+        pid = os.getpid()
+        threads = {}
+        events = []
+        for name, start, duration, _, thread, _, attrs in self.events:
+            tid = threads.setdefault(thread, len(threads) + 1)
+            events.append({"name": name, "cat": name.split(" ", 1)[0], "ph": "X", "pid": pid, "tid": tid,
+                           "ts": (start - self.origin) / 1000, "dur": duration / 1000,
+                           "args": {k: v if isinstance(v, (int, float, bool)) else str(v)
+                                    for k, v in attrs.items()}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+_tracer = None
+_profiler = None
+_output = (None, None)  # mode, path
+
+
+def span(name: str, **attrs):
+    """Context manager timing ``name``; a no-op unless tracing is enabled."""
+    if _tracer is None:
+        return _NULL
+    return _Span(_tracer, name, attrs)
+
+
+def enabled() -> bool:
+    return _tracer is not None or _profiler is not None
+
+
+def enable(mode: str = "summary", path: str | None = None) -> None:
+    """Start recording; output is written by finish(), which runs at exit."""
+    global _tracer, _profiler, _output
+    if mode not in MODES:
+        raise ValueError(f"Unknown trace mode {mode!r}; expected one of {', '.join(MODES)}")
+    disable()
+    _output = mode, path or DEFAULT_PATHS[mode]
+    if mode == "cprofile":
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    else:
+        _tracer = Tracer()
+
+
+def disable() -> None:
+    global _tracer, _profiler
+    if _profiler is not None:
+        _profiler.disable()
+    _tracer = _profiler = None
+
+
+def finish() -> None:
+    """Write what was recorded and stop; safe to call more than once."""
+    global _output
+    mode, path = _output
+    tracer, profiler = _tracer, _profiler
+    disable()
+    _output = (None, None)
+    if mode == "cprofile" and profiler is not None:
+        profiler.dump_stats(path)
+        print(f"tbd: cProfile stats written to {path}", file=sys.stderr)
+    elif mode == "chrome" and tracer is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(tracer.chrome(), f)
+        print(f"tbd: Chrome trace written to {path}", file=sys.stderr)
+    elif mode == "summary" and tracer is not None:
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(tracer.summary() + "\n")
+        else:
+            print(tracer.summary(), file=sys.stderr)
+
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8,}(-[0-9a-f]+)*|.*[.%].*)$", re.IGNORECASE)
+
+
+def endpoint(path: str) -> str:
+    """API path with ids and names collapsed, so calls group by endpoint."""
+    path = path.split("?", 1)[0]
+    return "/".join("{}" if _ID_SEGMENT.match(part) and i > 3 else part
+                    for i, part in enumerate(path.split("/")))
+
+
+_OFF = ("", "0", "false", "no", "off")
+_ON = ("1", "true", "yes", "on")
+
+
+def _from_env():
+    """Apply TBD_TRACE; runs at import, so a bad value warns instead of raising."""
+    mode, _, path = os.environ.get("TBD_TRACE", "").strip().partition(":")
+    mode = mode.lower()
+    if mode in _OFF:
+        return
+    if mode in _ON:
+        mode = "summary"
+    if mode not in MODES:
+        print(f"tbd: ignoring TBD_TRACE={mode!r}; expected 1 or one of {', '.join(MODES)}",
+              file=sys.stderr)
+        return
+    enable(mode, path or None)
+
+
+atexit.register(finish)
+_from_env()
@@ -0,0 +1,43 @@
+import sys
+
+from clients.databricks.impact import impact, traverse_downstream
+from clients.databricks.mock import MockWorkspace, serve, synthetic_lineage
+
+# the package re-exports impact(), which hides the module of the same name
+crawler = sys.modules["clients.databricks.impact"]
+
+
+def reachable(lineage, roots):
+    seen, stack = set(), list(roots)
+    while stack:
+        name = stack.pop()
+        if name not in seen:
+            seen.add(name)
+            stack.extend(lineage[name])
+    return seen
+
+
+class TestCrawl:
+    def test_paged_flaky_crawl(self, monkeypatch, capsys):
+        monkeypatch.setattr(crawler, "RETRY_DELAY", 0)
+        lineage = synthetic_lineage(300, schemas=3, fanout=3, window=20, seed=1)
+        workspace = MockWorkspace(lineage=lineage, page_size=7, error_rate=0.2, seed=2)
+        with serve(workspace) as host:
+            report = impact("main", "s0", host=host, token="t", delay=0)
+        roots = [n for n in lineage if n.startswith("main.s0.")]
+        assert set(report.graph) == reachable(lineage, roots)
+        name = next(n for n in report.graph if n.startswith("main.s1."))
+        node = report.graph[name]
+        assert node["downstream"] == lineage[name]
+        assert node["metadata"]["email"] == "etl.s1@example.com"
+        assert workspace.errors > 0
+        assert len(workspace.timings["tables"]) >= 100 / 7
+
+    def test_long_chain(self, capsys):
+        lineage = synthetic_lineage(1200, fanout=1, window=1)
+        lineage = {n: [m] for n, m in zip(lineage, list(lineage)[1:])} | {"main.s0.t001199": []}
+        with serve(MockWorkspace(lineage=lineage, page_size=1000)) as host:
+            visited, graph = set(), {}
+            traverse_downstream(host, "t", "main.s0.t000000", visited, graph, delay=0)
+        assert len(graph) == 1200
+        assert capsys.readouterr().out.splitlines()[-1].strip() == "↳ main.s0.t001199"
@@ -0,0 +1,39 @@
+from tbd.models import Column, Table
+from tbd.schema.diff import TableFingerprint, changed_tables, diff
+from tbd.schema.typemap import convert_mysql2spark
+
+
+def table(name, *columns):
+    """columns are (name, type) or (name, type, {flag: value})"""
+    return Table(name, columns=[Column(c[0], dtype=c[1], **(c[2] if len(c) > 2 else {})) for c in columns])
+
+
+class TestDiff:
+    def test_fingerprint_ignores_order_and_descriptions(self):
+        a = table("t", ("id", "BIGINT"), ("name", "STRING"))
+        b = Table("t", columns=[Column("name", dtype="STRING", description="x"), Column("id", dtype="BIGINT")])
+        assert TableFingerprint(a) == TableFingerprint(b)
+        assert TableFingerprint(a) != TableFingerprint(table("t", ("id", "BIGINT"), ("name", "INT")))
+        assert TableFingerprint(a) != TableFingerprint(table("t", ("id", "BIGINT", {"primary_key": True}),
+                                                             ("name", "STRING")))
+
+    def test_changes(self):
+        origin = [table("same", ("id", "bigint")),
+                  table("new", ("id", "bigint")),
+                  table("changed", ("id", "int(11)"), ("added", "varchar(10)"),
+                        ("flagged", "bigint", {"nullable": False}))]
+        hub = [table("same", ("id", "BIGINT")),
+               table("changed", ("id", "BIGINT"), ("dropped", "STRING"), ("flagged", "BIGINT")),
+               table("gone", ("id", "BIGINT"))]
+        changes = list(diff(origin, hub, normalize=convert_mysql2spark))
+        assert changes == [
+            {"change": "table_added", "table": "new", "columns": 1},
+            {"change": "type_changed", "table": "changed", "column": "id", "from": "BIGINT", "to": "INT"},
+            {"change": "column_added", "table": "changed", "column": "added", "type": "STRING"},
+            {"change": "flags_changed", "table": "changed", "column": "flagged",
+             "from": {"nullable": None, "primary_key": None, "unique": None},
+             "to": {"nullable": False, "primary_key": None, "unique": None}},
+            {"change": "column_dropped", "table": "changed", "column": "dropped", "type": "STRING"},
+            {"change": "table_dropped", "table": "gone", "columns": 1},
+        ]
+        assert [t.name for t in changed_tables(origin, hub, normalize=convert_mysql2spark)] == ["new", "changed"]
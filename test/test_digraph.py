@@ -0,0 +1,25 @@
+from clients.databricks.impact.digraph import neighbourhood, collapse, to_dot, to_svg
+from tbd.models import LineageGraph
+
+from test_graph import NODES
+
+
+class TestSlice:
+    def test_neighbourhood(self):
+        g = LineageGraph.from_dict(NODES)
+        assert neighbourhood(g, ["main.stg.b"], hops=1) == {
+            "main.stg.b": 0, "main.mart.d": 1, "main.raw.a": -1}
+        assert neighbourhood(g, ["main.stg.b"], hops=5, direction="down") == {
+            "main.stg.b": 0, "main.mart.d": 1, "main.mart.e": 2}
+
+    def test_collapse_and_render(self):
+        g = LineageGraph.from_dict(NODES)
+        layers = neighbourhood(g, ["main.raw.a"], hops=3)
+        layers, edges, sizes = collapse(g, layers, "schema", keep=["main.raw.a"])
+        assert layers == {"main.raw.a": 0, "[main.stg]": 1, "[main.mart]": 2}
+        assert edges == [("main.raw.a", "[main.stg]"), ("[main.stg]", "[main.mart]")]
+        assert sizes["[main.mart]"] == 2
+        dot = to_dot(layers, edges, seeds={"main.raw.a"}, sizes=sizes)
+        assert '"[main.stg]" -> "[main.mart]";' in dot
+        assert 'label="[main.mart] (2)"' in dot
+        assert to_svg(layers, edges, sizes=sizes).count("<rect") == 3
@@ -0,0 +1,203 @@
+import io
+import json
+import re
+
+import pytest
+
+from clients.databricks import dlux
+from clients.databricks.mock import MockWorkspace, serve
+
+HISTORY_COLUMNS = [{"name": n, "type_name": "STRING"} for n in (
+    "account_id", "workspace_id", "statement_id", "executed_by", "executed_by_user_id",
+    "warehouse_id", "client_application", "client_driver", "statement_type",
+    "error_message", "statement_text")]
+
+
+def history_rows(n):
+    return [["acc", "ws", f"s{i}", f"user{i % 3}@acme.com", "u", "wh", "Tableau", "odbc", "SELECT",
+             f"User does not have SELECT privilege on table `main`.`sales`.`t{i % 5}`",
+             f"SELECT * FROM main.sales.t{i % 5}"] for i in range(n)]
+
+
+class TestDlux:
+    def test_stream_external_links(self):
+        rows = history_rows(2500)
+        workspace = MockWorkspace(results=lambda sql: (HISTORY_COLUMNS, rows), chunk_rows=1000)
+        with serve(workspace) as host:
+            stream = dlux.execute_sql_and_stream(host, "t", "wh", dlux.build_sql(10, None))
+            out = io.StringIO()
+            assert dlux.write_records(map(dlux.enrich, stream), out, "ndjson") == 2500
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert records[7]["statement_id"] == "s7"
+        assert records[7]["resource_hint"] == "main.sales.t2"
+
+    def test_json_array_output(self):
+        records = [{"a": 1, "b": [1, 2]}, {"a": 2, "b": []}]
+        out = io.StringIO()
+        dlux.write_records(iter(records), out)
+        assert out.getvalue() == json.dumps(records, indent=2) + "\n"
+        out = io.StringIO()
+        dlux.write_records(iter([]), out)
+        assert out.getvalue() == "[]\n"
+
+    def test_sql_filters_in_warehouse(self):
+        sql = dlux.build_sql(50, "client_application = 'Tableau'", since="24h", until="2026-01-01 00:00:00")
+        assert "error_message RLIKE r'(?i)not authorized|permission denied" in sql
+        assert "end_time >= current_timestamp() - INTERVAL 24 HOURS" in sql
+        assert "end_time < TIMESTAMP '2026-01-01 00:00:00'" in sql
+        assert "AND (client_application = 'Tableau')" in sql
+        assert "ELSE left(statement_text, 4000) END AS statement_text" in sql
+        assert "statement_text" not in dlux.build_sql(50, None, statement_text="none")
+        assert "RLIKE" not in dlux.build_sql(50, None, privilege_only=False, statement_text="none")
+
+    def test_time_bound_quotes(self):
+        assert dlux.time_bound("7d") == "current_timestamp() - INTERVAL 7 DAYS"
+        assert dlux.time_bound("x' OR '1'='1") == "TIMESTAMP 'x'' OR ''1''=''1'"
+
+    def test_statement_text_only_when_needed(self):
+        # the SQL CASE skips statement_text exactly when the message alone gives a hint;
+        # this mirrors its terms: some pattern's first match has a non-keyword group
+        def named(message):
+            return any(m and any(g and g.lower() not in dlux.RESOURCE_KEYWORDS for g in m.groups())
+                       for m in (rx.search(message) for rx in dlux.RESOURCE_REGEXES))
+
+        for message in ("User does not have SELECT privilege on table `main`.`sales`.`t1`",
+                        "PERMISSION_DENIED: on schema `finance`",
+                        "Access denied to main.sales.t1",
+                        "access denied",
+                        "VIEW view is not accessible; see Table Sales",
+                        "denied on TABLE table"):
+            assert named(message) == (dlux.extract_resource_hint(message) is not None)
+        assert "lower(regexp_extract(error_message, r'(?i)(table|view|function|volume)" \
+               "\\s+([A-Za-z0-9_\\-]+)', 2)) NOT IN ('', 'catalog', 'database'" in dlux.resource_predicate()
+
+    def test_aggregate_in_warehouse(self):
+        columns = [{"name": "executed_by", "type_name": "STRING"},
+                   {"name": "resource_hint", "type_name": "STRING"},
+                   {"name": "failures", "type_name": "LONG"}]
+        statements = []
+
+        def results(sql):
+            statements.append(sql)
+            return columns, [["alice@acme.com", "main.sales.t1", "42"]]
+
+        sql = dlux.build_sql(10, None, aggregate=True)
+        assert "GROUP BY executed_by, resource_hint" in sql
+        with serve(MockWorkspace(results=results)) as host:
+            rows = list(dlux.execute_sql_and_stream(host, "t", "wh", sql, coerce=True))
+        assert statements == [sql]
+        assert rows == [{"executed_by": "alice@acme.com", "resource_hint": "main.sales.t1", "failures": 42}]
+
+    def test_follow_resumes_from_watermark(self, tmp_path):
+        columns = [{"name": n, "type_name": "STRING"} for n in
+                   ("statement_id", "executed_by", "end_time", "error_message", "statement_text")]
+        history = [[f"s{i:03d}", "bob@acme.com", f"2026-10-19T10:{i // 2:02d}:00Z", "Access denied", None]
+                   for i in range(25)]
+
+        def results(sql):
+            m = re.search(r"end_time = TIMESTAMP '([^']+)' AND statement_id > '([^']+)'", sql)
+            mark = (m.group(1), m.group(2)) if m else ("", "")
+            limit = int(re.search(r"LIMIT (\d+)", sql).group(1))
+            return columns, [r for r in history if (r[2], r[0]) > mark][:limit]
+
+        class Stop(Exception):
+            pass
+
+        naps = []
+
+        def nap(seconds):
+            naps.append(seconds)
+            raise Stop
+
+        state = str(tmp_path / "mark.json")
+        with serve(MockWorkspace(results=results)) as host:
+            # full batches are fetched back to back, no sleeping
+            first = list(dlux.follow(host, "t", "wh", state, limit=10, once=True, sleep=nap))
+            assert [r["statement_id"] for r in first] == [f"s{i:03d}" for i in range(25)]
+            assert dlux.load_watermark(state) == ("2026-10-19T10:12:00Z", "s024")
+
+            history.append(["s025", "bob@acme.com", "2026-10-19T10:12:00Z", "Access denied", None])
+            rows = dlux.follow(host, "t", "wh", state, limit=10, interval=5, sleep=nap)
+            assert next(rows)["statement_id"] == "s025"
+            with pytest.raises(Stop):
+                next(rows)
+        assert naps == [5]
+        assert dlux.load_watermark(state) == ("2026-10-19T10:12:00Z", "s025")
+        assert "ORDER BY end_time, statement_id" in dlux.build_sql(10, after=("t", "s"))
+
+    def test_case_folded_hints_match_reference(self):
+        from clients.databricks.dlux.hints import _hint_in_turn
+        cases = {
+            "PERMISSION_DENIED on SCHEMA `Main.Sales`": "Main.Sales",
+            "denied on TABLE Orders_2024 and table `a`.`B`.`c`": "a.B.c",
+            # first match is all keywords, so later regexes decide (none match)
+            "VIEW view is not accessible; see Table Sales": None,
+            "Zugriff verweigert für Tabelle ümlaut.x.y on TABLE Ärger": None,
+            "no resource here": None,
+        }
+        for message, hint in cases.items():
+            assert _hint_in_turn(message) == hint
+            assert dlux.extract_resource_hint(message) == hint
+        pairs = [(m, "SELECT * FROM c.s.t") for m in cases] + [(None, None)]
+        assert dlux.resource_hints(pairs) == [h or "c.s.t" for h in cases.values()] + [None]
+
+    def test_enrich_stream_in_processes(self):
+        rows = [dict(zip([c["name"] for c in HISTORY_COLUMNS], r)) for r in history_rows(50)]
+        expected = list(map(dlux.enrich, rows))
+        assert list(dlux.enrich_stream(iter(rows), processes=2, batch_size=7)) == expected
+
+    def test_follow_cycle_flushes_pool(self, tmp_path):
+        columns = [{"name": n, "type_name": "STRING"} for n in
+                   ("statement_id", "executed_by", "end_time", "error_message", "statement_text")]
+        history = [[f"s{i}", "bob@acme.com", f"2026-10-19T10:0{i}:00Z", "Access denied", "SELECT 1 FROM a.b.c"]
+                   for i in range(3)]
+
+        class Stop(Exception):
+            pass
+
+        naps = []
+
+        def nap(seconds):
+            naps.append(seconds)
+            raise Stop
+
+        state = str(tmp_path / "mark.json")
+        with serve(MockWorkspace(results=lambda sql: (columns, history))) as host:
+            rows = dlux.follow(host, "t", "wh", state, limit=10, interval=5, sleep=nap, boundaries=True)
+            records = dlux.enrich_stream(rows, processes=2, batch_size=dlux.ENRICH_BATCH)
+            # a short cycle comes out without waiting for a full batch or the next cycle
+            assert [next(records)["statement_id"] for _ in range(3)] == ["s0", "s1", "s2"]
+            assert naps == [] and dlux.load_watermark(state) is None
+            with pytest.raises(Stop):
+                next(records)
+        assert naps == [5]
+        assert dlux.load_watermark(state) == ("2026-10-19T10:02:00Z", "s2")
+
+
+class TestRollup:
+    def test_exact_groups(self):
+        records = [{"executed_by": f"u{i % 3}", "resource_hint": f"t{i % 2}",
+                    "statement_id": f"s{i}", "end_time": f"2026-10-19T10:{i:02d}:00Z"} for i in range(30)]
+        rollup = dlux.Rollup(["executed_by", "resource_hint"], samples=2).update(records)
+        groups = rollup.groups()
+        assert rollup.exact and len(groups) == 6
+        assert sum(g["count"] for g in groups) == 30
+        g = next(g for g in groups if (g["executed_by"], g["resource_hint"]) == ("u1", "t0"))
+        assert g == {"executed_by": "u1", "resource_hint": "t0", "count": 5, "count_error": 0,
+                     "first_seen": "2026-10-19T10:04:00Z", "last_seen": "2026-10-19T10:28:00Z",
+                     "sample_statement_ids": ["s4", "s10"]}
+
+    def test_heavy_hitters_past_max_groups(self):
+        records = []
+        for i in range(5000):
+            records.append({"executed_by": "hot"})
+            records.append({"executed_by": f"cold{i}"})
+            if i % 2:
+                records.append({"executed_by": "warm"})
+        rollup = dlux.Rollup(["executed_by"], max_groups=64).update(records)
+        groups = rollup.groups(limit=2)
+        assert not rollup.exact
+        assert len(rollup.groups()) <= 64
+        assert [g["executed_by"] for g in groups] == ["hot", "warm"]
+        assert groups[0]["count"] == 5000 and groups[0]["count_error"] == 0
+        assert groups[1]["count"] == 2500
@@ -0,0 +1,77 @@
+import json
+
+from tbd.schema.formatters.dms import Stats, process, write_result
+
+
+def control(database, table, **columns):
+    return json.dumps({"control": {"table-def": {"columns": {n: {"type": t} for n, t in columns.items()},
+                                                 "primary-key": ["id"]}},
+                       "metadata": {"record-type": "control", "schema-name": database, "table-name": table}})
+
+
+LINES = [
+    control("shop", "orders", id="INT", total="DECIMAL(12,2)"),
+    json.dumps({"data": {"id": 1}, "metadata": {"record-type": "data"}}),
+    "{not json",
+    "",
+    json.dumps({"value": json.loads(control("shop", "users", id="BIGINT", email="VARCHAR(255)"))}),
+    json.dumps({"control": {"table-def": {}}, "metadata": {"schema-name": "shop", "table-name": "bad"}}),
+]
+
+
+def stream(tmp_path):
+    path = tmp_path / "dms.jsonl"
+    path.write_text("\n".join(LINES) + "\n")
+    return str(path)
+
+
+class TestDms:
+    def test_every_line_in_order_and_errors_do_not_stop(self, tmp_path):
+        stats = Stats()
+        results = list(process([stream(tmp_path)], "ddl", stats=stats))
+        assert [(r.lineno, r.table, r.skipped, r.error is not None) for r in results] == [
+            (1, "orders", False, False), (2, None, True, False), (3, None, False, True),
+            (5, "users", False, False), (6, None, False, True)]
+        assert "total  DECIMAL" in results[0].text
+        assert results[2].error.startswith("JSONDecodeError")
+        assert results[4].error.startswith("KeyError")
+        assert (stats.lines, stats.rendered, stats.skipped, stats.errors, len(stats.tables)) == (5, 2, 1, 2, 2)
+        assert "5 messages" in stats.summary()
+
+    def test_comment_and_pool_match_serial(self, tmp_path):
+        path = stream(tmp_path)
+        serial = [(r.lineno, r.text, r.error) for r in process([path], "comment")]
+        pooled = [(r.lineno, r.text, r.error) for r in process([path], "comment", processes=2, batch_size=2)]
+        assert pooled == serial
+        assert serial[0][1] == ("COMMENT ON TABLE shop.orders IS "
+                                "'Auto-Generated Documentation from cdcetl schemer PRIMARY KEY: id';\n"
+                                "COMMENT ON COLUMN shop.orders.id IS 'PRIMARY KEY: id (MySQL:INT)';\n"
+                                "COMMENT ON COLUMN shop.orders.total IS '(MySQL: DECIMAL(12,2))';\n")
+
+    def test_write_per_table(self, tmp_path):
+        out = tmp_path / "out"
+        for result in process([stream(tmp_path)], "tsv"):
+            if result.text:
+                write_result(result, str(out), "tsv")
+        assert sorted(p.name for p in out.iterdir()) == ["shop.orders.tsv", "shop.users.tsv"]
+
+    def test_malformed_comment_row_is_an_error(self, tmp_path):
+        path = tmp_path / "tab.jsonl"
+        path.write_text(control("shop", "bad\ttable", id="INT") + "\n")
+        result, = process([str(path)], "comment")
+        assert result.text is None
+        assert result.error.startswith("ValueError: malformed TSV row")
+
+    def test_unsafe_names_do_not_stop_out(self, tmp_path, monkeypatch, capsys):
+        from tbd.schema.formatters.__main__ import main
+
+        path = tmp_path / "names.jsonl"
+        path.write_text("\n".join([control("shop", "a/b", id="INT"), control("..", "x", id="INT"),
+                                   control("shop", "ok", id="INT")]) + "\n")
+        out = tmp_path / "out"
+        monkeypatch.setattr("sys.argv", ["formatters", "--out", str(out), str(path)])
+        main()
+        assert [p.name for p in out.iterdir()] == ["shop.ok.sql"]
+        err = capsys.readouterr().err
+        assert f"{path}:1: ValueError: unsafe name" in err and f"{path}:2:" in err
+        assert "(1 rendered, 1 tables, 0 skipped, 2 errors)" in err
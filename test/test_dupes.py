@@ -0,0 +1,32 @@
+from tbd.models import Column, Table
+from tbd.schema.dupes import DupeIndex, jaccard
+
+
+def table(name, columns, filename):
+    return Table(name, columns=[Column(n, dtype="bigint") for n in columns], filename=filename)
+
+
+COLUMNS = [f"col_{i}" for i in range(10)]
+
+
+class TestDupes:
+    def test_identical_and_similar_clusters(self):
+        tables = [table("orders", COLUMNS, f"hub/shard_{i}/orders.source.yaml") for i in range(3)]
+        tables += [table("orders", COLUMNS[:9], "hub/staging/orders.source.yaml"),  # 0.9 similar
+                   table("payments", COLUMNS[:5] + ["x", "y", "z"], "hub/a/payments.source.yaml"),
+                   table("users", ["id", "email"], "hub/a/users.source.yaml"),
+                   table("users", ["id", "email"], "hub/b/users.source.yaml")]
+        clusters = DupeIndex(threshold=0.8).update(tables).clusters()
+        assert [(len(c["tables"]), c["identical"], c["similarity"]) for c in clusters] == \
+            [(4, False, 0.9), (2, True, 1.0)]
+        assert {t.filename for t in clusters[1]["tables"]} == {"hub/a/users.source.yaml",
+                                                               "hub/b/users.source.yaml"}
+
+    def test_signature_estimates_jaccard(self):
+        index = DupeIndex()
+        a = {f"c{i}:int" for i in range(40)}
+        b = {f"c{i}:int" for i in range(10, 50)}
+        sa, sb = index.signature(a), index.signature(b)
+        estimate = sum(x == y for x, y in zip(sa, sb)) / len(sa)
+        assert abs(estimate - jaccard(a, b)) < 0.25
+        assert index.signature(a) == sa
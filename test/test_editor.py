@@ -0,0 +1,64 @@
+from tbd.editor.ncurses import COLUMN_FIELDS, LineCache, TableView, scroll
+from tbd.models import Column, Table
+
+
+class FakeWindow:
+    def __init__(self, h=40, w=120):
+        self.size = (h, w)
+        self.written = []
+
+    def getmaxyx(self):
+        return self.size
+
+    def addstr(self, y, x, text, attr=0):
+        self.written.append((y, x, text))
+
+    def erase(self):
+        pass
+
+
+def wide(n):
+    return Table("wide", columns=[Column(f"col_{i}", dtype="bigint", description=f"d{i}") for i in range(n)])
+
+
+class TestEditor:
+    def test_fields_by_index(self):
+        view = TableView(wide(3))
+        assert len(view) == 1 + 3 * len(COLUMN_FIELDS)
+        assert view.field(0)[0] == "Table description"
+        header = view.column_field(2)
+        assert view.field(header) == ("Column: col_2", None, view.columns[2], None)
+        assert view.field(header + 2)[1:] == ("bigint", view.columns[2], "type")
+        assert view.line(header + 6) == f"{'  description':<20} : d2"
+
+    def test_find_wraps(self):
+        view = TableView(wide(30))
+        assert view.find("COL_2") == view.column_field(2)
+        assert view.find("col_2", view.column_field(3)) == view.column_field(20)
+        assert view.find("col_1", view.column_field(29)) == view.column_field(1)
+        assert view.find("nope") is None
+
+    def test_scroll(self):
+        assert scroll(0, 5, 10) == 0
+        assert scroll(0, 12, 10) == 3
+        assert scroll(8, 2, 10) == 2
+
+    def test_only_changed_lines_are_written(self):
+        win = FakeWindow()
+        screen = LineCache(win)
+        view = TableView(wide(5000))
+        height = 35
+
+        def frame(top, cursor):
+            for row in range(height):
+                screen.draw(3 + row, 30, view.line(top + row), 80, 1 if top + row == cursor else 0)
+
+        frame(0, 0)
+        assert screen.writes == height
+        frame(0, 1)  # cursor moved one line: old and new cursor lines
+        assert screen.writes == height + 2
+
+        pages = range(0, len(view) - height, height)
+        for top in pages:  # page through 35,001 fields, at most a screenful each
+            frame(top, top)
+        assert screen.writes <= height + 2 + len(pages) * height
@@ -0,0 +1,116 @@
+import pytest
+
+from tbd.models import ImpactReport, LineageGraph
+from tbd.impact import query
+from tbd.impact.reach import ReachabilityIndex
+
+NODES = {
+    "main.raw.a": {
+        "metadata": {"owner": "ana", "created_by": "ana", "updated_by": None, "email": "ana"},
+        "downstream": ["main.stg.b", "main.stg.c", "main.stg.b"],
+    },
+    "main.stg.b": {
+        "metadata": {"owner": "bo", "created_by": None, "updated_by": None, "email": "bo"},
+        "downstream": ["main.mart.d"],
+    },
+    "main.stg.c": {"metadata": {}, "downstream": ["main.mart.d"]},
+    "main.mart.d": {"metadata": {"owner": "main.raw.a"}, "downstream": ["main.mart.e"]},
+}
+
+
+class TestLineageGraph:
+    def test_build(self):
+        g = ImpactReport(NODES).to_graph()
+        assert len(g) == 5
+        assert g.edge_count == 5
+        assert "main.mart.e" in g
+        assert "nope" not in g
+        assert g.successors("main.raw.a") == ["main.stg.b", "main.stg.c"]
+        assert sorted(g.predecessors("main.mart.d")) == ["main.stg.b", "main.stg.c"]
+        assert g.metadata("main.stg.b")["owner"] == "bo"
+        assert g.metadata("main.mart.d")["owner"] == "main.raw.a"
+        assert g.metadata("main.mart.e")["owner"] is None
+
+    def test_queries(self):
+        g = LineageGraph.from_dict(NODES)
+        assert g.blast_radius("main.raw.a") == {
+            "main.stg.b": 1, "main.stg.c": 1, "main.mart.d": 2, "main.mart.e": 3}
+        assert list(g.blast_radius("main.raw.a", max_depth=1)) == ["main.stg.b", "main.stg.c"]
+        assert set(g.ancestry("main.mart.d")) == {"main.stg.b", "main.stg.c", "main.raw.a"}
+        assert g.shortest_path("main.raw.a", "main.mart.e") == [
+            "main.raw.a", "main.stg.b", "main.mart.d", "main.mart.e"]
+        assert g.shortest_path("main.mart.e", "main.raw.a") is None
+
+    def test_save_load(self, tmp_path):
+        g = LineageGraph.from_dict(NODES)
+        path = tmp_path / "impact.graph"
+        g.save(path)
+        for use_mmap in (True, False):
+            loaded = LineageGraph.load(path, use_mmap=use_mmap)
+            assert len(loaded) == len(g)
+            assert sorted(loaded.edges()) == sorted(g.edges())
+            assert loaded.metadata("main.raw.a") == g.metadata("main.raw.a")
+            assert loaded.blast_radius("main.stg.c") == g.blast_radius("main.stg.c")
+            assert loaded.to_dict() == g.to_dict()
+            assert "missing" not in loaded
+
+    def test_empty(self, tmp_path):
+        g = LineageGraph.from_dict({})
+        g.save(tmp_path / "empty.graph")
+        assert len(LineageGraph.load(tmp_path / "empty.graph")) == 0
+
+
+class TestReachabilityIndex:
+    def test_closure(self):
+        index = ReachabilityIndex.from_report(ImpactReport(NODES))
+        assert index.is_downstream("main.raw.a", "main.mart.e")
+        assert not index.is_downstream("main.mart.e", "main.raw.a")
+        assert not index.is_downstream("main.stg.b", "main.stg.c")
+        assert sorted(index.affected_by("main.stg.c")) == ["main.mart.d", "main.mart.e"]
+        assert index.affected_by("main.mart.e") == []
+        assert not index.is_downstream("main.stg.b", "main.stg.b")
+
+    def test_self_on_cycle(self, tmp_path):
+        nodes = dict(NODES, **{"main.mart.e": {"metadata": {}, "downstream": ["main.stg.b"]},
+                               "main.loop.f": {"metadata": {}, "downstream": ["main.loop.f"]}})
+        index = ReachabilityIndex.from_graph(LineageGraph.from_dict(nodes))
+        assert index.is_downstream("main.stg.b", "main.stg.b")
+        assert index.is_downstream("main.loop.f", "main.loop.f")
+        assert not index.is_downstream("main.raw.a", "main.raw.a")
+        index.save(tmp_path / "g.reach")
+        loaded = ReachabilityIndex.load(tmp_path / "g.reach", index.graph)
+        assert loaded.is_downstream("main.mart.d", "main.mart.d")
+
+    def test_add_edge(self):
+        index = ReachabilityIndex.from_graph(LineageGraph.from_dict(NODES))
+        assert not index.is_downstream("main.mart.d", "main.mart.d")
+        index.add_edge("main.mart.e", "main.stg.b")  # cycle b -> d -> e -> b
+        assert index.is_downstream("main.mart.d", "main.mart.d")
+        assert not index.is_downstream("main.stg.c", "main.stg.c")
+        assert index.is_downstream("main.mart.e", "main.mart.d")
+        assert index.is_downstream("main.stg.c", "main.stg.b")
+        index.add_edge("main.mart.d", "main.new.f")
+        assert "main.new.f" in index
+        assert index.is_downstream("main.raw.a", "main.new.f")
+        assert sorted(index.affected_by("main.stg.b")) == [
+            "main.mart.d", "main.mart.e", "main.new.f"]
+
+    def test_query_offline(self, tmp_path):
+        path = str(tmp_path / "impact.graph")
+        ImpactReport(NODES).save(path)
+        assert query("main.stg.b", path=path) == ["main.mart.d", "main.mart.e"]
+        LineageGraph.from_dict(NODES).save(path)
+        assert query("main.stg.c", "main.stg.b", path=path) == ["main.mart.d", "main.mart.e"]
+        with pytest.raises(KeyError, match="main.stg.typo"):
+            query("main.stg.typo", path=path)
+
+    def test_query_read_only(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "impact.graph")
+        LineageGraph.from_dict(NODES).save(path)
+
+        def refuse(self, output_path):
+            raise PermissionError(13, "Permission denied", output_path)
+
+        monkeypatch.setattr(ReachabilityIndex, "save", refuse)
+        assert query("main.stg.c", path=path) == ["main.mart.d", "main.mart.e"]
+        assert not (tmp_path / "impact.graph.reach").exists()
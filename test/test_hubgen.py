@@ -0,0 +1,20 @@
+from bench import hubgen
+from tbd.schema import from_source_yaml, schema_read
+
+
+class TestHubgen:
+    def test_csv_and_dbt_describe_the_same_hub(self, tmp_path):
+        csv_dir, dbt_dir = hubgen.build(str(tmp_path), databases=2, tables=6, columns=5, seed=3)
+        from_csv = {t.name: [(c.name, c.dtype) for c in t.columns] for t in schema_read(in_file=csv_dir)}
+        from_dbt = {t.name: [(c.name, c.dtype) for c in t.columns]
+                    for t in schema_read(in_file=dbt_dir, schema_reader=from_source_yaml)}
+        assert len(from_csv) == 12
+        assert from_csv == from_dbt
+        assert all(c.description for t in schema_read(in_file=dbt_dir, schema_reader=from_source_yaml)
+                   for c in t.columns)
+
+    def test_tables_per_file(self, tmp_path):
+        _, dbt_dir = hubgen.build(str(tmp_path), databases=1, tables=7, columns=3, tables_per_file=3)
+        files = sorted(p.name for p in (tmp_path / "dbt").rglob("*.yml"))
+        assert files == ["sources_0000.yml", "sources_0001.yml", "sources_0002.yml"]
+        assert len(list(schema_read(in_file=dbt_dir, schema_reader=from_source_yaml))) == 7
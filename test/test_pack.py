@@ -0,0 +1,78 @@
+import os
+
+import yaml
+
+from bench import hubgen
+from tbd.schema import from_source_yaml, schema_read
+from tbd.schema.pack import SNAPSHOT, HubSnapshot, pack, read_hub, unpack
+
+
+def summary(tables):
+    return {t.name: (t.description, [(c.name, c.dtype, c.description, c.nullable, c.primary_key,
+                                      c.default, c.metadata) for c in t.columns])
+            for t in tables}
+
+
+def from_yaml(folder):
+    return summary(schema_read(in_file=folder, schema_reader=from_source_yaml))
+
+
+class TestPack:
+    def test_snapshot_matches_yaml(self, tmp_path):
+        _, dbt_dir = hubgen.build(str(tmp_path), databases=2, tables=5, columns=4, tables_per_file=2)
+        pack(dbt_dir)
+        assert os.path.isfile(os.path.join(dbt_dir, SNAPSHOT))
+        assert summary(read_hub(dbt_dir)) == from_yaml(dbt_dir)
+        assert len(HubSnapshot.load(os.path.join(dbt_dir, SNAPSHOT))) == 10
+
+    def test_flags_defaults_and_meta(self, tmp_path):
+        source = {"version": 2, "sources": [{"name": "s", "database": "db", "tables": [
+            {"name": "t", "description": "T", "columns": [
+                {"name": "id", "type": "bigint", "primary_key": True},
+                {"name": "state", "type": "varchar(8)", "nullable": False, "default": "new",
+                 "meta": {"pii": False}},
+                {"name": "n", "default": 0}]}]}]}
+        (tmp_path / "t.source.yaml").write_text(yaml.safe_dump(source))
+        pack(str(tmp_path))
+        assert summary(read_hub(str(tmp_path))) == from_yaml(str(tmp_path))
+
+    def test_refreshes_changed_files(self, tmp_path):
+        _, dbt_dir = hubgen.build(str(tmp_path), databases=1, tables=4, columns=3)
+        pack(dbt_dir)
+        first, second, *_ = sorted(os.listdir(os.path.join(dbt_dir, "db_account")))
+        os.remove(os.path.join(dbt_dir, "db_account", first))
+        changed = os.path.join(dbt_dir, "db_account", second)
+        with open(changed) as f:
+            raw = yaml.safe_load(f)
+        raw["sources"][0]["tables"][0]["description"] = "edited"
+        with open(changed, "w") as f:
+            yaml.safe_dump(raw, f)
+        os.utime(changed, ns=(1, 1))  # a change even within mtime resolution
+
+        tables = summary(read_hub(dbt_dir))
+        assert tables == from_yaml(dbt_dir)
+        assert len(tables) == 3
+        assert len(HubSnapshot.load(os.path.join(dbt_dir, SNAPSHOT))) == 3
+
+    def test_stale_snapshot_on_read_only_hub(self, tmp_path, monkeypatch):
+        _, dbt_dir = hubgen.build(str(tmp_path), databases=1, tables=4, columns=3)
+        pack(dbt_dir)
+        folder = os.path.join(dbt_dir, "db_account")
+        os.remove(os.path.join(folder, sorted(os.listdir(folder))[0]))
+
+        def refuse(self, output_path):
+            raise PermissionError(13, "Permission denied", output_path)
+
+        monkeypatch.setattr(HubSnapshot, "save", refuse)
+        assert summary(read_hub(dbt_dir)) == from_yaml(dbt_dir)
+        assert len(HubSnapshot.load(os.path.join(dbt_dir, SNAPSHOT))) == 4  # left as it was
+
+    def test_match_and_unpack(self, tmp_path):
+        _, dbt_dir = hubgen.build(str(tmp_path), databases=2, tables=3, columns=3, tables_per_file=2)
+        snapshot = pack(dbt_dir)
+        name = snapshot.name(0)
+        assert [t.name for t in read_hub(dbt_dir, match=lambda n: n == name)] == [name]
+
+        out = str(tmp_path / "unpacked")
+        assert unpack(os.path.join(dbt_dir, SNAPSHOT), out) == 4
+        assert from_yaml(out) == from_yaml(dbt_dir)
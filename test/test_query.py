@@ -0,0 +1,255 @@
+import io
+import time
+
+import pytest
+
+import clients.databricks.query as query
+
+COLUMNS = [{"name": "id", "type_name": "INT"}, {"name": "name", "type_name": "STRING"}]
+CHUNKS = {
+    1: {"data_array": [["3", "c"]], "next_chunk_index": 2},
+    2: {"data_array": [["4", None]]},
+}
+ENVELOPE = {
+    "manifest": {"schema": {"columns": COLUMNS}},
+    "result": {"data_array": [["1", "a"], ["2", "b,x"]], "next_chunk_index": 1},
+}
+
+
+def fake_fetch_chunk(host, token, statement_id, chunk_index):
+    return CHUNKS[chunk_index]
+
+
+class TestQueryRows:
+    def test_iter_rows(self, monkeypatch):
+        monkeypatch.setattr(query, "fetch_chunk", fake_fetch_chunk)
+        rows = query.iter_rows(ENVELOPE, "h", "t", "s")
+        assert next(rows) == {"id": "1", "name": "a"}
+        assert [r["id"] for r in rows] == ["2", "3", "4"]
+        assert len(query.collect_rows(ENVELOPE, "h", "t", "s")[0]) == 4
+
+    def test_write_rows(self, monkeypatch):
+        monkeypatch.setattr(query, "fetch_chunk", fake_fetch_chunk)
+        out = io.StringIO()
+        assert query.write_rows(query.iter_rows(ENVELOPE, "h", "t", "s"), COLUMNS, out, "csv") == 4
+        assert out.getvalue().splitlines() == ["id,name", "1,a", '2,"b,x"', "3,c", "4,"]
+        out = io.StringIO()
+        query.write_rows(query.iter_rows(ENVELOPE, "h", "t", "s"), COLUMNS, out, "ndjson")
+        assert out.getvalue().splitlines()[-1] == '{"id":"4","name":null}'
+
+    def test_prefetch_in_order(self, monkeypatch):
+        import threading
+
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def slow_fetch(host, token, statement_id, chunk_index):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02 * (chunk_index % 3))  # finish out of order
+            with lock:
+                active[0] -= 1
+            return {"data_array": [[str(chunk_index), "x"]]}
+
+        monkeypatch.setattr(query, "fetch_chunk", slow_fetch)
+        envelope = {
+            "manifest": {"schema": {"columns": COLUMNS}, "total_chunk_count": 10},
+            "result": {"chunk_index": 0, "data_array": [["0", "x"]], "next_chunk_index": 1},
+        }
+        rows = list(query.iter_rows(envelope, "h", "t", "s", workers=3, max_in_flight=3))
+        assert [r["id"] for r in rows] == [str(i) for i in range(10)]
+        assert 1 < peak[0] <= 3
+
+    def test_external_links(self, monkeypatch):
+        files = {
+            "u0": b"id,name\r\n1,a\r\n2,\"b,x\"\r\n",
+            "u1": b"3,c\r\n",
+            "j0": b'[["1","a"],["2",null]]',
+        }
+        links = {1: {"external_links": [{"chunk_index": 1, "external_link": "u1"}]}}
+        monkeypatch.setattr(query, "_download", files.__getitem__)
+        monkeypatch.setattr(query, "fetch_chunk", lambda h, t, s, i: links[i])
+
+        for total in (None, 2):
+            envelope = {
+                "manifest": {"format": "CSV", "schema": {"columns": COLUMNS}, "total_chunk_count": total},
+                "result": {"external_links": [
+                    {"chunk_index": 0, "external_link": "u0", "next_chunk_index": 1}]},
+            }
+            rows = list(query.iter_rows(envelope, "h", "t", "s"))
+            assert rows == [{"id": "1", "name": "a"}, {"id": "2", "name": "b,x"},
+                            {"id": "3", "name": "c"}]
+
+        # a data row equal to the header is only dropped as the first line of a link
+        monkeypatch.setattr(query, "BATCH_ROWS", 2)
+        payload = b"id,name\r\n1,a\r\n2,b\r\nid,name\r\n"
+        assert [r for batch in query.decode_link(payload, "CSV", ["id", "name"]) for r in batch] == [
+            ["1", "a"], ["2", "b"], ["id", "name"]]
+
+        envelope = {
+            "manifest": {"format": "JSON_ARRAY", "schema": {"columns": COLUMNS}},
+            "result": {"external_links": [{"chunk_index": 0, "external_link": "j0"}]},
+        }
+        assert [r["name"] for r in query.iter_rows(envelope, "h", "t", "s")] == ["a", None]
+
+
+class TestStatementLifecycle:
+    def test_server_wait_and_cancel(self):
+        from clients.databricks.mock import MockWorkspace, serve
+
+        workspace = MockWorkspace(runtime=lambda sql: float(sql.split()[-1]))
+        with serve(workspace) as host:
+            first = query.start_statement(host, "t", "w", "SELECT 0", None, None, wait_timeout=5)
+            assert first["status"]["state"] == "SUCCEEDED"
+            assert query.wait_for_done(host, "t", first["statement_id"], first=first) is first
+
+            first = query.start_statement(host, "t", "w", "SELECT 30", None, None, wait_timeout=0)
+            with pytest.raises(TimeoutError):
+                query.wait_for_done(host, "t", first["statement_id"], first=first, timeout_s=0.3)
+            assert workspace.status(first["statement_id"])["status"]["state"] == "CANCELED"
+
+    def test_poll_delays(self):
+        delays = query.poll_delays(initial=0.1, factor=2, cap=1.0)
+        values = [next(delays) for _ in range(8)]
+        assert 0.05 <= values[0] <= 0.1
+        assert all(0.5 <= v <= 1.0 for v in values[5:])
+
+
+class TestResultCache:
+    def test_normalize(self):
+        from clients.databricks.query.cache import normalize_sql
+
+        assert normalize_sql("SELECT  *\n FROM t -- note\n WHERE s = 'A  b';") == \
+            normalize_sql("select * from T where S = 'A  b'")
+        assert normalize_sql("select 'A'") != normalize_sql("select 'a'")
+
+    def test_typed_rows_round_trip(self, tmp_path):
+        import datetime
+        from decimal import Decimal
+        from clients.databricks.query.cache import ResultCache
+
+        cache = ResultCache(str(tmp_path))
+        key = cache.key("select 1", "w", result_format="ARROW_STREAM")
+        rows = [[1, Decimal("12.50"), datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+                 datetime.date(2024, 1, 2), b"\x00\xff", {"nested": "x"}, None]]
+        assert list(cache.store(key, COLUMNS, [rows], "s")) == [rows]
+        header, chunks = cache.get(key)
+        assert header["statement_id"] == "s"
+        assert list(chunks) == [rows]
+
+    def test_main_hits_cache(self, tmp_path, monkeypatch):
+        from clients.databricks.mock import MockWorkspace, serve
+
+        rows = [[str(i), f"n{i}"] for i in range(2500)]
+        workspace = MockWorkspace(results=lambda sql: (COLUMNS, rows))
+        with serve(workspace) as host:
+            monkeypatch.setenv("DATABRICKS_HOST", host)
+            monkeypatch.setenv("DATABRICKS_TOKEN", "t")
+            monkeypatch.setenv("DATABRICKS_WAREHOUSE_ID", "w")
+            monkeypatch.setenv("DATABRICKS_QUERY_CACHE", str(tmp_path / "cache"))
+            outputs = []
+            for run, extra in enumerate(([], [], ["--no-cache"])):
+                out = tmp_path / f"out{run}.csv"
+                monkeypatch.setattr("sys.argv", ["query", "--query", "SELECT * FROM t",
+                                                 "--format", "csv", "--output", str(out), *extra])
+                before = workspace.requests
+                query.main()
+                outputs.append((out.read_text(), workspace.requests - before))
+
+        assert outputs[0][0] == outputs[1][0] == outputs[2][0]
+        assert len(outputs[0][0].splitlines()) == 2501
+        assert outputs[0][1] > 0
+        assert outputs[1][1] == 0
+        assert outputs[2][1] > 0
+
+
+class TestBatch:
+    def test_split_statements(self):
+        from clients.databricks.query.sql import split_statements
+
+        assert split_statements("select 1; select ';' -- x;\n;\n select 3") == [
+            "select 1", "select ';' -- x;", "select 3"]
+
+    def test_run_batch(self, tmp_path, monkeypatch):
+        import threading
+        from clients.databricks.mock import MockWorkspace, serve
+        from clients.databricks.query import batch
+
+        def results(sql):
+            n = int(sql.split()[-1])
+            return COLUMNS, [[str(i), "x"] for i in range(n)]
+
+        # every statement waits here until all four are in flight; run one
+        # at a time, the barrier times out and the statements fail
+        barrier = threading.Barrier(4, timeout=10)
+
+        def execute(*args, **kwargs):
+            barrier.wait()
+            return query.execute(*args, **kwargs)
+
+        monkeypatch.setattr(batch, "execute", execute)
+        workspace = MockWorkspace(runtime=lambda sql: 0.05, results=results)
+        with serve(workspace) as host:
+            statements = [f"SELECT {n}" for n in (3, 1, 5, 2)]
+            out = batch.run_batch(statements, host, "t", "w", out_dir=str(tmp_path), fmt="csv", concurrency=4)
+        assert [r["error"] for r in out] == [None] * 4
+        assert [r["rows"] for r in out] == [3, 1, 5, 2]
+        assert (tmp_path / "0003.csv").read_text().count("\n") == 6
+        assert (tmp_path / "summary.json").exists()
+
+    def test_failed_statement_leaves_no_part_file(self, tmp_path, monkeypatch):
+        from clients.databricks.query import batch
+
+        def chunks():
+            yield [["1", "a"]]
+            raise RuntimeError("link expired")
+
+        monkeypatch.setattr(batch, "execute", lambda *args, **kwargs: ("s", COLUMNS, chunks()))
+        r, = batch.run_batch(["SELECT 1"], "h", "t", "w", out_dir=str(tmp_path), fmt="csv")
+        assert r["error"] == "link expired"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["summary.json"]
+
+
+class TestRowShapes:
+    TYPED = [{"name": "id", "type_name": "LONG"}, {"name": "amount", "type_name": "DECIMAL"},
+             {"name": "ts", "type_name": "TIMESTAMP"}, {"name": "ok", "type_name": "BOOLEAN"},
+             {"name": "select", "type_name": "STRING"}]
+    CHUNKS = [[["1", "1.50", "2024-01-02T03:04:05.000Z", "true", "a"]],
+              [["2", None, None, "false", "b"]]]
+
+    def test_tuples(self):
+        from decimal import Decimal
+        from clients.databricks.query.rows import iter_tuples
+
+        rows = list(iter_tuples(self.TYPED, self.CHUNKS, coerce=True))
+        assert rows[0].id == 1 and rows[0].amount == Decimal("1.50")
+        assert rows[0].ts.year == 2024 and rows[0].ok is True
+        assert rows[0][4] == "a"  # "select" is renamed, position still works
+        assert rows[1] == (2, None, None, False, "b")
+        assert type(rows[0]) is type(rows[1])
+        assert list(iter_tuples(self.TYPED, self.CHUNKS))[1][0] == "2"
+
+    def test_columns(self):
+        from array import array
+        from clients.databricks.query.rows import iter_columns
+
+        batches = list(iter_columns(self.TYPED, self.CHUNKS, coerce=True))
+        assert batches[0]["id"] == array("q", [1])
+        assert batches[1]["amount"] == [None]
+        assert batches[1]["select"] == ["b"]
+
+    def test_csv_nulls(self):
+        from array import array
+        from clients.databricks.query.rows import iter_columns, iter_tuples
+
+        typed = self.TYPED + [{"name": "day", "type_name": "DATE"}, {"name": "x", "type_name": "DOUBLE"}]
+        chunks = [[["1", "1.50", "2024-01-02T03:04:05", "true", "a", "2024-01-02", "0.5"]],
+                  [["2", "", "", "", "", "", ""]]]
+        rows = list(iter_tuples(typed, chunks, coerce=True, result_format="CSV"))
+        assert rows[1] == (2, None, None, None, "", None, None)
+        batches = list(iter_columns(typed, chunks, coerce=True, result_format="CSV"))
+        assert batches[1]["id"] == array("q", [2])
+        assert batches[1]["x"] == [None]
+        with pytest.raises((ValueError, ArithmeticError)):  # int(""), Decimal("")
+            list(iter_tuples(typed, chunks, coerce=True))
@@ -0,0 +1,118 @@
+import os
+
+import yaml
+
+from tbd.editor.sources import SourcesFile
+from tbd.models import Column
+
+TEXT = """version: 2
+
+# hand-maintained
+sources:
+  - name: shop   # the shop database
+    database: shop
+    loader: fivetran
+    tables:
+      - name: orders
+        description: One row per order.
+        loaded_at_field: _loaded_at
+        columns:
+          - name: id
+            data_type: bigint
+            tests: [unique, not_null]
+          - name: state
+            type: varchar(8)
+            meta: {pii: false}
+
+      # payments come from the PSP export
+      - name: payments
+        columns:
+          - {name: id, type: bigint, primary_key: true}
+  - name: crm
+    tables:
+      - name: orders
+        columns:
+          - name: id
+"""
+
+
+def write(tmp_path, text=TEXT):
+    path = tmp_path / "sources.yml"
+    path.write_text(text)
+    return str(path)
+
+
+class TestSourcesFile:
+    def test_every_source_lazily(self, tmp_path):
+        doc = SourcesFile.load(write(tmp_path))
+        assert doc.names() == [("shop", "orders"), ("shop", "payments"), ("crm", "orders")]
+        assert doc.sources == ["shop", "crm"]
+        assert [e.table for e in doc._entries] == [None, None, None]
+        orders = doc.table(0)
+        assert [(c.name, c.dtype) for c in orders.columns] == [("id", "bigint"), ("state", "varchar(8)")]
+        assert orders.column("state").metadata == {"pii": False}
+        assert doc.table(0) is orders
+        assert doc.table(1).primary_key.name == "id"
+        assert doc.modified() == []
+        assert doc.save() == 0
+
+    def test_save_rewrites_only_the_edited_table(self, tmp_path):
+        path = write(tmp_path)
+        doc = SourcesFile.load(path)
+        payments = doc.table(1)
+        payments.description = "Captured payments."
+        payments.add_column(Column("amount", dtype="DECIMAL(12,2)"))
+        doc.table(0)  # loaded, not changed
+        assert doc.modified() == [1]
+        assert doc.save() == 1
+
+        text = open(path).read()
+        before, after = TEXT.split("      - name: payments\n")
+        assert text.startswith(before + "      - name: payments\n")  # comments and keys kept
+        assert text.endswith(TEXT[TEXT.index("  - name: crm"):])
+        data = yaml.safe_load(text)
+        assert data["sources"][0]["tables"][1] == {
+            "name": "payments", "columns": [{"name": "id", "type": "bigint", "primary_key": True},
+                                            {"name": "amount", "type": "DECIMAL(12,2)"}],
+            "description": "Captured payments."}
+        assert not [f for f in os.listdir(tmp_path) if f.endswith(".tmp")]
+
+    def test_edits_keep_unmodelled_keys(self, tmp_path):
+        path = write(tmp_path)
+        doc = SourcesFile.load(path)
+        orders = doc.table(0)
+        orders.rename_column("id", "order_id")
+        orders.column("state").dtype = "STRING"
+        doc.table(2).description = "CRM orders"
+        assert doc.save() == 2
+        assert doc.save() == 0
+
+        data = yaml.safe_load(open(path))
+        shop, crm = data["sources"]
+        assert shop["loader"] == "fivetran"
+        assert shop["tables"][0] == {
+            "name": "orders", "description": "One row per order.", "loaded_at_field": "_loaded_at",
+            "columns": [{"name": "order_id", "data_type": "bigint", "tests": ["unique", "not_null"]},
+                        {"name": "state", "type": "STRING", "meta": {"pii": False}}]}
+        assert crm["tables"][0]["description"] == "CRM orders"
+
+        orders.column("state").description = "lifecycle"  # spans moved along after the first save
+        assert doc.save() == 1
+        assert yaml.safe_load(open(path))["sources"][0]["tables"][0]["columns"][1]["description"] == "lifecycle"
+        assert SourcesFile.load(path).names() == doc.names()
+
+    def test_anchors_fall_back_to_a_full_dump(self, tmp_path):
+        path = write(tmp_path, """sources:
+- name: s
+  tables:
+  - name: a
+    columns: &cols
+    - name: id
+  - name: b
+    columns: *cols
+""")
+        doc = SourcesFile.load(path)
+        doc.table(1).add_column(Column("extra"))
+        assert doc.save() == 1
+        tables = yaml.safe_load(open(path))["sources"][0]["tables"]
+        assert [[c["name"] for c in t["columns"]] for t in tables] == [["id"], ["id", "extra"]]
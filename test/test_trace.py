@@ -0,0 +1,74 @@
+import json
+import time
+
+import pytest
+
+from tbd import trace
+
+
+@pytest.fixture
+def tracer():
+    trace.enable("summary")
+    yield trace._tracer
+    trace.disable()
+
+
+class TestTrace:
+    def test_disabled_is_noop(self):
+        trace.disable()
+        with trace.span("anything", x=1) as s:
+            s["status"] = 200
+        assert s is trace._NULL
+        assert not trace.enabled()
+
+    def test_nested_self_time(self, tracer):
+        with trace.span("outer"):
+            with trace.span("inner"):
+                time.sleep(0.02)
+        (inner, *_), (outer, *_) = tracer.events
+        assert (inner, outer) == ("inner", "outer")
+        _, _, inner_ns, inner_self, _, inner_depth, _ = tracer.events[0]
+        _, _, outer_ns, outer_self, _, outer_depth, _ = tracer.events[1]
+        assert inner_self == inner_ns >= 20_000_000
+        assert outer_self == outer_ns - inner_ns
+        assert (inner_depth, outer_depth) == (1, 0)
+        assert "inner" in tracer.summary().splitlines()[1]
+
+    def test_error_and_status(self, tracer):
+        class HTTPError(Exception):
+            code = 503
+
+        with pytest.raises(HTTPError):
+            with trace.span("http GET"):
+                raise HTTPError()
+        assert tracer.events[0][-1] == {"error": "HTTPError", "status": 503}
+
+    def test_chrome_output(self, tmp_path):
+        path = tmp_path / "trace.json"
+        trace.enable("chrome", str(path))
+        with trace.span("parse", file="a.yml"):
+            pass
+        trace.finish()
+        event, = json.loads(path.read_text())["traceEvents"]
+        assert (event["name"], event["cat"], event["ph"]) == ("parse", "parse", "X")
+        assert event["args"] == {"file": "a.yml"}
+        assert not trace.enabled()
+
+    def test_endpoint(self):
+        assert trace.endpoint("/api/2.1/unity-catalog/tables/main.s0.t000001") == \
+            "/api/2.1/unity-catalog/tables/{}"
+        assert trace.endpoint("/api/2.0/sql/statements/01ef7a3c-55b2-1d4e-9a8b-0242ac120002/result/chunks/3?x=1") == \
+            "/api/2.0/sql/statements/{}/result/chunks/{}"
+
+    def test_env(self, monkeypatch, capsys):
+        try:
+            monkeypatch.setenv("TBD_TRACE", "true")
+            trace._from_env()
+            assert trace._output == ("summary", None)
+            trace.disable()
+            monkeypatch.setenv("TBD_TRACE", "bogus")
+            trace._from_env()
+            assert not trace.enabled()
+            assert "ignoring TBD_TRACE='bogus'" in capsys.readouterr().err
+        finally:
+            trace.disable()
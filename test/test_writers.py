@@ -0,0 +1,44 @@
+from tbd.models import ImpactReport, ColumnarReportWriter, open_writer, read_report
+
+from test_graph import NODES
+
+
+def normalized(graph):
+    return {k: {"metadata": {f: (v.get("metadata") or {}).get(f)
+                             for f in ("owner", "created_by", "updated_by", "email")},
+                "downstream": list(dict.fromkeys(v["downstream"]))}
+            for k, v in graph.items()}
+
+
+class TestReportWriters:
+    def test_round_trip(self, tmp_path):
+        for ext in ("json", "jsonl", "tbdc"):
+            path = str(tmp_path / f"impact.{ext}")
+            ImpactReport(NODES).save(path)
+            loaded = ImpactReport.load(path)
+            assert list(loaded.graph) == list(NODES)
+            assert normalized(loaded.graph) == normalized(NODES)
+
+    def test_tsv_report(self, tmp_path):
+        path = str(tmp_path / "x.impact.tsv")
+        ImpactReport(NODES).write_report(path)
+        lines = open(path).read().splitlines()
+        assert lines[0] == "dataset\towner\tcreated_by\tupdated_by\temail"
+        assert lines[1] == "main.raw.a\tana\tana\tNone\tana"
+        assert len(lines) == 5
+
+    def test_readable_while_writing(self, tmp_path):
+        path = tmp_path / "impact.tbdc"
+        writer = ColumnarReportWriter(path, block_size=2)
+        for dataset, node in NODES.items():
+            writer.write(dataset, node)
+        # last block of two is flushed, nothing pending
+        assert [d for d, _ in read_report(path)] == list(NODES)
+        writer.write("main.late.x", {"metadata": {}, "downstream": []})
+        assert len(list(read_report(path))) == 4
+        writer.close()
+        assert len(list(read_report(path))) == 5
+
+        with open_writer(tmp_path / "live.jsonl") as jsonl:
+            jsonl.write("main.raw.a", NODES["main.raw.a"])
+            assert [d for d, _ in read_report(tmp_path / "live.jsonl")] == ["main.raw.a"]